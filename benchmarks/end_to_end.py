@@ -0,0 +1,303 @@
+# benchmarks/end_to_end.py
+"""LiveLoom's own overhead on top of a provider, measured against a local mock server.
+
+    python -m benchmarks.end_to_end [--requests 40] [--concurrency 4] [--answers 10]
+                                    [--ttft-ms 200] [--tokens-per-s 80] [--chunk-tokens 1] [--error-rate 0]
+                                    [--json out.json] [--compare baseline.json] [--tolerance 0.15]
+
+Three phases, all against the same mock:
+
+  engine      LLMWrapper streams through the shared engine, --concurrency at a time
+  chat        ChatModule answers questions one after another, without a window
+  ui          ChatTab answers them under the offscreen Qt platform, display included
+
+"added" latencies are what the client measured minus what the mock was
+told to take. With --compare, metrics worse than the baseline by more
+than --tolerance are listed and the exit status is 1.
+"""
+import os
+import platform
+import tempfile
+
+# settings, sessions and logs go to a scratch data dir, never the user's
+BENCH_HOME = tempfile.mkdtemp(prefix="liveloom-bench-")
+os.environ["XDG_DATA_HOME"] = BENCH_HOME
+os.environ["APPDATA"] = BENCH_HOME
+if platform.system() == "Darwin":
+    os.environ["HOME"] = BENCH_HOME
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import gc
+import json
+import logging
+import math
+import queue
+import sys
+import time
+import tracemalloc
+
+from benchmarks.mock_server import MockServer, add_arguments, config_from
+from src.utils.constants import LOGGER_DIR, LOGGER_NAME, SETTINGS_FILE
+from src.utils.logger import setup_daily_logger
+from src.utils.perf import StreamStats, percentile
+
+QUESTION = "so we were talking about the ingestion queue earlier; how would you bound a channel of {n} jobs in go?"
+
+
+def expected_ms(config):
+    """What the mock alone takes: (first token, whole answer)."""
+    events = math.ceil(config.answer_tokens / config.chunk_tokens)
+    return config.ttft_ms, config.ttft_ms + (events - 1) * config.chunk_tokens / config.tokens_per_s * 1000
+
+
+def spread(values, name):
+    return {f"{name}_p50": percentile(values, 50), f"{name}_p95": percentile(values, 95)}
+
+
+def write_settings(url, concurrency, pending):
+    settings = {
+        "model_name": "mock", "model_url": url, "model_key": "bench", "enable_streaming": 1,
+        "models": [{"name": "mock", "url": url, "key": "bench"}],
+        "max_concurrent_streams": concurrency, "max_pending_requests": pending,
+        # every question must reach the mock
+        "cache_enabled": 0, "similarity_enabled": 0, "question_gate_enabled": 0, "failover_enabled": 0,
+    }
+    with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
+        json.dump(settings, f)
+
+
+def run_engine(url, config, requests, concurrency):
+    from src.llm.engine import get_engine
+    from src.llm.wrapper import LLMWrapper
+
+    engine = get_engine()
+    llm = LLMWrapper(model="mock", api_url=url, api_key="bench", answer_queue=queue.Queue())
+    ttft, total = expected_ms(config)
+    runs, failed = [], 0
+    start = time.perf_counter()
+    # keep --concurrency streams in flight: the engine's semaphore does the queueing
+    futures = []
+    for n in range(requests):
+        stats = StreamStats("mock")
+        futures.append((stats, engine.stream(llm, QUESTION.format(n=n), stats=stats)))
+    for stats, future in futures:
+        try:
+            future.result()
+            runs.append(stats)
+        except Exception:
+            failed += 1
+    wall = time.perf_counter() - start
+    return {
+        "answers_per_s": len(runs) / wall,
+        "tokens_per_s": sum(s.tokens for s in runs) / wall,
+        "failed": failed,
+        **spread([s.ttft_ms - ttft for s in runs if s.ttft_ms is not None], "added_ttft_ms"),
+        **spread([s.total_ms - total for s in runs], "added_total_ms"),
+    }
+
+
+class HeadlessApp:
+    """What ChatModule takes from ChatTab: settings, the result queue and the session log."""
+
+    def __init__(self, settings):
+        from src.chat.session import FlatChatSessionLogger
+
+        self.settings = settings
+        self.answer_queue = queue.Queue()
+        # its own session dir: session files are named to the second, and the ui phase's
+        # ChatTab opens one in the default dir right after this phase may have
+        self.session = FlatChatSessionLogger(base_dir=os.path.join(BENCH_HOME, "chat-sessions"),
+                                             durability=settings.get_session_durability())
+        self.session._create_session_file()
+
+
+def run_chat(settings, config, answers):
+    from src.chat.chat import ChatModule
+    from src.llm.wrapper import LLMWrapper
+    from src.workers.messages import Kind
+
+    app = HeadlessApp(settings)
+    llm = LLMWrapper(model="mock", api_url=settings.get_current_url(), api_key="bench", answer_queue=app.answer_queue)
+    chat = ChatModule(llm, app)
+    ttft, total = expected_ms(config)
+
+    def ask(n):
+        seen = {}
+        start = time.perf_counter()
+        chat.chat_with_llm(QUESTION.format(n=n), request_id=f"bench-{n}")
+        while True:
+            message = app.answer_queue.get()
+            now = time.perf_counter()
+            if message.kind is Kind.DELTA:
+                seen.setdefault("first", now)
+            elif message.kind in (Kind.DONE, Kind.ERROR):
+                return message.kind is Kind.DONE, (seen.get("first", now) - start) * 1000, (now - start) * 1000
+
+    firsts, lasts, failed = [], [], 0
+    for n in range(answers):
+        ok, first, last = ask(n)
+        if not ok:
+            failed += 1
+            continue
+        firsts.append(first - ttft)
+        lasts.append(last - total)
+
+    # retained memory: what every further answer leaves behind (session log, transcript window, ...)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for n in range(answers, answers * 2):
+        ask(n)
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    app.session.close()
+    return {
+        "failed": failed,
+        **spread(firsts, "added_ttft_ms"),
+        **spread(lasts, "added_total_ms"),
+        "retained_kib_per_answer": retained / answers / 1024,
+        "peak_traced_kib": peak / 1024,
+    }
+
+
+def run_ui(settings, config, answers):
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+    from src.ui.chat_tab import ChatTab
+    from src.workers.messages import Kind
+
+    class TimedChatTab(ChatTab):
+        """ChatTab that times every batch the worker hands to the GUI thread."""
+
+        def update_display(self, messages):
+            start = time.perf_counter()
+            super().update_display(messages)
+            elapsed = (time.perf_counter() - start) * 1000
+            current["ui_ms"] += elapsed
+            current["batches"] += 1
+            current["max_batch_ms"] = max(current["max_batch_ms"], elapsed)
+            if any(m.kind in (Kind.DONE, Kind.ERROR) for m in messages):
+                current["done"] = time.perf_counter()
+                QTimer.singleShot(0, next_question)
+
+    results = []
+    current = {}
+    tab = TimedChatTab(settings)
+    tab.show()
+    ttft, total = expected_ms(config)
+    app = QApplication.instance()
+
+    def next_question():
+        if current:
+            results.append(dict(current))
+        if len(results) == answers:
+            app.quit()
+            return
+        current.clear()
+        current.update(ui_ms=0.0, batches=0, max_batch_ms=0.0, sent=time.perf_counter())
+        tab.input_box.setText(QUESTION.format(n=len(results)))
+        tab.on_send_chat()
+
+    QTimer.singleShot(0, next_question)
+    app.exec()
+    tab.shutdown()
+    tab.close()
+    return {
+        **spread([r["ui_ms"] for r in results], "ui_ms_per_answer"),
+        **spread([r["batches"] for r in results], "ui_batches_per_answer"),
+        "ui_max_batch_ms": max(r["max_batch_ms"] for r in results),
+        **spread([(r["done"] - r["sent"]) * 1000 - total for r in results], "added_total_ms"),
+    }
+
+
+def compare(metrics, baseline, tolerance):
+    """Metrics that moved the wrong way by more than tolerance; throughputs should not drop."""
+    worse = []
+    for name, value in metrics.items():
+        base = baseline.get(name)
+        if name.startswith("mock.") or not isinstance(base, (int, float)) or not isinstance(value, (int, float)) or base == 0:
+            continue
+        higher_is_better = name.endswith("_per_s")
+        change = (value - base) / abs(base)
+        if (-change if higher_is_better else change) > tolerance:
+            worse.append((name, base, value))
+    return worse
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=40, help="streams in the engine phase")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--answers", type=int, default=10, help="questions in the chat and ui phases")
+    parser.add_argument("--phases", default="engine,chat,ui")
+    parser.add_argument("--log-level", default="WARNING", help="INFO includes the app's normal logging cost")
+    parser.add_argument("--json", help="write the metrics here")
+    parser.add_argument("--compare", help="metrics JSON from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    add_arguments(parser)
+    args = parser.parse_args()
+    phases = args.phases.split(",")
+
+    # before anything else asks for the logger, as main.py does
+    setup_daily_logger(name=LOGGER_NAME, log_dir=LOGGER_DIR, log_level=logging.getLevelName(args.log_level))
+    config = config_from(args)
+    server = MockServer(config)
+    url = server.start()
+    write_settings(url, args.concurrency, max(args.requests, 16) + 1)
+
+    from PyQt6.QtWidgets import QApplication
+    from src.llm.engine import get_engine
+    from src.ui.settings_tab import SettingsTab
+
+    qt = QApplication(sys.argv[:1])
+    get_engine(max_concurrency=args.concurrency, max_pending=max(args.requests, 16) + 1)
+    settings = SettingsTab()
+
+    metrics = {}
+    runners = {
+        "engine": lambda: run_engine(url, config, args.requests, args.concurrency),
+        "chat": lambda: run_chat(settings, config, args.answers),
+        "ui": lambda: run_ui(settings, config, args.answers),   # last: closing the tab stops the engine
+    }
+    print(f"mock: ttft {config.ttft_ms:g} ms, {config.tokens_per_s:g} tok/s, {config.answer_tokens} tokens "
+          f"in events of {config.chunk_tokens}, error rate {config.error_rate:g}")
+    for phase in ("engine", "chat", "ui"):
+        if phase not in phases:
+            continue
+        result = runners[phase]()
+        print(f"\n{phase}")
+        for name, value in result.items():
+            metrics[f"{phase}.{name}"] = value
+            print(f"  {name:28} {value:10.2f}" if isinstance(value, float) else f"  {name:28} {value:10}")
+    metrics["mock.requests"] = server.requests
+    metrics["mock.injected_errors"] = server.errors
+    try:
+        import resource
+        # ru_maxrss is KiB on Linux and bytes on macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        metrics["process.max_rss_mib"] = rss / (1024 * 1024 if platform.system() == "Darwin" else 1024)
+        print(f"\nprocess max RSS {metrics['process.max_rss_mib']:.1f} MiB; "
+              f"mock served {server.requests} requests, {server.errors} injected errors")
+    except ImportError:
+        pass
+    server.stop()
+    del qt
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(metrics, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            worse = compare(metrics, json.load(f), args.tolerance)
+        for name, base, value in worse:
+            print(f"REGRESSION {name}: {base:.2f} -> {value:.2f}")
+        if worse:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
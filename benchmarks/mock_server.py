@@ -0,0 +1,151 @@
+# benchmarks/mock_server.py
+"""A local OpenAI-compatible chat completions server with scripted timing and failures.
+
+    python -m benchmarks.mock_server [--port 8765] [--ttft-ms 200] [--tokens-per-s 80]
+                                     [--answer-tokens 200] [--chunk-tokens 1] [--error-rate 0.0]
+
+Point a model's "url" at http://127.0.0.1:PORT/v1/chat/completions. Both
+streaming and plain requests are answered.
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+from aiohttp import web
+
+
+@dataclass
+class MockConfig:
+    ttft_ms: float = 200.0          # request received -> first content event
+    tokens_per_s: float = 80.0
+    answer_tokens: int = 200
+    chunk_tokens: int = 1           # tokens per SSE event
+    error_rate: float = 0.0         # share of requests answered with error_status
+    error_status: int = 503
+    retry_after_s: float = 0.0      # sent with injected errors when > 0
+    seed: int = 0
+
+
+class MockServer:
+    """Runs the mock on its own event loop thread; start() returns the completions URL."""
+
+    def __init__(self, config: MockConfig = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or MockConfig()
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(self.config.seed)
+        self._loop = None
+        self._runner = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1/chat/completions"
+
+    def _tokens(self):
+        # varied words with escapes and non-ASCII, so clients parse real JSON strings
+        words = ["the", "goroutine", "scheduler", "\"quoted\"", "naïve", "chan", "\n", "x := 42;", "{}", "and"]
+        return [words[i % len(words)] + " " for i in range(self.config.answer_tokens)]
+
+    def _error(self):
+        self.errors += 1
+        headers = {"Retry-After": f"{self.config.retry_after_s:g}"} if self.config.retry_after_s > 0 else {}
+        body = {"error": {"message": "injected failure", "code": self.config.error_status}}
+        return web.json_response(body, status=self.config.error_status, headers=headers)
+
+    async def _completions(self, request):
+        received = time.perf_counter()
+        body = await request.json()
+        self.requests += 1
+        config = self.config
+        if config.error_rate and self._random.random() < config.error_rate:
+            return self._error()
+        tokens = self._tokens()
+        if body.get("max_tokens"):
+            tokens = tokens[:body["max_tokens"]]
+        interval = config.chunk_tokens / config.tokens_per_s
+
+        async def until(offset):
+            delay = received + offset - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        if not body.get("stream"):
+            await until(config.ttft_ms / 1000 + len(tokens) / config.tokens_per_s)
+            return web.json_response({"choices": [{"index": 0, "message": {"role": "assistant",
+                                                                           "content": "".join(tokens)}}]})
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        for n, start in enumerate(range(0, len(tokens), config.chunk_tokens)):
+            # paced from the request's arrival, so slow writes do not push every later token back
+            await until(config.ttft_ms / 1000 + n * interval)
+            chunk = {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "model": body.get("model"),
+                     "choices": [{"index": 0, "delta": {"content": "".join(tokens[start:start + config.chunk_tokens])},
+                                  "finish_reason": None}]}
+            await response.write(b"data: " + json.dumps(chunk).encode() + b"\n\n")
+        await response.write(b"data: [DONE]\n\n")
+        return response
+
+    def start(self) -> str:
+        self._loop = asyncio.new_event_loop()
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self._completions)
+        app.router.add_route("HEAD", "/", lambda request: web.Response())   # connection pre-warm
+        self._runner = web.AppRunner(app, access_log=None)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, self.host, self.port)
+        self._loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._thread = threading.Thread(target=self._loop.run_forever, name="mock-server", daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+        self._loop = None
+
+
+def add_arguments(parser):
+    defaults = MockConfig()
+    parser.add_argument("--ttft-ms", type=float, default=defaults.ttft_ms)
+    parser.add_argument("--tokens-per-s", type=float, default=defaults.tokens_per_s)
+    parser.add_argument("--answer-tokens", type=int, default=defaults.answer_tokens)
+    parser.add_argument("--chunk-tokens", type=int, default=defaults.chunk_tokens)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--error-status", type=int, default=defaults.error_status)
+    parser.add_argument("--retry-after-s", type=float, default=defaults.retry_after_s)
+
+
+def config_from(args) -> MockConfig:
+    return MockConfig(ttft_ms=args.ttft_ms, tokens_per_s=args.tokens_per_s, answer_tokens=args.answer_tokens,
+                      chunk_tokens=args.chunk_tokens, error_rate=args.error_rate,
+                      error_status=args.error_status, retry_after_s=args.retry_after_s)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    add_arguments(parser)
+    args = parser.parse_args()
+    server = MockServer(config_from(args), port=args.port)
+    print(f"mock completions at {server.start()} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
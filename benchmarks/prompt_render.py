@@ -0,0 +1,55 @@
+# benchmarks/prompt_render.py
+"""Render cost of the compiled prompt registry against the per-call PromptTemplate it replaced.
+
+    python -m benchmarks.prompt_render [--number N]
+"""
+import argparse
+import timeit
+
+from src.chat.prompts import DEFAULT_TEMPLATES, LANGUAGE, PromptRegistry
+
+SHORT = "so how does a goroutine get scheduled onto os threads?"
+LONG = ("okay so we were talking about the ingestion service earlier and the queue in front of it. " * 60) + SHORT
+
+
+def cases():
+    template = DEFAULT_TEMPLATES["transcript"]
+    compiled = PromptRegistry(language=LANGUAGE).get("transcript")
+    result = {
+        "str.format, full template": lambda q: template.format(question=q, language=LANGUAGE),
+        "CompiledPrompt.render": compiled.render,
+    }
+    try:
+        from langchain.prompts import PromptTemplate
+    except ImportError:
+        return result
+
+    prebuilt = PromptTemplate(input_variables=["question", "language"], template=template)
+
+    def per_call(q):
+        # what chat_with_llm used to do on every request
+        return PromptTemplate(input_variables=["question", "language"],
+                              template=template).format(question=q, language=LANGUAGE)
+
+    return {
+        "PromptTemplate built per call": per_call,
+        "PromptTemplate built once": lambda q: prebuilt.format(question=q, language=LANGUAGE),
+        **result,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000, help="renders per measurement")
+    args = parser.parse_args()
+    print(f"{'case':32} {'short (us)':>12} {'long (us)':>12}")
+    for name, render in cases().items():
+        row = []
+        for question in (SHORT, LONG):
+            best = min(timeit.repeat(lambda: render(question), number=args.number, repeat=5))
+            row.append(best / args.number * 1e6)
+        print(f"{name:32} {row[0]:12.2f} {row[1]:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
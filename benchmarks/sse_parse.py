@@ -0,0 +1,132 @@
+# benchmarks/sse_parse.py
+"""Parse cost of the incremental SSE parser against the line-by-line loop it replaced.
+
+    python -m benchmarks.sse_parse [--number N] [--file capture.sse ...]
+
+The built-in recordings are OpenAI-style completion streams cut into
+network-sized chunks. A capture taken with `curl -N ... > capture.sse`
+can be replayed with --file; it is cut into 1 KiB reads.
+"""
+import argparse
+import json
+import random
+import timeit
+
+from src.llm import sse
+from src.llm.sse import DONE, SSEParser, delta_content
+
+ANSWER = (
+    "A goroutine is a function running concurrently with others in the same address space. "
+    "The Go runtime multiplexes goroutines onto OS threads (the M:N scheduler), so starting "
+    "one costs a few KiB of stack, not a thread.\n\n```go\nfunc main() {\n\tch := make(chan int)\n"
+    "\tgo func() { ch <- 42 }()\n\tfmt.Println(<-ch) // prints \"42\"\n}\n```\n"
+    "Use channels or sync.WaitGroup to wait for them; naïve sleeps are racy. "
+) * 3
+
+
+def record(pieces, read_sizes, seed=7):
+    """An SSE byte stream carrying `pieces` as deltas, cut into chunks of the given read sizes."""
+    events = [b": keep-alive\n\n"]
+    for i, piece in enumerate(pieces):
+        chunk = {"id": "chatcmpl-1", "object": "chat.completion.chunk", "created": 1700000000,
+                 "model": "bench", "choices": [{"index": 0, "delta": {"content": piece},
+                                                "logprobs": None, "finish_reason": None}]}
+        events.append(b"data: " + json.dumps(chunk).encode() + b"\n\n")
+    events.append(b"data: [DONE]\n\n")
+    raw = b"".join(events)
+    rng = random.Random(seed)
+    chunks, i = [], 0
+    while i < len(raw):
+        n = rng.randint(*read_sizes)
+        chunks.append(raw[i:i + n])
+        i += n
+    return chunks
+
+
+def recordings():
+    words = ANSWER.split(" ")
+    tokens = [w + " " for w in words]
+    sentences = [" ".join(words[i:i + 20]) + " " for i in range(0, len(words), 20)]
+    return {
+        "token per event, small reads": record(tokens, (60, 400)),
+        "token per event, 4 KiB reads": record(tokens, (4096, 4096)),
+        "20 words per event": record(sentences, (200, 1500)),
+    }
+
+
+def legacy(chunks):
+    """What _astream did: split lines, decode, strip, prefix checks, json.loads, +=."""
+    pending = b""
+    full_response = ""
+    for chunk in chunks:
+        pending += chunk
+        while True:
+            end = pending.find(b"\n")
+            if end < 0:
+                break
+            raw, pending = pending[:end + 1], pending[end + 1:]
+            line = raw.decode("utf-8").strip()
+            if not line:
+                continue
+            if line == "data: [DONE]":
+                return full_response
+            if line.startswith("data: "):
+                chunk_json = json.loads(line[6:])
+                delta = chunk_json.get("choices", [{}])[0].get("delta", {})
+                full_response += delta.get("content", "")
+    return full_response
+
+
+def incremental(chunks, extract=delta_content):
+    parser = SSEParser()
+    parts = []
+    for chunk in chunks:
+        for data in parser.feed(chunk):
+            if data == DONE:
+                return "".join(parts)
+            parts.append(extract(data))
+    return "".join(parts)
+
+
+def full_parse(loads):
+    def extract(data):
+        return (loads(data.decode("utf-8"))["choices"][0].get("delta") or {}).get("content") or ""
+    return extract
+
+
+def cases():
+    result = {
+        "line loop + json.loads + +=": legacy,
+        "SSEParser, full json.loads": lambda c: incremental(c, full_parse(json.loads)),
+    }
+    if sse.loads is not json.loads:
+        result["SSEParser, full orjson"] = lambda c: incremental(c, full_parse(sse.loads))
+    result["SSEParser + delta_content"] = incremental
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200, help="streams parsed per measurement")
+    parser.add_argument("--file", nargs="*", default=[], help="raw SSE captures to replay")
+    args = parser.parse_args()
+
+    streams = recordings()
+    for path in args.file:
+        with open(path, "rb") as f:
+            raw = f.read()
+        streams[path] = [raw[i:i + 1024] for i in range(0, len(raw), 1024)]
+
+    for name, chunks in streams.items():
+        size = sum(len(c) for c in chunks)
+        expected = legacy(chunks)
+        print(f"\n{name}: {len(chunks)} chunks, {size / 1024:.1f} KiB")
+        print(f"  {'parser':32} {'us/stream':>10} {'MB/s':>8}")
+        for label, parse in cases().items():
+            assert parse(chunks) == expected, f"{label} disagrees with the legacy parser"
+            best = min(timeit.repeat(lambda: parse(chunks), number=args.number, repeat=5)) / args.number
+            print(f"  {label:32} {best * 1e6:10.1f} {size / best / 1e6:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
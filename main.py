@@ -1,14 +1,35 @@
 # main.py
 import sys
 import os
+import json
+import logging
 import signal
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtCore import QTimer
 
 # Import MainWindow from src/ui
 from src.ui.main_window import MainWindow  # ✅ Clean import
+from src.utils.constants import LOGGER_DIR, LOGGER_NAME, SETTINGS_FILE
+from src.utils.logger import setup_daily_logger
+
+def configure_logging():
+    """Apply the logging options from settings before anything else grabs the logger."""
+    try:
+        with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
+            settings = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        settings = {}
+    setup_daily_logger(
+        name=LOGGER_NAME,
+        log_dir=LOGGER_DIR,
+        log_level=logging.getLevelName(settings.get("log_level", "INFO")),
+        use_queue=settings.get("log_async", 0) == 1,
+        json_output=settings.get("log_json", 0) == 1,
+        debug_sample_rate=settings.get("log_debug_sample_rate", 1.0),
+    )
 
 def main():
+    configure_logging()
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
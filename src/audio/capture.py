@@ -0,0 +1,80 @@
+import queue
+import time
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 16000   # what Whisper expects
+CHUNK_MS = 30
+
+
+def to_mono_16k(samples: np.ndarray, channels: int, rate: int) -> np.ndarray:
+    """Down-mix interleaved int16 frames and resample them to 16 kHz float32 in [-1, 1]."""
+    audio = samples.astype(np.float32) / 32768.0
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE and len(audio):
+        # linear interpolation is plenty for speech recognition input
+        target = int(round(len(audio) * SAMPLE_RATE / rate))
+        audio = np.interp(np.linspace(0, len(audio) - 1, target), np.arange(len(audio)), audio).astype(np.float32)
+    return audio
+
+
+class WavSource:
+    """Reads a 16-bit PCM WAV file in CHUNK_MS pieces, optionally paced like a live microphone."""
+
+    def __init__(self, path, realtime: bool = True, chunk_ms: int = CHUNK_MS):
+        self.path = path
+        self.realtime = realtime
+        self.chunk_ms = chunk_ms
+        self._stopped = False
+
+    def chunks(self):
+        with wave.open(str(self.path), "rb") as w:
+            if w.getsampwidth() != 2:
+                raise ValueError(f"{self.path}: only 16-bit PCM WAV is supported")
+            channels, rate = w.getnchannels(), w.getframerate()
+            frames = rate * self.chunk_ms // 1000
+            next_at = time.monotonic()
+            while not self._stopped:
+                data = w.readframes(frames)
+                if not data:
+                    break
+                yield to_mono_16k(np.frombuffer(data, dtype=np.int16), channels, rate)
+                if self.realtime:
+                    next_at += self.chunk_ms / 1000
+                    time.sleep(max(0.0, next_at - time.monotonic()))
+
+    def stop(self):
+        self._stopped = True
+
+
+class MicrophoneSource:
+    """Captures the default input device through sounddevice in CHUNK_MS pieces."""
+
+    def __init__(self, chunk_ms: int = CHUNK_MS, device=None):
+        self.chunk_ms = chunk_ms
+        self.device = device
+        self._queue = queue.Queue()
+        self._stopped = False
+
+    def _callback(self, indata, frames, time_info, status):
+        # runs on the audio thread: copy and hand off, nothing else
+        self._queue.put(indata[:, 0].copy())
+
+    def chunks(self):
+        try:
+            import sounddevice
+        except ImportError as e:
+            raise RuntimeError("microphone capture needs the sounddevice package") from e
+        blocksize = SAMPLE_RATE * self.chunk_ms // 1000
+        with sounddevice.InputStream(samplerate=SAMPLE_RATE, channels=1, dtype="float32",
+                                     blocksize=blocksize, device=self.device, callback=self._callback):
+            while not self._stopped:
+                try:
+                    yield self._queue.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+
+    def stop(self):
+        self._stopped = True
@@ -0,0 +1,154 @@
+import collections
+import concurrent.futures
+import threading
+import time
+
+from src.audio.capture import SAMPLE_RATE
+from src.audio.vad import EnergyVAD
+from src.utils.constants import LOGGER_DIR, LOGGER_NAME
+from src.utils.logger import setup_daily_logger
+
+WHISPER_MODEL = "small.en"
+TRANSCRIBE_WORKERS = 2
+PARTIAL_MS = 1000   # re-transcribe the utterance in progress this often
+
+
+class WhisperTranscriber:
+    """Local Whisper (faster-whisper) shared by a small pool of worker threads.
+
+    The model loads on first use (or an explicit load() from a worker
+    thread), so creating the transcriber never blocks the GUI.
+    """
+
+    def __init__(self, model_name: str = WHISPER_MODEL, workers: int = TRANSCRIBE_WORKERS,
+                 device: str = "auto", compute_type: str = "int8"):
+        self.logger = setup_daily_logger(name=LOGGER_NAME, log_dir=LOGGER_DIR)
+        self.model_name = model_name
+        self.workers = workers
+        self.device = device
+        self.compute_type = compute_type
+        self.language = "en" if model_name.endswith(".en") else None
+        self._model = None
+        self._lock = threading.Lock()
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="whisper")
+
+    def load(self):
+        with self._lock:
+            if self._model is None:
+                try:
+                    from faster_whisper import WhisperModel
+                except ImportError as e:
+                    raise RuntimeError("transcription needs the faster-whisper package") from e
+                start = time.perf_counter()
+                self._model = WhisperModel(self.model_name, device=self.device,
+                                           compute_type=self.compute_type, num_workers=self.workers)
+                self.logger.info("loaded whisper %s in %.1f s", self.model_name, time.perf_counter() - start)
+        return self._model
+
+    def transcribe(self, audio, beam_size: int = 1) -> str:
+        segments, _ = self.load().transcribe(audio, language=self.language, beam_size=beam_size,
+                                              condition_on_previous_text=False, vad_filter=False)
+        return "".join(segment.text for segment in segments).strip()
+
+    def submit(self, audio, beam_size: int = 1) -> concurrent.futures.Future:
+        return self._pool.submit(self.transcribe, audio, beam_size)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class TranscriptPipeline:
+    """Source chunks -> voice activity detection -> Whisper, emitting partial and final text.
+
+    While someone is speaking, the utterance so far is re-transcribed every
+    partial_ms, with at most one partial in flight. When the VAD closes the
+    utterance, the final transcript goes to the pool straight away. Finals are
+    delivered in speaking order, even if a later one finishes first.
+    """
+
+    def __init__(self, source, transcriber: WhisperTranscriber, on_partial=None, on_utterance=None,
+                 vad: EnergyVAD = None, partial_ms: int = PARTIAL_MS, beam_size: int = 1):
+        self.logger = setup_daily_logger(name=LOGGER_NAME, log_dir=LOGGER_DIR)
+        self.source = source
+        self.transcriber = transcriber
+        self.on_partial = on_partial
+        self.on_utterance = on_utterance
+        self.vad = vad or EnergyVAD()
+        self.partial_interval = partial_ms / 1000
+        self.beam_size = beam_size
+        self._finals = collections.deque()   # (future, utterance, closed_at) in speaking order
+        self._lock = threading.Lock()
+        self._deliver_lock = threading.Lock()
+        self._utterance_no = 0
+        self._partial = None
+        self._next_partial_at = None
+
+    def run(self):
+        """Blocks until the source is exhausted or stopped."""
+        for chunk in self.source.chunks():
+            utterance = self.vad.feed(chunk)
+            if utterance is not None:
+                self._finalize(utterance)
+            elif self.vad.in_speech:
+                self._maybe_partial()
+            else:
+                self._next_partial_at = None   # a burst too short to keep resets the clock
+        utterance = self.vad.flush()
+        if utterance is not None:
+            self._finalize(utterance)
+        with self._lock:
+            pending = [future for future, _, _ in self._finals]
+        concurrent.futures.wait(pending)
+        self._deliver()   # done callbacks may still be running; deliver before returning
+
+    def stop(self):
+        self.source.stop()
+
+    def _maybe_partial(self):
+        now = time.monotonic()
+        if self._next_partial_at is None:
+            self._next_partial_at = now + self.partial_interval
+            return
+        if now < self._next_partial_at or (self._partial is not None and not self._partial.done()):
+            return
+        self._next_partial_at = now + self.partial_interval
+        number = self._utterance_no
+        self._partial = self.transcriber.submit(self.vad.current().audio)
+        self._partial.add_done_callback(lambda f: self._partial_done(f, number))
+
+    def _partial_done(self, future, number):
+        if future.cancelled() or future.exception() is not None or number != self._utterance_no:
+            return   # the utterance ended meanwhile; its final transcript supersedes this
+        if self.on_partial is not None and future.result():
+            self.on_partial(future.result())
+
+    def _finalize(self, utterance):
+        self._utterance_no += 1
+        self._next_partial_at = None
+        closed_at = time.perf_counter()
+        future = self.transcriber.submit(utterance.audio, self.beam_size)
+        with self._lock:
+            self._finals.append((future, utterance, closed_at))
+        future.add_done_callback(lambda _: self._deliver())
+
+    def _deliver(self):
+        # pops finished finals from the front only, one deliverer at a time, so order holds
+        with self._deliver_lock:
+            self._deliver_ready()
+
+    def _deliver_ready(self):
+        while True:
+            with self._lock:
+                if not self._finals or not self._finals[0][0].done():
+                    return
+                future, utterance, closed_at = self._finals.popleft()
+            latency_ms = (time.perf_counter() - closed_at) * 1000
+            try:
+                text = future.result()
+            except Exception as e:
+                self.logger.error("transcribing %.1fs of audio failed: %s", len(utterance.audio) / SAMPLE_RATE, e)
+                continue
+            self.logger.info("utterance %.1f-%.1fs transcribed %.0f ms after speech ended",
+                             utterance.started, utterance.ended, latency_ms)
+            if text and self.on_utterance is not None:
+                self.on_utterance(text, latency_ms)
@@ -0,0 +1,101 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from src.audio.capture import SAMPLE_RATE
+
+SPEECH_RATIO = 3.0        # speech is this many times louder than the noise floor
+MIN_SPEECH_RMS = 0.01     # ...and never quieter than this
+SILENCE_MS = 600          # this much quiet ends an utterance
+MIN_UTTERANCE_MS = 300    # shorter bursts are clicks and coughs
+MAX_UTTERANCE_MS = 30000  # Whisper's window; longer speech is cut here
+PREROLL_MS = 200          # audio kept from before speech was detected
+
+
+@dataclass
+class Utterance:
+    audio: np.ndarray
+    started: float    # seconds since the source started
+    ended: float
+    final: bool
+
+
+class EnergyVAD:
+    """Energy-based voice activity detection that splits a chunk stream into utterances.
+
+    The noise floor tracks quiet chunks with a slow moving average, so the
+    detector adapts to fans and room tone without any calibration.
+    """
+
+    def __init__(self, silence_ms: int = SILENCE_MS, min_utterance_ms: int = MIN_UTTERANCE_MS,
+                 max_utterance_ms: int = MAX_UTTERANCE_MS, speech_ratio: float = SPEECH_RATIO):
+        self.silence_samples = SAMPLE_RATE * silence_ms // 1000
+        self.min_samples = SAMPLE_RATE * min_utterance_ms // 1000
+        self.max_samples = SAMPLE_RATE * max_utterance_ms // 1000
+        self.preroll_samples = SAMPLE_RATE * PREROLL_MS // 1000
+        self.speech_ratio = speech_ratio
+        self.noise_floor = MIN_SPEECH_RMS / speech_ratio
+        self.position = 0          # samples seen so far
+        self._preroll = []
+        self._speech = []
+        self._speech_samples = 0
+        self._preroll_len = 0
+        self._silence = 0
+        self._started = 0
+
+    @property
+    def in_speech(self) -> bool:
+        return bool(self._speech)
+
+    def is_speech(self, chunk: np.ndarray) -> bool:
+        rms = float(np.sqrt(np.mean(chunk * chunk))) if len(chunk) else 0.0
+        speech = rms >= max(MIN_SPEECH_RMS, self.noise_floor * self.speech_ratio)
+        if not speech:
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * rms
+        return speech
+
+    def feed(self, chunk: np.ndarray) -> Optional[Utterance]:
+        """Consume one chunk; returns an utterance once it is over, else None."""
+        speech = self.is_speech(chunk)
+        self.position += len(chunk)
+        if not self._speech:
+            if speech:
+                self._started = self.position - len(chunk) - sum(len(c) for c in self._preroll)
+                self._speech = self._preroll + [chunk]
+                self._preroll_len = sum(len(c) for c in self._preroll)
+                self._speech_samples = self._preroll_len + len(chunk)
+                self._silence = 0
+                self._preroll = []
+            else:
+                self._preroll.append(chunk)
+                while sum(len(c) for c in self._preroll) > self.preroll_samples:
+                    self._preroll.pop(0)
+            return None
+        self._speech.append(chunk)
+        self._speech_samples += len(chunk)
+        self._silence = 0 if speech else self._silence + len(chunk)
+        if self._silence >= self.silence_samples or self._speech_samples >= self.max_samples:
+            return self._close()
+        return None
+
+    def current(self) -> Optional[Utterance]:
+        """The utterance in progress so far, for partial transcripts."""
+        if not self._speech:
+            return None
+        return Utterance(np.concatenate(self._speech), self._started / SAMPLE_RATE,
+                         self.position / SAMPLE_RATE, final=False)
+
+    def flush(self) -> Optional[Utterance]:
+        """End of input: close whatever is still being spoken."""
+        return self._close() if self._speech else None
+
+    def _close(self):
+        audio = np.concatenate(self._speech)
+        # drop the trailing silence, it only costs decode time
+        audio = audio[:max(len(audio) - self._silence, 0)]
+        voiced = len(audio) - self._preroll_len
+        self._speech, self._speech_samples, self._silence = [], 0, 0
+        if voiced < self.min_samples:
+            return None
+        return Utterance(audio, self._started / SAMPLE_RATE, self.position / SAMPLE_RATE, final=True)
@@ -0,0 +1,168 @@
+# chat/batch.py
+"""Answer many transcripts at once through the non-streaming path.
+
+    python -m src.chat.batch interview.txt --out answers.jsonl --workers 8 [--model NAME] [--cache]
+
+Input is a .txt file with one transcript per blank-line separated block, or a
+.jsonl file with a "transcript" (or "question") field per line. Answers are
+written as JSON lines in the order they complete.
+"""
+import argparse
+import concurrent.futures
+import json
+import queue
+import sys
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Iterator, Optional
+
+from src.chat.cache import DISK_MAX_MB, MEMORY_ITEMS, TTL_HOURS, ResponseCache, cache_key
+from src.chat.prompts import PromptRegistry, PROMPT_NAME, LANGUAGE
+from src.chat.window import CONTEXT_BUDGET_TOKENS
+from src.llm.http import connection_pool
+from src.llm.ratelimit import rate_limits
+from src.llm.resilience import Failover, RetryPolicy
+from src.llm.wrapper import LLMWrapper
+from src.utils.constants import LOGGER_DIR, LOGGER_NAME, SETTINGS_FILE
+from src.utils.logger import setup_daily_logger
+from src.utils.perf import percentile
+from src.utils.tokens import count_tokens, tail_tokens
+
+BATCH_WORKERS = 4
+BATCH_DEADLINE_S = 300      # a batch may sit out rate limits far longer than a live question
+
+
+@dataclass
+class BatchResult:
+    index: int
+    transcript: str
+    answer: Optional[str]
+    model: str
+    latency_ms: float
+    error: Optional[str] = None
+
+
+class BatchRunner:
+    """Runs transcripts through one model on a bounded thread pool.
+
+    Results are yielded as they complete, not in input order. Each result
+    carries its input index. Only `workers` requests are in flight at once,
+    and the HTTP pool keeps that many sockets open to the endpoint.
+    """
+
+    def __init__(self, llm: LLMWrapper, prompt, workers: int = BATCH_WORKERS,
+                 budget: int = CONTEXT_BUDGET_TOKENS):
+        self.logger = setup_daily_logger(name=LOGGER_NAME, log_dir=LOGGER_DIR)
+        self.llm = llm
+        self.prompt = prompt
+        self.workers = workers
+        self.budget = budget
+        self.latencies = []
+        self.failed = 0
+        self.output_tokens = 0
+        self.wall_s = 0.0
+
+    def _one(self, index, transcript):
+        start = time.perf_counter()
+        text = self.prompt.render(tail_tokens(transcript, self.budget))
+        try:
+            # the shared limiter keeps the workers under the endpoint's rpm/tpm
+            failover = Failover([self.llm], RetryPolicy(deadline_s=BATCH_DEADLINE_S))
+            answer = failover.call(lambda llm, timeout: llm._call(text, timeout=timeout), text)
+            error = None
+        except Exception as e:
+            answer, error = None, str(e)
+        return BatchResult(index, transcript, answer, self.llm.model, (time.perf_counter() - start) * 1000, error)
+
+    def run(self, transcripts) -> Iterator[BatchResult]:
+        connection_pool.reserve(self.workers)
+        start = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch") as pool:
+            futures = [pool.submit(self._one, i, t) for i, t in enumerate(transcripts)]
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    result = future.result()
+                    self.latencies.append(result.latency_ms)
+                    if result.error is not None:
+                        self.failed += 1
+                        self.logger.warning("batch item %d failed: %s", result.index, result.error)
+                    else:
+                        self.output_tokens += count_tokens(result.answer)
+                    self.wall_s = time.perf_counter() - start
+                    yield result
+            finally:
+                # a consumer that stops early should not leave the queue running
+                for future in futures:
+                    future.cancel()
+
+    def summary(self) -> dict:
+        done = len(self.latencies)
+        wall = self.wall_s or float("nan")
+        return {
+            "model": self.llm.model,
+            "workers": self.workers,
+            "completed": done - self.failed,
+            "failed": self.failed,
+            "wall_s": round(self.wall_s, 2),
+            "requests_per_s": round(done / wall, 2) if done else 0.0,
+            "output_tokens_per_s": round(self.output_tokens / wall, 1) if done else 0.0,
+            "latency_ms_p50": round(percentile(self.latencies, 50), 1) if done else None,
+            "latency_ms_p95": round(percentile(self.latencies, 95), 1) if done else None,
+        }
+
+
+def read_transcripts(path) -> list[str]:
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".jsonl":
+        rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+        return [row.get("transcript") or row.get("question") for row in rows]
+    return [block.strip() for block in text.split("\n\n") if block.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Answer a file of transcripts in one batch.")
+    parser.add_argument("input", help=".txt (blank-line separated) or .jsonl transcripts")
+    parser.add_argument("--out", help="JSON lines output (default: stdout)")
+    parser.add_argument("--model", help="model name from settings (default: the current model)")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--cache", action="store_true", help="also store answers in the response cache")
+    args = parser.parse_args(argv)
+
+    with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
+        settings = json.load(f)
+    name = args.model or settings.get("model_name")
+    config = next((m for m in settings.get("models", []) if m.get("name") == name), None)
+    if config is None:
+        parser.error(f"model {name!r} is not configured in {SETTINGS_FILE}")
+    rate_limits.configure(settings.get("models", []))
+    llm = LLMWrapper.from_config(config, queue.Queue())
+    registry = PromptRegistry(settings.get("prompts"), language=settings.get("answer_language", LANGUAGE))
+    prompt = registry.get(settings.get("prompt_name", PROMPT_NAME))
+    budget = config.get("context_tokens") or settings.get("context_budget_tokens", CONTEXT_BUDGET_TOKENS)
+    cache = None
+    if args.cache:
+        cache = ResponseCache(memory_items=settings.get("cache_memory_items", MEMORY_ITEMS),
+                              disk_max_mb=settings.get("cache_disk_mb", DISK_MAX_MB),
+                              ttl_hours=settings.get("cache_ttl_hours", TTL_HOURS))
+
+    transcripts = read_transcripts(args.input)
+    runner = BatchRunner(llm, prompt, workers=args.workers, budget=budget)
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    try:
+        for result in runner.run(transcripts):
+            out.write(json.dumps(asdict(result), ensure_ascii=False) + "\n")
+            out.flush()
+            if cache is not None and result.answer:
+                # same key as the live path, so the answer bank serves live questions
+                cache.put(cache_key(result.transcript, llm.model, registry.language, prompt.version),
+                          result.answer, model=llm.model)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(json.dumps(runner.summary()), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
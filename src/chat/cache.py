@@ -0,0 +1,136 @@
+import concurrent.futures
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from src.utils.constants import CACHE_DIR, LOGGER_DIR, LOGGER_NAME
+from src.utils.logger import setup_daily_logger
+
+MEMORY_ITEMS = 256
+DISK_MAX_MB = 50
+TTL_HOURS = 24 * 7
+
+_PUNCT = re.compile(r"[^\w\s]")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so trivial variants share a key."""
+    return _SPACE.sub(" ", _PUNCT.sub(" ", text.lower())).strip()
+
+
+def cache_key(transcript: str, model: str, language: str, prompt_version: str) -> str:
+    raw = "\x1f".join([normalize(transcript), model or "", language, prompt_version])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier answer cache: an in-memory LRU in front of a size-bounded directory of JSON files.
+
+    Entries older than the TTL are treated as misses in both tiers. When the
+    disk tier grows past its budget the least recently used files are removed.
+    put() only updates memory inline; files are written and evicted on the
+    cache's own thread, because put() runs on the engine loop.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, memory_items: int = MEMORY_ITEMS,
+                 disk_max_mb: float = DISK_MAX_MB, ttl_hours: float = TTL_HOURS):
+        self.logger = setup_daily_logger(name=LOGGER_NAME, log_dir=LOGGER_DIR)
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.memory_items = memory_items
+        self.disk_max_bytes = int(disk_max_mb * 1024 * 1024)
+        self.ttl = ttl_hours * 3600
+        self._memory = OrderedDict()   # key -> (created, answer)
+        self._lock = threading.Lock()
+        self._disk_bytes = sum(f.stat().st_size for f in self.cache_dir.glob("*.json"))
+        self.hits = 0
+        self.misses = 0
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="response-cache")
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _remember(self, key, created, answer):
+        self._memory[key] = (created, answer)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._memory[key]
+
+        path = self._path(key)
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        if now - record["created"] > self.ttl:
+            self._remove(path)
+            self.misses += 1
+            return None
+        os.utime(path)   # mtime doubles as last-used time for eviction
+        with self._lock:
+            self._remember(key, record["created"], record["answer"])
+            self.hits += 1
+        return record["answer"]
+
+    def put(self, key: str, answer: str, **meta) -> concurrent.futures.Future:
+        """Remember an answer; the returned future resolves once it is on disk."""
+        created = time.time()
+        with self._lock:
+            self._remember(key, created, answer)
+        return self._pool.submit(self._write, key, created, answer, meta)
+
+    def _write(self, key, created, answer, meta):
+        path = self._path(key)
+        data = json.dumps({"created": created, "answer": answer, **meta}, ensure_ascii=False)
+        try:
+            old_size = path.stat().st_size if path.exists() else 0
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(data, encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            self.logger.warning("response cache write failed: %s", e)
+            return
+        with self._lock:
+            self._disk_bytes += path.stat().st_size - old_size
+        if self._disk_bytes > self.disk_max_bytes:
+            self._evict()
+
+    def _remove(self, path: Path):
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        with self._lock:
+            self._disk_bytes -= size
+
+    def _evict(self):
+        # drop least recently used files until we are back under 90% of the budget
+        files = sorted(self.cache_dir.glob("*.json"), key=lambda f: f.stat().st_mtime)
+        target = self.disk_max_bytes * 0.9
+        removed = 0
+        for f in files:
+            if self._disk_bytes <= target:
+                break
+            self._remove(f)
+            removed += 1
+        self.logger.info("response cache evicted %d entries (%d bytes on disk)", removed, self._disk_bytes)
@@ -1,10 +1,63 @@
-from langchain.prompts import PromptTemplate
 from langchain.agents import Tool
+import concurrent.futures
 import threading
 import time 
 import os
 
-from src.utils.perf import timer 
+from src.llm.engine import get_engine
+from src.llm.resilience import Failover, RetryPolicy
+from src.llm.wrapper import LLMWrapper
+from src.chat.cache import ResponseCache, cache_key
+from src.chat.similarity import SimilarityIndex
+from src.chat.gate import QuestionGate
+from src.chat.prompts import PromptRegistry
+from src.chat.window import TranscriptWindow
+from src.workers.messages import ResultChannel
+from src.utils.perf import StreamStats
+from src.utils.constants import LOGGER_DIR, LOGGER_NAME
+from src.utils.logger import setup_daily_logger, correlation_id
+from src.utils.tokens import count_tokens
+
+
+class InflightRequest:
+    """One running completion: its channel, future and the text streamed so far."""
+
+    def __init__(self, channel, input_text):
+        self.channel = channel
+        self.input_text = input_text
+        self.start = time.perf_counter()
+        self.future = None
+        self.parts = []
+        self.stats = StreamStats(channel.model)
+        self.failed_over_from = None
+
+    @property
+    def request_id(self):
+        return self.channel.request_id
+
+    def on_delta(self, text):
+        if self.future is not None and self.future.cancelled():
+            return
+        self.parts.append(text)
+        self.channel.delta(text)
+
+    def switch(self, llm, error=None):
+        """Another model took over after a failure; later messages carry its name."""
+        if self.failed_over_from is None:
+            self.failed_over_from = self.channel.model
+        self.channel.model = llm.model
+
+    def partial(self):
+        return "".join(self.parts)
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.start) * 1000
+
+    def metrics(self, exec_time):
+        metrics = {**self.stats.summary(), "exec_time_ms": exec_time}
+        if self.failed_over_from is not None:
+            metrics["failed_over_from"] = self.failed_over_from
+        return metrics
 
 
 # Chat Module (v1)
@@ -12,44 +65,164 @@ class ChatModule():
     def __init__(self, llm, app):
         self.llm = llm
         self.app = app
+        self.engine = get_engine()
+        self.logger = setup_daily_logger(name=LOGGER_NAME, log_dir=LOGGER_DIR)
+        self.inflight = {}   # request id -> InflightRequest
+        self.cache = None
+        if self.app.settings.is_cache_enabled():
+            self.cache = ResponseCache(memory_items=self.app.settings.get_cache_memory_items(),
+                                       disk_max_mb=self.app.settings.get_cache_disk_mb(),
+                                       ttl_hours=self.app.settings.get_cache_ttl_hours())
+        self.similar = None
+        if self.app.settings.is_similarity_enabled():
+            self.similar = SimilarityIndex(threshold=self.app.settings.get_similarity_threshold())
+            self.similar.load_sessions_async()
+        self.prompts = PromptRegistry(self.app.settings.get_prompt_templates(),
+                                      language=self.app.settings.get_answer_language())
+        self.prompt = self.prompts.get(self.app.settings.get_prompt_name())
+        self.window = TranscriptWindow(max_budget=self.app.settings.get_max_context_budget())
+        self.gate = None
+        if self.app.settings.is_question_gate_enabled():
+            self.gate = QuestionGate(threshold=self.app.settings.get_question_gate_threshold())
+
+    def build_prompt(self):
+        """The configured prompt, compiled once when the module was created."""
+        return self.prompt
+
+    def hear(self, utterance):
+        """Add an utterance to the transcript window, whether or not it is asked about."""
+        self.window.add(utterance)
 
-    def chat_with_llm(self, input_text):
-        language = "Golang"
-        prompt = PromptTemplate(
-            input_variables=["question", "language"],
-            template=(
-                    "You are given a transcript extracted from an audio recording. "
-                    "This transcript may contain irrelevant discussion or non-technical content.\n\n "
-                    "Your task is to:\n"
-                    "1. Identify and extract the most relevant technical question from the transcript below.\n"
-                    "2. Determine whether the question is theoretical(e.g., concept explanation) or practical (e.g., requires code).\n"
-                    "3. If theoretical, provide a clear and concise explanation.\n" 
-                    "4. If practical, provide a concise, correct code solution in {language}.\n"
-                    "If no language is mentioned or it's unclear, default to Python.\n\n"
-                    "Transcript:\n{question}\n\n"
-                    "Respond in the following format:\n"
-                    "Question: <extracted question>\n"
-                    "Answer:\n```{language}\n<code here>\n```"
-            )
-        )
-        
-        # prompt = PromptTemplate(
-        #         input_variables=["input"],
-        #         template="Respond to this user message: {input}"
-        # )
-
-        if self.app.settings.is_steaming() == 1:
-            with timer() as t:
-                response = self.llm._call_stream(prompt.format(question=input_text, language=language))
-            exec_time = (t[1] - t[0]) * 1000
-            self.app.answer_queue.put(f"llm exec time : {exec_time}")
-            self.app.session.log_interaction(input_text, response, exec_time,self.llm.model)
+    def transcript_for(self, question, model):
+        """The windowed transcript for a question, bounded by the model's context budget."""
+        budget = self.app.settings.get_context_budget(model)
+        self.window.ask(question)
+        transcript = self.window.render(budget)
+        self.logger.info("transcript for %s: %d tokens (budget %d)", model, count_tokens(transcript), budget)
+        return transcript
+
+    def retry_policy(self):
+        settings = self.app.settings
+        return RetryPolicy(attempts=settings.get_retry_attempts(), deadline_s=settings.get_request_deadline_s(),
+                           first_token_s=settings.get_first_token_timeout_s())
+
+    def failover_for(self, request, llm):
+        """`llm` first, then the configured models after it in settings order."""
+        candidates = [llm]
+        if self.app.settings.is_failover_enabled():
+            names = self.app.settings.get_model_names()
+            start = names.index(llm.model) + 1 if llm.model in names else 0
+            for name in names[start:] + names[:start]:
+                if name != llm.model:
+                    candidates.append(LLMWrapper.from_config(self.app.settings.get_model_config(name),
+                                                             self.app.answer_queue))
+        return Failover(candidates, self.retry_policy(), on_switch=request.switch)
+
+    def screen(self, transcript):
+        """Run the local question gate on a transcript; None when the gate is off."""
+        if self.gate is None:
+            return None
+        return self.gate.check(transcript)
+
+    def chat_with_llm(self, input_text, request_id=None):
+        """Submit the transcript to the engine; returns a future for the full answer."""
+        request = InflightRequest(ResultChannel(self.app.answer_queue, request_id, model=self.llm.model), input_text)
+        # the engine task inherits this context, so its records carry the id too
+        with correlation_id(request.request_id):
+            return self._submit(request, input_text)
+
+    def _submit(self, request, input_text):
+        llm = self.llm    # the model selected now, even if the selection changes while this runs
+        prompt = self.build_prompt()
+        streamed = self.app.settings.is_steaming() == 1
+        key = None
+        if self.cache is not None:
+            # the prompt version is a hash of the compiled template, so edits invalidate old answers
+            key = cache_key(input_text, llm.model, self.prompts.language, prompt.version)
+            answer = self.cache.get(key)
+            if answer is not None:
+                return self._replay(request, answer)
+        if self.similar is not None:
+            # show the closest earlier answer while the live call runs; looked up off the GUI thread
+            self.similar.lookup_async(input_text).add_done_callback(lambda f: self._hint(request, f))
+        text = prompt.render(self.transcript_for(input_text, llm.model))
+        failover = self.failover_for(request, llm)
+        if streamed:
+            future = self.engine.stream(llm, text, on_delta=request.on_delta, stats=request.stats,
+                                        failover=failover)
         else:
-            with timer() as t:
-                response = self.llm(prompt.format(input=input_text))
-                self.app.answer_queue.put(response)
-            exec_time = (t[1] - t[0]) * 1000
-            self.app.answer_queue.put(f"llm exec time : {exec_time}")
-            self.app.session.log_interaction(input_text, response, exec_time,self.llm.model)
-    
+            future = self.engine.call(llm, text, failover=failover)
+        request.future = future
+        self.inflight[request.request_id] = request
+        future.add_done_callback(lambda f: self._on_done(request, streamed, key))
+        return future
+
+    def _hint(self, request, future):
+        if future.exception() is not None:
+            self.logger.warning("similarity lookup for %s failed: %s", request.request_id, future.exception())
+            return
+        match = future.result()
+        # a hint that lost the race with the answer would land in the middle of it
+        if match is None or request.parts or request.future is not None and request.future.done():
+            return
+        self.logger.info("chat %s similar to earlier question (%.2f)", request.request_id, match["score"])
+        request.channel.hint(match)
+
+    def _replay(self, request, answer):
+        """Serve a cached answer straight into the display; no request leaves the machine."""
+        channel = request.channel
+        channel.delta(answer)
+        exec_time = request.elapsed_ms()
+        channel.metric({"cached": True, "exec_time_ms": exec_time})
+        channel.done()
+        self.logger.info("chat %s served from cache in %.1f ms", channel.request_id, exec_time)
+        self.app.session.log_interaction(request.input_text, answer, exec_time, channel.model,
+                                         request_id=channel.request_id, metrics={"cached": True})
+        future = concurrent.futures.Future()
+        future.set_result(answer)
+        return future
+
+    def cancel(self, request_id) -> bool:
+        """Stop a running completion; its HTTP request is aborted and the partial answer is logged."""
+        request = self.inflight.get(request_id)
+        if request is None:
+            return False
+        return request.future.cancel()
+
+    def cancel_all(self):
+        for request_id in list(self.inflight):
+            self.cancel(request_id)
+
+    def _on_done(self, request, streamed, key=None):
+        """Runs once a completion finishes, fails or is cancelled."""
+        with correlation_id(request.request_id):
+            self._finish(request, streamed, key)
 
+    def _finish(self, request, streamed, key):
+        self.inflight.pop(request.request_id, None)
+        channel = request.channel
+        exec_time = request.elapsed_ms()
+        if request.future.cancelled():
+            self.logger.info("chat %s with %s cancelled after %.0f ms", channel.request_id, channel.model, exec_time)
+            channel.cancelled()
+            self.app.session.log_interaction(request.input_text, request.partial(), exec_time,
+                                             channel.model, truncated=True, request_id=channel.request_id,
+                                             metrics=request.stats.summary())
+            return
+        try:
+            response = request.future.result()
+        except Exception as e:
+            self.logger.error("chat %s with %s failed: %s", channel.request_id, channel.model, e)
+            channel.error(str(e))
+            return
+        if not streamed:
+            channel.delta(response)
+        channel.metric(request.metrics(exec_time))
+        channel.done()
+        # a fallback's answer is not cached under the primary model's key
+        if key is not None and response and request.failed_over_from is None:
+            self.cache.put(key, response, model=channel.model)
+        if self.similar is not None:
+            self.similar.add_async(request.input_text, response, channel.model)
+        self.app.session.log_interaction(request.input_text, response, exec_time, channel.model,
+                                         request_id=channel.request_id, metrics=request.stats.summary())
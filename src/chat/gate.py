@@ -0,0 +1,172 @@
+import re
+import time
+import zlib
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.chat.cache import normalize
+from src.utils.constants import LOGGER_DIR, LOGGER_NAME
+from src.utils.logger import setup_daily_logger
+
+GATE_THRESHOLD = 0.5
+HASH_DIM = 2 ** 12
+RULE_WEIGHT = 0.4   # share of the final score given to the rules; the model gets the rest
+
+SENTENCE = re.compile(r"[^.?!]+[.?!]*")
+INTERROGATIVE = re.compile(
+    r"^(what|whats|how|why|when|where|which|who|can|could|would|should|is|are|does|do|did|will|"
+    r"explain|describe|define|compare|implement|write|design|walk me through|tell me about|"
+    r"difference between|what's)\b")
+TECHNICAL = frozenset("""
+algorithm api array async await binary bit bloom btree buffer bug cache channel class closure code
+complexity concurrency consistency container cpu database deadlock deployment design distributed
+docker dns filter function garbage gc golang goroutine graph hash hashing heap http index inheritance
+interface java javascript join kafka kubernetes latency linked list lock loop map memory microservice
+mutex network node object partition pointer polymorphism process protocol python query queue race
+recursion redis replica replication rest scaling schema select server shard sharding socket sort sql
+stack string struct system table tcp thread throughput transaction tree type udp variable vector
+""".split())
+FILLER = re.compile(r"\b(um+|uh+|er+|ah+|like|you know|i mean|so|okay|ok|right|yeah|well)\b[,]?\s*")
+
+# seed corpus for the model; positives are technical questions, negatives the talk around them
+SEED_QUESTIONS = [
+    "how does a goroutine differ from an os thread",
+    "what is the time complexity of inserting into a hash map",
+    "can you explain how consistent hashing works",
+    "write a function to reverse a linked list",
+    "how would you design a rate limiter for an api",
+    "what happens when two transactions update the same row",
+    "explain the difference between a process and a thread",
+    "how do you detect a deadlock in a concurrent program",
+    "what is a closure in javascript",
+    "how does garbage collection work in go",
+    "implement a lru cache with o(1) operations",
+    "why would you use a channel instead of a mutex",
+    "how does tcp guarantee ordered delivery",
+    "what are the trade offs of sharding a database",
+    "describe how an index speeds up a sql query",
+    "how would you find the kth largest element in an array",
+    "what is the difference between rest and grpc",
+    "how does kafka keep messages ordered within a partition",
+    "what is eventual consistency",
+    "how do you avoid race conditions when updating shared state",
+]
+SEED_SMALL_TALK = [
+    "can you hear me okay",
+    "let me share my screen",
+    "how are you doing today",
+    "thanks for joining the call",
+    "sorry i was on mute",
+    "give me a second to pull that up",
+    "yeah that sounds good",
+    "we have about thirty minutes left",
+    "is it raining where you are",
+    "okay let's move on to the next part",
+    "can you see my screen now",
+    "i think we lost you for a second",
+    "what time is it over there",
+    "nice to meet you",
+    "should we take a short break",
+    "i'll send you the link after the call",
+    "do you have any questions for us",
+    "how was your weekend",
+    "let me know when you're ready",
+    "great thanks a lot",
+]
+
+
+@dataclass
+class GateDecision:
+    is_question: bool
+    score: float
+    rule_score: float
+    model_score: float
+    span: str
+    elapsed_ms: float
+
+
+def features(text: str) -> np.ndarray:
+    """Hashed bag of words and bigrams, L2-normalised."""
+    words = normalize(text).split()
+    vec = np.zeros(HASH_DIM, dtype=np.float32)
+    for term in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        vec[zlib.crc32(term.encode("utf-8")) % HASH_DIM] += 1.0
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+def rule_score(sentence: str) -> float:
+    text = FILLER.sub("", normalize(sentence))
+    words = text.split()
+    if len(words) < 3:
+        return 0.0
+    # asking something is half the evidence, talking about technology the other half
+    score = 0.0
+    if sentence.rstrip().endswith("?"):
+        score += 0.2
+    if INTERROGATIVE.match(text):
+        score += 0.3
+    hits = sum(1 for w in words if w in TECHNICAL or w.rstrip("s") in TECHNICAL)
+    score += min(0.5, 0.25 * hits)
+    return min(score, 1.0)
+
+
+class QuestionGate:
+    """Decides locally whether a transcript holds a technical question, and where it is.
+
+    Each sentence is scored by a few rules (question mark, interrogative
+    opening, technical vocabulary) blended with a tiny logistic regression
+    over hashed n-grams. The model is trained on the seed corpus when the
+    gate is created, which takes a few milliseconds.
+    """
+
+    def __init__(self, threshold: float = GATE_THRESHOLD, extra_questions=()):
+        self.logger = setup_daily_logger(name=LOGGER_NAME, log_dir=LOGGER_DIR)
+        self.threshold = threshold
+        start = time.perf_counter()
+        self.weights, self.bias = self._train(list(SEED_QUESTIONS) + list(extra_questions), SEED_SMALL_TALK)
+        self.logger.info("question gate trained in %.1f ms", (time.perf_counter() - start) * 1000)
+
+    @staticmethod
+    def _train(positives, negatives, epochs: int = 200, lr: float = 0.5):
+        x = np.stack([features(t) for t in positives + negatives])
+        y = np.array([1.0] * len(positives) + [0.0] * len(negatives), dtype=np.float32)
+        w = np.zeros(HASH_DIM, dtype=np.float32)
+        b = 0.0
+        for _ in range(epochs):
+            p = 1 / (1 + np.exp(-(x @ w + b)))
+            grad = p - y
+            w -= lr * (x.T @ grad / len(y) + 1e-3 * w)
+            b -= lr * float(grad.mean())
+        return w, b
+
+    def model_scores(self, sentences) -> np.ndarray:
+        x = np.stack([features(s) for s in sentences])
+        return 1 / (1 + np.exp(-(x @ self.weights + self.bias)))
+
+    def check(self, transcript: str) -> GateDecision:
+        start = time.perf_counter()
+        sentences = [s.strip() for s in SENTENCE.findall(transcript) if s.strip()]
+        if not sentences:
+            return GateDecision(False, 0.0, 0.0, 0.0, "", (time.perf_counter() - start) * 1000)
+        rules = np.array([rule_score(s) for s in sentences])
+        model = self.model_scores(sentences)
+        scores = RULE_WEIGHT * rules + (1 - RULE_WEIGHT) * model
+        best = int(np.argmax(scores))
+        # a follow-up sentence that also scores as a question belongs to the same ask
+        end = best + 1
+        while end < len(sentences) and scores[end] >= self.threshold:
+            end += 1
+        decision = GateDecision(
+            is_question=bool(scores[best] >= self.threshold),
+            score=float(scores[best]),
+            rule_score=float(rules[best]),
+            model_score=float(model[best]),
+            span=" ".join(sentences[best:end]),
+            elapsed_ms=(time.perf_counter() - start) * 1000,
+        )
+        self.logger.info("gate %s score=%.2f (rules %.2f, model %.2f) in %.2f ms: %r",
+                         "pass" if decision.is_question else "skip", decision.score,
+                         decision.rule_score, decision.model_score, decision.elapsed_ms, decision.span[:120])
+        return decision
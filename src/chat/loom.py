@@ -0,0 +1,113 @@
+import time
+
+from src.llm.engine import get_engine
+from src.llm.resilience import Failover
+from src.llm.wrapper import LLMWrapper
+from src.utils.constants import LOGGER_DIR, LOGGER_NAME
+from src.utils.logger import setup_daily_logger, correlation_id
+from src.chat.chat import InflightRequest
+from src.workers.messages import ResultChannel, new_request_id
+
+
+def stream_id(request_id, model_name):
+    """Request id of one model's stream within a loom."""
+    return f"{request_id}/{model_name}"
+
+
+# Loom Module: one transcript, many models
+class LoomModule():
+    """Fans one transcript out to several models at once.
+
+    Each model streams on its own channel (see stream_id). In race mode the
+    first model to produce a token wins; the other streams are cancelled and
+    only the winner keeps rendering.
+    """
+
+    def __init__(self, chat_module, app):
+        self.chat_module = chat_module
+        self.app = app
+        self.engine = get_engine()
+        self.logger = setup_daily_logger(name=LOGGER_NAME, log_dir=LOGGER_DIR)
+        self.inflight = {}   # stream id -> InflightRequest
+
+    def _wrapper_for(self, name):
+        return LLMWrapper.from_config(self.app.settings.get_model_config(name), self.app.answer_queue)
+
+    def weave(self, input_text, model_names, race=False, request_id=None):
+        """Start one stream per model; returns {model_name: future}."""
+        request_id = request_id or new_request_id()
+        prompt = self.chat_module.build_prompt()
+        start = time.perf_counter()
+        futures = {}
+        requests = {name: InflightRequest(ResultChannel(self.app.answer_queue, stream_id(request_id, name),
+                                                        model=name), input_text)
+                    for name in model_names}
+        state = {"winner": None}
+
+        def cancel(name):
+            # the future may not exist yet if a rival streamed before every stream was submitted
+            if requests[name].future is not None:
+                requests[name].future.cancel()
+
+        def on_delta(name):
+            # runs on the engine loop thread, so the race state needs no lock
+            def _push(delta):
+                if race:
+                    if state["winner"] is None and delta:
+                        state["winner"] = name
+                        self.logger.info("loom %s race won by %s after %.0f ms", request_id,
+                                         name, (time.perf_counter() - start) * 1000)
+                        for loser in requests:
+                            if loser != name:
+                                cancel(loser)
+                    elif state["winner"] not in (None, name):
+                        # a loser that started streaming before it was cancelled
+                        cancel(name)
+                        return
+                requests[name].on_delta(delta)
+            return _push
+
+        for name in model_names:
+            llm = self._wrapper_for(name)
+            request = requests[name]
+            text = prompt.render(self.chat_module.transcript_for(input_text, name))
+            with correlation_id(request.request_id):
+                # retries only: each column is about one model, so no failover to the others
+                failover = Failover([llm], self.chat_module.retry_policy())
+                request.future = futures[name] = self.engine.stream(llm, text, on_delta=on_delta(name),
+                                                                    stats=request.stats, failover=failover)
+            self.inflight[request.request_id] = request
+            request.future.add_done_callback(lambda f, r=request: self._on_done(r))
+        self.logger.info("loom %s started for %s (race=%s)", request_id, ", ".join(model_names), race)
+        return futures
+
+    def cancel_all(self):
+        for request in list(self.inflight.values()):
+            request.future.cancel()
+
+    def _on_done(self, request):
+        with correlation_id(request.request_id):
+            self._finish(request)
+
+    def _finish(self, request):
+        self.inflight.pop(request.request_id, None)
+        channel = request.channel
+        exec_time = request.elapsed_ms()
+        if request.future.cancelled():
+            channel.cancelled()
+            # race losers never rendered anything, only log streams that were cut short
+            if request.parts:
+                self.app.session.log_interaction(request.input_text, request.partial(), exec_time,
+                                                 channel.model, truncated=True, request_id=channel.request_id,
+                                                 metrics=request.stats.summary())
+            return
+        try:
+            response = request.future.result()
+        except Exception as e:
+            self.logger.error("loom stream from %s failed: %s", channel.model, e)
+            channel.error(str(e))
+            return
+        channel.metric(request.metrics(exec_time))
+        channel.done()
+        self.app.session.log_interaction(request.input_text, response, exec_time, channel.model,
+                                         request_id=channel.request_id, metrics=request.stats.summary())
@@ -0,0 +1,101 @@
+import hashlib
+import string
+
+from src.utils.constants import LOGGER_DIR, LOGGER_NAME
+from src.utils.logger import setup_daily_logger
+
+PROMPT_NAME = "transcript"
+LANGUAGE = "Golang"
+
+# variables a template may use; "language" is fixed when the registry loads,
+# "question" is filled per request and must come last so everything before it is a stable prefix
+STATIC_VARIABLES = ("language",)
+REQUEST_VARIABLES = ("question",)
+
+DEFAULT_TEMPLATES = {
+    "transcript": (
+        "You are given a transcript extracted from an audio recording. "
+        "This transcript may contain irrelevant discussion or non-technical content.\n\n "
+        "Your task is to:\n"
+        "1. Identify and extract the most relevant technical question from the transcript below.\n"
+        "2. Determine whether the question is theoretical(e.g., concept explanation) or practical (e.g., requires code).\n"
+        "3. If theoretical, provide a clear and concise explanation.\n"
+        "4. If practical, provide a concise, correct code solution in {language}.\n"
+        "If no language is mentioned or it's unclear, default to Python.\n\n"
+        "Respond in the following format:\n"
+        "Question: <extracted question>\n"
+        "Answer:\n```{language}\n<code here>\n```\n\n"
+        "Transcript:\n{question}"
+    ),
+    "chat": "Respond to this user message: {question}",
+}
+
+
+class PromptError(ValueError):
+    pass
+
+
+class CompiledPrompt:
+    """A template split once into a static prefix and a per-request tail.
+
+    Rendering is one str.format on the tail. Providers that cache prompt
+    prefixes see the same leading bytes on every request.
+    """
+
+    __slots__ = ("name", "prefix", "tail", "version")
+
+    def __init__(self, name: str, template: str, language: str):
+        try:
+            fields = [field for _, field, _, _ in string.Formatter().parse(template) if field is not None]
+        except ValueError as e:
+            # an unmatched "{" or "}" anywhere in the template
+            raise PromptError(f"prompt {name!r} is malformed: {e}") from e
+        unknown = set(fields) - set(STATIC_VARIABLES) - set(REQUEST_VARIABLES)
+        if unknown:
+            raise PromptError(f"prompt {name!r} uses unknown variables {sorted(unknown)}")
+        if "question" not in fields:
+            raise PromptError(f"prompt {name!r} never uses {{question}}")
+        try:
+            template = template.replace("{language}", language)
+            head, _, tail = template.partition("{question}")
+            tail.format(question="")   # reject stray braces now rather than on the first request
+        except (ValueError, IndexError, KeyError) as e:
+            raise PromptError(f"prompt {name!r} is malformed: {e}") from e
+        self.name = name
+        # literal braces in the prefix were written doubled for str.format
+        self.prefix = head.replace("{{", "{").replace("}}", "}")
+        self.tail = "{question}" + tail
+        self.version = hashlib.sha1(template.encode("utf-8")).hexdigest()[:12]
+
+    def render(self, question: str) -> str:
+        return self.prefix + self.tail.format(question=question)
+
+
+class PromptRegistry:
+    """Named prompts compiled once at startup from the defaults plus the "prompts" setting."""
+
+    def __init__(self, templates: dict = None, language: str = LANGUAGE):
+        self.logger = setup_daily_logger(name=LOGGER_NAME, log_dir=LOGGER_DIR)
+        self.language = language
+        self._prompts = {}
+        for name, template in {**DEFAULT_TEMPLATES, **(templates or {})}.items():
+            try:
+                self._prompts[name] = CompiledPrompt(name, template, language)
+            except PromptError as e:
+                # a broken custom prompt should not take the defaults down with it
+                if name in DEFAULT_TEMPLATES and name in (templates or {}):
+                    self.logger.error("%s; using the built-in %r", e, name)
+                    self._prompts[name] = CompiledPrompt(name, DEFAULT_TEMPLATES[name], language)
+                else:
+                    self.logger.error("%s; skipped", e)
+        self.logger.info("prompt registry: %s (language %s)", ", ".join(sorted(self._prompts)), language)
+
+    def names(self) -> list[str]:
+        return sorted(self._prompts)
+
+    def get(self, name: str) -> CompiledPrompt:
+        prompt = self._prompts.get(name)
+        if prompt is None:
+            self.logger.warning("unknown prompt %r, using %r", name, PROMPT_NAME)
+            prompt = self._prompts[PROMPT_NAME]
+        return prompt
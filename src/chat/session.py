@@ -8,15 +8,29 @@ from pathlib import Path
 from src.utils.logger import setup_daily_logger
 
 import os
+import re
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
+from src.chat.store import SessionStore
+from src.chat.writer import SessionWriter, DURABILITY, BATCH_SIZE, FLUSH_MS
+
+QUESTION_LINE = re.compile(r"^Question (.+?) : (.*)$")
+RECENT_DAYS = 7
 
 class FlatChatSessionLogger:
-    def __init__(self, base_dir=SESSION_DIR):
+    def __init__(self, base_dir=SESSION_DIR, durability=DURABILITY, batch_size=BATCH_SIZE, flush_ms=FLUSH_MS):
         self.logger = setup_daily_logger(name=LOGGER_NAME, log_dir=LOGGER_DIR)
         self.base_dir = Path(base_dir)
         self.base_dir.mkdir(parents=True, exist_ok=True)
         self.session_file = None 
+        self.store = SessionStore()
+        self.store.sync_dir(self.base_dir)
+        # interactions are written off the answer path, in batches
+        self.writer = SessionWriter(self.store, durability=durability, batch_size=batch_size, flush_ms=flush_ms)
+        # bring legacy .txt sessions into the store once, off the GUI thread
+        threading.Thread(target=self.store.import_all, args=(self.base_dir, time.time()), daemon=True).start()
 
     def _create_session_file(self) -> Path:
         timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
@@ -24,30 +38,55 @@ class FlatChatSessionLogger:
         file_path.touch(exist_ok=False)
         self.logger.info(f"creating session {file_path}")
         self.session_file = file_path
+        self.store.track_file(file_path)
         return file_path
 
-    def log_interaction(self, question: str, answer: str, exec_time: float, model_name: str):
-        self.logger.info("logging new interaction")
-        with self.session_file.open("a", encoding="utf-8") as f:
-            f.write(f"Question {model_name} : {question}\n")
-            f.write(f"Answer {model_name} : {answer}\n\n")
-            f.write(f"ExecTime {model_name} : {str(exec_time)}\n\n")
-
-    @staticmethod
-    def get_recent_sessions(base_dir=SESSION_DIR, count=7) -> list[str]:
-        base_path = Path(base_dir)
-        if not base_path.exists():
-            return []
+    def log_interaction(self, question: str, answer: str, exec_time: float, model_name: str,
+                        truncated: bool = False, request_id: str = None, metrics: dict = None):
+        self.writer.submit(self.session_file, SessionStore.make_record(
+            self.session_file.stem, question, answer, model_name, exec_time=exec_time,
+            truncated=truncated, request_id=request_id, metrics=metrics))
 
-        # Filter only .txt files
-        session_files = [f for f in base_path.glob("*.txt") if f.is_file()]
+    def close(self):
+        """Drain pending interactions to disk, then close the store; call once on shutdown."""
+        self.writer.close()
+        self.store.close()
 
-        # Sort by creation time (descending)
-        sorted_files = sorted(
-            session_files,
-            key=lambda f: f.stat().st_ctime,
-            reverse=True
-        )
-
-        return [str(f) for f in sorted_files[:count]]
+    @staticmethod
+    def read_interactions(path) -> list[dict]:
+        """Parse a session .txt file back into question/answer/model/exec_time records."""
+        records = []
+        current = None
+        answer_lines = None
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if answer_lines is not None:
+                    if line.startswith(f"ExecTime {current['model']} : "):
+                        current["answer"] = "".join(answer_lines).rstrip("\n")
+                        try:
+                            current["exec_time"] = float(line.split(" : ", 1)[1])
+                        except ValueError:
+                            current["exec_time"] = None
+                        records.append(current)
+                        current, answer_lines = None, None
+                    else:
+                        answer_lines.append(line)
+                    continue
+                match = QUESTION_LINE.match(line)
+                if match:
+                    current = {"model": match.group(1), "question": match.group(2),
+                               "answer": "", "exec_time": None, "truncated": False}
+                    continue
+                if current is not None:
+                    for marker, truncated in ((" (truncated) : ", True), (" : ", False)):
+                        prefix = f"Answer {current['model']}{marker}"
+                        if line.startswith(prefix):
+                            current["truncated"] = truncated
+                            answer_lines = [line[len(prefix):]]
+                            break
+        return records
 
+    def recent_sessions(self, days=RECENT_DAYS) -> list[dict]:
+        """Session metadata from the store, newest first; days=None means all sessions."""
+        since = time.time() - days * 86400 if days else None
+        return self.store.recent_sessions(since)
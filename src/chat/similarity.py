@@ -0,0 +1,153 @@
+import concurrent.futures
+import math
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from src.chat.cache import normalize
+from src.chat.session import FlatChatSessionLogger
+from src.utils.constants import SESSION_DIR, LOGGER_DIR, LOGGER_NAME
+from src.utils.logger import setup_daily_logger
+
+SIMILARITY_THRESHOLD = 0.75
+MAX_QUESTIONS = 5000
+IDF_DRIFT = 0.1           # share of the index that may change before idf is refreshed
+
+# speech filler and glue words that say nothing about the question itself
+STOPWORDS = frozenset("""
+a an and are as at be but by can could do does for from how i in is it me my of on or please so
+tell that the this to um uh er ah like okay ok well you your would we what whats with just
+explain give show let lets us about maybe actually basically kind sort mean yeah right
+""".split())
+
+
+def terms(text: str) -> list[str]:
+    """Content words plus adjacent-word bigrams, so word order still counts a little."""
+    words = [w for w in normalize(text).split() if w not in STOPWORDS]
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+class SimilarityIndex:
+    """TF-IDF index over past questions, searched through an inverted index.
+
+    Each question is stored as a sparse row of term weights, and every term
+    keeps a posting list of the questions that contain it. A lookup only
+    scores questions that share a term with the query. idf and the row
+    norms that depend on it are refreshed lazily, once the index has grown
+    or shrunk by IDF_DRIFT since the last refresh.
+    """
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD, max_questions: int = MAX_QUESTIONS):
+        self.logger = setup_daily_logger(name=LOGGER_NAME, log_dir=LOGGER_DIR)
+        self.threshold = threshold
+        self.max_questions = max_questions
+        self._entries = {}        # id -> (question, answer, model), oldest first
+        self._rows = {}           # id -> {term: 1 + log(count)}
+        self._norms = {}          # id -> tf-idf norm of its row
+        self._postings = {}       # term -> set of ids
+        self._next_id = 0
+        self._idf = {}            # term -> idf as of the last refresh
+        self._idf_n = 0           # index size at the last refresh
+        self._lock = threading.Lock()
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="similarity")
+
+    def _weight(self, term: str) -> float:
+        idf = self._idf.get(term)
+        if idf is None:
+            # a term first seen since the last refresh
+            idf = math.log((1 + len(self._entries)) / (1 + len(self._postings.get(term, ())))) + 1
+        return idf
+
+    def _norm(self, row: dict) -> float:
+        return math.sqrt(sum((w * self._weight(t)) ** 2 for t, w in row.items())) or 1.0
+
+    def add(self, question: str, answer: str, model: str) -> None:
+        counts = Counter(terms(question))
+        if not counts or not answer:
+            return
+        row = {term: 1 + math.log(count) for term, count in counts.items()}
+        with self._lock:
+            entry = self._next_id
+            self._next_id += 1
+            self._entries[entry] = (question, answer, model)
+            self._rows[entry] = row
+            for term in row:
+                self._postings.setdefault(term, set()).add(entry)
+            if len(self._entries) > self.max_questions:
+                self._evict(next(iter(self._entries)))
+            self._norms[entry] = self._norm(row)
+
+    def add_async(self, question: str, answer: str, model: str) -> None:
+        """add() on the index's own thread, queued behind any lookup that holds the index."""
+        self._pool.submit(self.add, question, answer, model)
+
+    def _evict(self, entry):
+        # caller holds the lock
+        del self._entries[entry], self._norms[entry]
+        for term in self._rows.pop(entry):
+            ids = self._postings[term]
+            ids.discard(entry)
+            if not ids:
+                del self._postings[term]
+
+    def _refresh(self):
+        # caller holds the lock; every row's norm depends on the idf of its terms
+        n = len(self._entries)
+        if abs(n - self._idf_n) > IDF_DRIFT * max(n, self._idf_n):
+            self._idf = {term: math.log((1 + n) / (1 + len(ids))) + 1 for term, ids in self._postings.items()}
+            self._norms = {entry: self._norm(row) for entry, row in self._rows.items()}
+            self._idf_n = n
+
+    def load_sessions(self, base_dir=SESSION_DIR) -> int:
+        """Index every complete interaction found in the session files, oldest first."""
+        files = sorted(Path(base_dir).glob("*.txt"), key=lambda f: f.stat().st_mtime)
+        loaded = 0
+        for path in files:
+            try:
+                records = FlatChatSessionLogger.read_interactions(path)
+            except OSError as e:
+                self.logger.warning("skipping session %s: %s", path, e)
+                continue
+            for record in records:
+                if not record["truncated"]:
+                    self.add(record["question"], record["answer"], record["model"])
+                    loaded += 1
+        self.logger.info("similarity index loaded %d questions from %d sessions", loaded, len(files))
+        return loaded
+
+    def load_sessions_async(self, base_dir=SESSION_DIR) -> None:
+        threading.Thread(target=self.load_sessions, args=(base_dir,), daemon=True).start()
+
+    def lookup(self, question: str) -> Optional[dict]:
+        """Best prior interaction whose question scores at least the threshold, or None."""
+        counts = Counter(terms(question))
+        if not counts:
+            return None
+        with self._lock:
+            if not self._entries:
+                return None
+            self._refresh()
+            # every query term counts toward the norm, unseen ones at the highest idf;
+            # only terms some past question uses can add to a dot product
+            weights = {term: (1 + math.log(count)) * self._weight(term) for term, count in counts.items()}
+            query = {term: w for term, w in weights.items() if term in self._postings}
+            if not query:
+                return None
+            query_norm = math.sqrt(sum(w * w for w in weights.values()))
+            dots = {}
+            for term, weight in query.items():
+                for entry in self._postings.get(term, ()):
+                    dots[entry] = dots.get(entry, 0.0) + weight * self._rows[entry][term] * self._weight(term)
+            if not dots:
+                return None
+            best, dot = max(dots.items(), key=lambda item: item[1] / self._norms[item[0]])
+            score = min(1.0, dot / (self._norms[best] * query_norm))
+            if score < self.threshold:
+                return None
+            prior_question, answer, model = self._entries[best]
+        return {"question": prior_question, "answer": answer, "model": model, "score": score}
+
+    def lookup_async(self, question: str) -> concurrent.futures.Future:
+        """lookup() on the index's own thread, so callers on the GUI thread never wait for it."""
+        return self._pool.submit(self.lookup, question)
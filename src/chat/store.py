@@ -0,0 +1,358 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from src.utils.constants import STORE_FILE, SESSION_DIR, LOGGER_DIR, LOGGER_NAME
+from src.utils.logger import setup_daily_logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS interactions (
+    id             INTEGER PRIMARY KEY,
+    request_id     TEXT,
+    session        TEXT NOT NULL,
+    ts             REAL NOT NULL,
+    model          TEXT,
+    question       TEXT NOT NULL,
+    answer         TEXT NOT NULL,
+    truncated      INTEGER NOT NULL DEFAULT 0,
+    exec_time_ms   REAL,
+    ttft_ms        REAL,
+    tokens         INTEGER,
+    tokens_per_sec REAL,
+    metrics        TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_interactions_ts ON interactions(ts);
+CREATE INDEX IF NOT EXISTS idx_interactions_model_ts ON interactions(model, ts);
+CREATE INDEX IF NOT EXISTS idx_interactions_session ON interactions(session, id);
+CREATE TABLE IF NOT EXISTS sessions (
+    session        TEXT PRIMARY KEY,
+    path           TEXT,
+    created        REAL NOT NULL,
+    interactions   INTEGER NOT NULL DEFAULT 0,
+    models         TEXT NOT NULL DEFAULT '',
+    first_question TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_created ON sessions(created);
+"""
+
+# rowid is interactions.id; code blocks get their own column so identifiers can be weighted
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS interactions_fts USING fts5(
+    question, answer, code, tokenize = "unicode61 tokenchars '_'"
+);
+"""
+SEARCH_WEIGHTS = (3.0, 1.0, 2.0)   # bm25 weights for question, answer, code
+CODE_BLOCK = re.compile(r"```[^\n]*\n(.*?)(?:```|$)", re.S)
+SEARCH_TERM = re.compile(r"\w+")
+
+
+def split_code(answer: str) -> tuple[str, str]:
+    """Separate fenced code blocks from the prose of an answer."""
+    code = "\n".join(CODE_BLOCK.findall(answer))
+    return CODE_BLOCK.sub(" ", answer), code
+
+
+def match_expression(query: str) -> Optional[str]:
+    """Turn free text into an FTS5 query: every word must match, the last one as a prefix."""
+    words = SEARCH_TERM.findall(query.lower())
+    if not words:
+        return None
+    return " ".join(f'"{w}"' for w in words) + "*"
+
+COLUMNS = ("request_id", "session", "ts", "model", "question", "answer", "truncated",
+           "exec_time_ms", "ttft_ms", "tokens", "tokens_per_sec", "metrics")
+
+
+def session_started_at(session: str, fallback: float) -> float:
+    """Sessions are named after their creation time (see FlatChatSessionLogger)."""
+    try:
+        return datetime.strptime(session, "%Y-%m-%d_%H-%M-%S").timestamp()
+    except ValueError:
+        return fallback
+
+
+class SessionStore:
+    """Append-only SQLite (WAL) store of interactions, indexed by time, model and session."""
+
+    def __init__(self, path=STORE_FILE):
+        self.logger = setup_daily_logger(name=LOGGER_NAME, log_dir=LOGGER_DIR)
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.closed = False
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        try:
+            self._conn.executescript(SEARCH_SCHEMA)
+            self.searchable = True
+        except sqlite3.OperationalError as e:
+            # some sqlite builds ship without FTS5; search falls back to LIKE
+            self.logger.warning("full-text search unavailable: %s", e)
+            self.searchable = False
+        self._conn.commit()
+        if self.searchable:
+            self._index_missing()
+
+    def set_synchronous(self, level: str) -> None:
+        if level not in ("OFF", "NORMAL", "FULL"):
+            raise ValueError(f"bad synchronous level {level!r}")
+        with self._lock:
+            self._conn.execute(f"PRAGMA synchronous={level}")
+
+    @staticmethod
+    def make_record(session, question, answer, model, exec_time=None, truncated=False,
+                    request_id=None, metrics=None, ts=None) -> dict:
+        metrics = metrics or {}
+        return {
+            "request_id": request_id,
+            "session": session,
+            "ts": ts if ts is not None else time.time(),
+            "model": model,
+            "question": question,
+            "answer": answer,
+            "truncated": int(truncated),
+            "exec_time_ms": exec_time,
+            "ttft_ms": metrics.get("ttft_ms"),
+            "tokens": metrics.get("tokens"),
+            "tokens_per_sec": metrics.get("tokens_per_sec"),
+            "metrics": json.dumps(metrics) if metrics else None,
+        }
+
+    def append_many(self, records: list[dict]) -> None:
+        with self._lock, self._conn:
+            self._append(records)
+
+    def _append(self, records):
+        # caller holds the lock and the transaction
+        sql = f"INSERT INTO interactions ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+        ids = [self._conn.execute(sql, tuple(r[c] for c in COLUMNS)).lastrowid for r in records]
+        self._update_meta(records)
+        if self.searchable:
+            self._index(zip(ids, (r["question"] for r in records), (r["answer"] for r in records)))
+
+    def _index(self, rows):
+        # caller holds the lock; rows are (id, question, answer)
+        self._conn.executemany(
+            "INSERT INTO interactions_fts (rowid, question, answer, code) VALUES (?, ?, ?, ?)",
+            [(i, question, *split_code(answer)) for i, question, answer in rows])
+
+    def _index_missing(self):
+        """Index interactions stored before the search table existed."""
+        with self._lock, self._conn:
+            last = self._conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM interactions_fts").fetchone()[0]
+            rows = self._conn.execute("SELECT id, question, answer FROM interactions WHERE id > ?",
+                                      (last,)).fetchall()
+            if rows:
+                self._index(tuple(r) for r in rows)
+                self.logger.info("indexed %d interactions for search", len(rows))
+
+    def _update_meta(self, records):
+        # caller holds the lock and the transaction; keeps the session rows in step with appends
+        by_session = {}
+        for r in records:
+            by_session.setdefault(r["session"], []).append(r)
+        for session, rows in by_session.items():
+            meta = self._conn.execute("SELECT models FROM sessions WHERE session = ?", (session,)).fetchone()
+            if meta is None:
+                self._conn.execute("INSERT INTO sessions (session, created) VALUES (?, ?)",
+                                   (session, session_started_at(session, rows[0]["ts"])))
+                models = set()
+            else:
+                models = set(filter(None, meta["models"].split(",")))
+            models.update(r["model"] for r in rows if r["model"])
+            self._conn.execute(
+                """UPDATE sessions SET interactions = interactions + ?, models = ?,
+                          first_question = COALESCE(first_question, ?)
+                   WHERE session = ?""",
+                (len(rows), ",".join(sorted(models)), rows[0]["question"], session))
+
+    def track_file(self, path) -> bool:
+        """Make sure a session file has a metadata row; True if it was not tracked before."""
+        path = Path(path)
+        session = path.stem
+        with self._lock, self._conn:
+            meta = self._conn.execute("SELECT path FROM sessions WHERE session = ?", (session,)).fetchone()
+            if meta is not None:
+                if meta["path"] != str(path):
+                    self._conn.execute("UPDATE sessions SET path = ? WHERE session = ?", (str(path), session))
+                return False
+            try:
+                fallback = path.stat().st_mtime
+            except OSError:
+                fallback = time.time()
+            # interactions imported before the metadata table existed still count
+            count, models, first = self._conn.execute(
+                """SELECT COUNT(*), GROUP_CONCAT(DISTINCT model),
+                          (SELECT question FROM interactions WHERE session = ? ORDER BY id LIMIT 1)
+                   FROM interactions WHERE session = ?""", (session, session)).fetchone()
+            self._conn.execute(
+                "INSERT INTO sessions (session, path, created, interactions, models, first_question) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (session, str(path), session_started_at(session, fallback), count,
+                 ",".join(sorted(filter(None, (models or "").split(",")))), first))
+            return True
+
+    def forget_session(self, session: str) -> None:
+        """Drop the metadata row of a session whose file is gone; its interactions stay searchable."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions WHERE session = ?", (session,))
+
+    def sync_dir(self, base_dir=SESSION_DIR) -> bool:
+        """Reconcile tracked sessions with the files in base_dir; True if anything changed.
+
+        Only names are compared, so this is one directory listing and one query;
+        the content of new files is imported lazily when they are opened.
+        """
+        on_disk = {p.stem: p for p in Path(base_dir).glob("*.txt")}
+        with self._lock:
+            tracked = {row["session"] for row in
+                       self._conn.execute("SELECT session FROM sessions WHERE path IS NOT NULL")}
+        changed = False
+        for session in tracked - on_disk.keys():
+            self.forget_session(session)
+            changed = True
+        for session in on_disk.keys() - tracked:
+            changed = self.track_file(on_disk[session]) or changed
+        return changed
+
+    def recent_sessions(self, since: Optional[float] = None) -> list[dict]:
+        """Metadata of sessions created at or after `since`, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM sessions WHERE path IS NOT NULL AND created >= ? ORDER BY created DESC",
+                (since or 0,)).fetchall()
+        return [dict(r) for r in rows]
+
+    def append(self, record: dict) -> None:
+        self.append_many([record])
+
+    def interactions(self, session: str, offset: int = 0, limit: int = 50) -> list[dict]:
+        """One page of a session's interactions in the order they were logged."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM interactions WHERE session = ? ORDER BY id LIMIT ? OFFSET ?",
+                (session, limit, offset)).fetchall()
+        return [dict(r) for r in rows]
+
+    def search(self, query: str, limit: int = 50) -> list[dict]:
+        """Interactions matching every word of the query, best match first."""
+        if self.searchable:
+            expression = match_expression(query)
+            if expression is None:
+                return []
+            sql = f"""SELECT i.id, i.session, i.ts, i.model, i.question, s.path,
+                             snippet(interactions_fts, -1, '[', ']', '…', 12) AS snippet
+                      FROM interactions_fts f
+                      JOIN interactions i ON i.id = f.rowid
+                      LEFT JOIN sessions s ON s.session = i.session
+                      WHERE interactions_fts MATCH ?
+                      ORDER BY bm25(interactions_fts, {', '.join(map(str, SEARCH_WEIGHTS))})
+                      LIMIT ?"""
+            args = (expression, limit)
+        else:
+            words = SEARCH_TERM.findall(query.lower())
+            if not words:
+                return []
+            where = " AND ".join(["(i.question || ' ' || i.answer) LIKE ?"] * len(words))
+            sql = f"""SELECT i.id, i.session, i.ts, i.model, i.question, s.path, '' AS snippet
+                      FROM interactions i LEFT JOIN sessions s ON s.session = i.session
+                      WHERE {where} ORDER BY i.ts DESC LIMIT ?"""
+            args = (*(f"%{w}%" for w in words), limit)
+        with self._lock:
+            try:
+                rows = self._conn.execute(sql, args).fetchall()
+            except sqlite3.OperationalError as e:
+                self.logger.warning("search for %r failed: %s", query, e)
+                return []
+        return [dict(r) for r in rows]
+
+    def position(self, interaction_id: int) -> int:
+        """Index of an interaction within its session, for paging straight to it."""
+        with self._lock:
+            return self._conn.execute(
+                """SELECT COUNT(*) FROM interactions
+                   WHERE session = (SELECT session FROM interactions WHERE id = ?) AND id < ?""",
+                (interaction_id, interaction_id)).fetchone()[0]
+
+    def count(self, session: Optional[str] = None) -> int:
+        with self._lock:
+            if session is None:
+                return self._conn.execute("SELECT COUNT(*) FROM interactions").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM interactions WHERE session = ?",
+                                      (session,)).fetchone()[0]
+
+    def latency_report(self, since: Optional[float] = None) -> list[dict]:
+        """Per-model averages over completed (non-truncated) interactions."""
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT model, COUNT(*) AS answers, AVG(exec_time_ms) AS avg_exec_ms,
+                          AVG(ttft_ms) AS avg_ttft_ms, AVG(tokens_per_sec) AS avg_tokens_per_sec,
+                          AVG(tokens) AS avg_tokens
+                   FROM interactions
+                   WHERE truncated = 0 AND ts >= ?
+                   GROUP BY model ORDER BY avg_ttft_ms""",
+                (since or 0,)).fetchall()
+        return [dict(r) for r in rows]
+
+    def has_session(self, session: str) -> bool:
+        with self._lock:
+            return self._has_session(session)
+
+    def _has_session(self, session):
+        # caller holds the lock
+        return self._conn.execute("SELECT 1 FROM interactions WHERE session = ? LIMIT 1",
+                                  (session,)).fetchone() is not None
+
+    def import_txt(self, path) -> int:
+        """Import one legacy .txt session; sessions already in the store are skipped."""
+        from src.chat.session import FlatChatSessionLogger
+
+        path = Path(path)
+        session = path.stem
+        self.track_file(path)
+        if self.has_session(session):
+            return 0    # skip parsing; the check that decides is made again below
+        started = session_started_at(session, path.stat().st_mtime)
+        records = [
+            self.make_record(session, r["question"], r["answer"], r["model"], exec_time=r["exec_time"],
+                             truncated=r["truncated"], ts=started + i / 1000)
+            for i, r in enumerate(FlatChatSessionLogger.read_interactions(path))
+        ]
+        if not records:
+            return 0
+        # checked and inserted in one transaction: the startup import and the
+        # session loader may reach the same file at the same time
+        with self._lock, self._conn:
+            if self._has_session(session):
+                return 0
+            self._append(records)
+        return len(records)
+
+    def import_all(self, base_dir=SESSION_DIR, before: Optional[float] = None) -> int:
+        """Import every legacy session; sessions started at or after `before` are left alone."""
+        imported = 0
+        for path in sorted(Path(base_dir).glob("*.txt")):
+            if self.closed:
+                break
+            if before is not None and session_started_at(path.stem, 0) >= before:
+                continue
+            try:
+                imported += self.import_txt(path)
+            except (OSError, sqlite3.Error) as e:
+                self.logger.warning("import of %s failed: %s", path, e)
+        if imported:
+            self.logger.info("imported %d interactions from legacy sessions", imported)
+        return imported
+
+    def close(self):
+        """Close the connection; a legacy import still running stops at its next file."""
+        with self._lock:
+            self.closed = True
+            self._conn.close()
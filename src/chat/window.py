@@ -0,0 +1,135 @@
+import math
+import re
+import threading
+from collections import Counter, deque
+
+from src.chat.gate import rule_score
+from src.chat.similarity import terms
+from src.utils.constants import LOGGER_DIR, LOGGER_NAME
+from src.utils.logger import setup_daily_logger
+from src.utils.tokens import count_tokens, tail_tokens
+
+CONTEXT_BUDGET_TOKENS = 1500
+SUMMARY_SHARE = 0.25        # part of the budget given to the summary of older talk
+MAX_ARCHIVE_SENTENCES = 400
+
+SENTENCE = re.compile(r"[^.?!]+[.?!]*")
+
+
+def split_sentences(text: str) -> list:
+    """(sentence, tokens) for each sentence of an utterance."""
+    return [(sentence.strip(), count_tokens(sentence)) for sentence in SENTENCE.findall(text) if sentence.strip()]
+
+
+class TranscriptWindow:
+    """Recent utterances within a token budget, plus an extractive summary of what scrolled out.
+
+    The newest utterances are kept verbatim. When they no longer fit the
+    largest budget any model uses, the oldest are split into sentences and
+    archived. render() is read-only: a smaller budget summarises more of the
+    recent talk for that one prompt without archiving it for everyone else.
+    The summary is the highest-scoring sentences, kept in their original
+    order and cut to the summary share of the budget. A sentence scores by
+    how rare its terms are, and gets a bonus when it reads like a question.
+    """
+
+    def __init__(self, summary_share: float = SUMMARY_SHARE, max_budget: int = CONTEXT_BUDGET_TOKENS):
+        self.logger = setup_daily_logger(name=LOGGER_NAME, log_dir=LOGGER_DIR)
+        self.summary_share = summary_share
+        self.max_budget = max_budget                      # the largest budget render() will be asked for
+        self._recent = deque()                            # (text, tokens), oldest first
+        self._archive = deque(maxlen=MAX_ARCHIVE_SENTENCES)  # (sentence, tokens)
+        self._lock = threading.Lock()
+        self._slid = 0              # utterances ever archived, to know when a summary is stale
+        self._summary_cache = {}    # budget -> (state, summary)
+
+    def add(self, utterance: str) -> None:
+        utterance = utterance.strip()
+        if utterance:
+            with self._lock:
+                self._recent.append((utterance, count_tokens(utterance)))
+                self._slide(self.max_budget)
+
+    def ask(self, question: str) -> None:
+        """Add a question unless it is part of the newest utterance already.
+
+        That is the case for a span the question gate cut out of the last utterance.
+        """
+        question = question.strip()
+        with self._lock:
+            if self._recent and question in self._recent[-1][0]:
+                return
+        self.add(question)
+
+    def clear(self):
+        with self._lock:
+            self._recent.clear()
+            self._archive.clear()
+            self._slid += 1
+            self._summary_cache = {}
+
+    def _slide(self, budget):
+        # caller holds the lock; archive the oldest utterances until the rest fit
+        used = sum(tokens for _, tokens in self._recent)
+        while len(self._recent) > 1 and used > budget:
+            text, tokens = self._recent.popleft()
+            used -= tokens
+            self._archive.extend(split_sentences(text))
+            self._slid += 1
+
+    def _summary(self, sentences, budget, state):
+        # caller holds the lock; a summary only changes with the sentences it is drawn from
+        cached = self._summary_cache.get(budget)
+        if cached is not None and cached[0] == state:
+            return cached[1]
+        summary = self._extract(sentences, budget)
+        self._summary_cache[budget] = (state, summary)
+        return summary
+
+    @staticmethod
+    def _extract(sentences, budget):
+        if not sentences or budget <= 0:
+            return []
+        counts = [Counter(terms(sentence)) for sentence, _ in sentences]
+        df = Counter()
+        for c in counts:
+            df.update(c.keys())
+        n = len(counts)
+        scored = []
+        for i, ((sentence, tokens), c) in enumerate(zip(sentences, counts)):
+            if not c:
+                continue
+            rarity = sum(math.log((1 + n) / (1 + df[t])) + 1 for t in c) / math.sqrt(len(c))
+            scored.append((rarity * (1 + rule_score(sentence)), i, sentence, tokens))
+        chosen, used = [], 0
+        for _, i, sentence, tokens in sorted(scored, reverse=True):
+            if used + tokens <= budget:
+                chosen.append((i, sentence))
+                used += tokens
+        return [sentence for _, sentence in sorted(chosen)]
+
+    def render(self, budget: int = CONTEXT_BUDGET_TOKENS) -> str:
+        """The transcript to send, at most `budget` tokens; the window itself is left as it is."""
+        with self._lock:
+            recent = list(self._recent)
+            if not recent:
+                return ""
+            total = sum(tokens for _, tokens in recent)
+            summary_budget = int(budget * self.summary_share) if self._archive or total > budget else 0
+            keep = budget - summary_budget
+            # the newest utterances that fit stay verbatim; older ones join the archive in the summary
+            cut = 0
+            while cut < len(recent) - 1 and total > keep:
+                total -= recent[cut][1]
+                cut += 1
+            overflow = [pair for text, _ in recent[:cut] for pair in split_sentences(text)]
+            summary = self._summary(list(self._archive) + overflow, summary_budget, (self._slid, cut))
+        recent = recent[cut:]
+        # a single utterance longer than the window keeps only its end, where the question is
+        texts = [text for text, _ in recent]
+        texts[0] = tail_tokens(texts[0], keep - sum(tokens for _, tokens in recent[1:]))
+        parts = []
+        if summary:
+            parts.append("Earlier (summary): " + " ".join(summary))
+        parts.append("\n".join(texts))
+        return "\n\n".join(parts)
@@ -0,0 +1,132 @@
+import os
+import queue
+import threading
+import time
+
+from src.utils.constants import LOGGER_DIR, LOGGER_NAME
+from src.utils.logger import setup_daily_logger
+
+BATCH_SIZE = 32
+FLUSH_MS = 250
+DURABILITY = "flush"
+DURABILITY_POLICIES = ("none", "flush", "fsync")
+
+# how hard sqlite syncs for each policy
+SQLITE_SYNCHRONOUS = {"none": "OFF", "flush": "NORMAL", "fsync": "FULL"}
+
+_STOP = object()
+
+
+def format_interaction(record: dict) -> str:
+    """The legacy .txt layout that FlatChatSessionLogger.read_interactions parses back."""
+    model = record["model"]
+    marker = " (truncated)" if record["truncated"] else ""
+    return (f"Question {model} : {record['question']}\n"
+            f"Answer {model}{marker} : {record['answer']}\n\n"
+            f"ExecTime {model} : {str(record['exec_time_ms'])}\n\n")
+
+
+class SessionWriter:
+    """Writes interaction records to session files and the store from one background thread.
+
+    Records are queued by log_interaction and written in batches, once
+    batch_size records are waiting or flush_ms after the first of them.
+    The durability policy decides what each batch waits for:
+    "none" leaves it in the file buffer, "flush" hands it to the OS,
+    "fsync" waits for the disk.
+    """
+
+    def __init__(self, store, durability: str = DURABILITY, batch_size: int = BATCH_SIZE,
+                 flush_ms: int = FLUSH_MS):
+        if durability not in DURABILITY_POLICIES:
+            raise ValueError(f"unknown durability policy {durability!r}, expected one of {DURABILITY_POLICIES}")
+        self.logger = setup_daily_logger(name=LOGGER_NAME, log_dir=LOGGER_DIR)
+        self.store = store
+        self.durability = durability
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000
+        self.store.set_synchronous(SQLITE_SYNCHRONOUS[durability])
+        self._queue = queue.Queue()
+        self._files = {}   # path -> open handle, kept while the session is being written
+        self._thread = threading.Thread(target=self._run, name="session-writer", daemon=True)
+        self._thread.start()
+        self.batches = 0
+        self.written = 0
+
+    def submit(self, path, record: dict) -> None:
+        self._queue.put((path, record))
+
+    def _next_batch(self):
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            if batch:
+                self._write(batch)
+        self._close_files()
+        self.logger.info("session writer stopped after %d records in %d batches", self.written, self.batches)
+
+    def _write(self, batch):
+        start = time.perf_counter()
+        by_path = {}
+        for path, record in batch:
+            by_path.setdefault(path, []).append(record)
+        for path, records in by_path.items():
+            try:
+                f = self._file(path)
+                f.write("".join(format_interaction(r) for r in records))
+                if self.durability != "none":
+                    f.flush()
+                if self.durability == "fsync":
+                    os.fsync(f.fileno())
+            except OSError as e:
+                self.logger.error("writing %d interactions to %s failed: %s", len(records), path, e)
+        try:
+            self.store.append_many([record for _, record in batch])
+        except Exception as e:
+            self.logger.error("storing %d interactions failed: %s", len(batch), e)
+        self.batches += 1
+        self.written += len(batch)
+        self.logger.debug("wrote %d interactions in %.1f ms (%s)", len(batch),
+                          (time.perf_counter() - start) * 1000, self.durability)
+
+    def _file(self, path):
+        f = self._files.get(path)
+        if f is None:
+            # only the newest session is appended to, so older handles can go
+            self._close_files()
+            f = self._files[path] = open(path, "a", encoding="utf-8")
+        return f
+
+    def _close_files(self):
+        for f in self._files.values():
+            try:
+                f.close()
+            except OSError as e:
+                self.logger.error("closing %s failed: %s", f.name, e)
+        self._files.clear()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write everything still queued, then stop the thread."""
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            self.logger.warning("session writer did not drain within %.1fs", timeout)
@@ -0,0 +1,185 @@
+# llm/engine.py
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+from typing import Any, Callable, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from src.llm.http import CONNECT_TIMEOUT, READ_TIMEOUT, POOL_MAXSIZE
+from src.llm.resilience import Failover
+from src.utils.constants import LOGGER_DIR, LOGGER_NAME
+from src.utils.logger import setup_daily_logger
+from src.utils.perf import StreamStats, latency_registry
+
+MAX_CONCURRENCY = 4      # completions streaming at the same time
+MAX_PENDING = 16         # running + waiting before submissions are refused
+
+
+class EngineSaturated(Exception):
+    """Raised when the engine already holds MAX_PENDING requests."""
+
+
+class StreamingEngine:
+    """One long-lived asyncio loop thread that multiplexes every in-flight completion.
+
+    Submissions beyond max_concurrency wait on a semaphore inside the loop;
+    submissions beyond max_pending are refused with EngineSaturated so bursts
+    push back on the caller instead of piling up.
+    """
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, max_pending: int = MAX_PENDING):
+        self.logger = setup_daily_logger(name=LOGGER_NAME, log_dir=LOGGER_DIR)
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._sessions: dict[str, aiohttp.ClientSession] = {}
+        self.loop = asyncio.new_event_loop()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._thread = threading.Thread(target=self._run_loop, name="llm-engine", daemon=True)
+        self._thread.start()
+        self.logger.info("streaming engine started (concurrency=%d, pending=%d)",
+                         max_concurrency, max_pending)
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def _session_for(self, api_url: str) -> aiohttp.ClientSession:
+        """Per-endpoint keep-alive session; only called from the loop thread."""
+        parts = urlsplit(api_url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        session = self._sessions.get(origin)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=POOL_MAXSIZE, ttl_dns_cache=300)
+            timeout = aiohttp.ClientTimeout(sock_connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT)
+            session = aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                            trace_configs=[self._trace_config()])
+            self._sessions[origin] = session
+        return session
+
+    @staticmethod
+    def _trace_config() -> aiohttp.TraceConfig:
+        """Forward DNS and connect timings to the StreamStats passed as trace_request_ctx."""
+        trace = aiohttp.TraceConfig()
+
+        def hook(method):
+            async def _hook(session, ctx, params):
+                if isinstance(ctx.trace_request_ctx, StreamStats):
+                    getattr(ctx.trace_request_ctx, method)()
+            return _hook
+
+        trace.on_dns_resolvehost_start.append(hook("dns_started"))
+        trace.on_dns_resolvehost_end.append(hook("dns_finished"))
+        trace.on_connection_create_start.append(hook("connect_started"))
+        trace.on_connection_create_end.append(hook("connect_finished"))
+        return trace
+
+    def _submit(self, coro) -> concurrent.futures.Future:
+        if not self._pending.acquire(blocking=False):
+            coro.close()
+            raise EngineSaturated(f"{self.max_pending} requests already in flight")
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        future.add_done_callback(lambda _: self._pending.release())
+        return future
+
+    async def _stream(self, llm, prompt: str, stop, on_delta, stats: StreamStats, failover: Failover) -> str:
+        def attempt(candidate, deliver):
+            # runs once per try, after admission: timings belong to this try's model alone
+            stats.restart(candidate.model)
+            return candidate._astream(self._session_for(candidate.api_url), prompt, stop=stop,
+                                      on_delta=deliver, stats=stats)
+
+        # only the request itself holds a concurrency slot; rate-limit and backoff waits do not
+        response = await (failover or Failover([llm])).astream(attempt, on_delta, prompt,
+                                                                slot=lambda: self._semaphore)
+        stats.finish()
+        latency_registry.record(stats)
+        return response
+
+    def stream(
+        self,
+        llm,
+        prompt: str,
+        stop=None,
+        on_delta: Optional[Callable[[str], Any]] = None,
+        stats: Optional[StreamStats] = None,
+        failover: Optional[Failover] = None,
+    ) -> concurrent.futures.Future:
+        """Schedule a streaming completion; the future resolves to the full response.
+
+        Timings land in `stats` (created if not given) and in the shared latency registry.
+        Failed attempts are retried per `failover`, by default on `llm` alone.
+        """
+        stats = stats or StreamStats(llm.model)
+        return self._submit(self._stream(llm, prompt, stop, on_delta, stats, failover))
+
+    async def _call(self, llm, prompt: str, stop, failover: Failover) -> str:
+        def attempt(candidate, timeout):
+            return candidate._acall(self._session_for(candidate.api_url), prompt, stop=stop, timeout=timeout)
+
+        return await (failover or Failover([llm])).acall(attempt, prompt, slot=lambda: self._semaphore)
+
+    def call(self, llm, prompt: str, stop=None, failover: Optional[Failover] = None) -> concurrent.futures.Future:
+        """Schedule a non-streaming completion on the loop; the future resolves to its response.
+
+        Cancelling the future aborts the HTTP request and frees its slot, as for stream().
+        """
+        return self._submit(self._call(llm, prompt, stop, failover))
+
+    async def _run_blocking(self, fn, args):
+        async with self._semaphore:
+            # executor threads do not inherit the task context; carry the correlation id over
+            context = contextvars.copy_context()
+            return await self.loop.run_in_executor(None, context.run, fn, *args)
+
+    def run_blocking(self, fn: Callable, *args) -> concurrent.futures.Future:
+        """Run a blocking call under the same concurrency and pending limits."""
+        return self._submit(self._run_blocking(fn, args))
+
+    async def _warm(self, api_url: str):
+        session = self._session_for(api_url)
+        parts = urlsplit(api_url)
+        try:
+            async with session.head(f"{parts.scheme}://{parts.netloc}") as r:
+                await r.read()
+            self.logger.info("pre-warmed streaming connection to %s", parts.netloc)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.warning("pre-warm of %s failed: %s", parts.netloc, e)
+
+    def warm(self, api_url: str) -> None:
+        """Open a pooled socket to the endpoint ahead of the first request."""
+        if api_url:
+            asyncio.run_coroutine_threadsafe(self._warm(api_url), self.loop)
+
+    async def _close_sessions(self):
+        for session in self._sessions.values():
+            await session.close()
+        self._sessions.clear()
+
+    def shutdown(self, timeout: float = 2.0) -> None:
+        """Close pooled sessions and stop the loop thread."""
+        if not self.loop.is_running():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_sessions(), self.loop).result(timeout)
+        except Exception as e:
+            self.logger.warning("engine session close failed: %s", e)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        self.logger.info("streaming engine stopped")
+
+
+_engine: Optional[StreamingEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine(**kwargs) -> StreamingEngine:
+    """Return the process-wide engine, creating it on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = StreamingEngine(**kwargs)
+        return _engine
@@ -0,0 +1,78 @@
+# llm/http.py
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.utils.constants import LOGGER_DIR, LOGGER_NAME
+from src.utils.logger import setup_daily_logger
+
+CONNECT_TIMEOUT = 5      # seconds to establish TCP + TLS
+READ_TIMEOUT = 30        # seconds allowed between bytes of a response
+POOL_MAXSIZE = 4         # open sockets kept per endpoint
+
+
+class ConnectionPool:
+    """Keeps one keep-alive requests.Session per endpoint so calls reuse open sockets."""
+
+    def __init__(self, pool_maxsize: int = POOL_MAXSIZE):
+        self.logger = setup_daily_logger(name=LOGGER_NAME, log_dir=LOGGER_DIR)
+        self.pool_maxsize = pool_maxsize
+        self._sessions: dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _origin(api_url: str) -> str:
+        parts = urlsplit(api_url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def session_for(self, api_url: str) -> requests.Session:
+        """Return the shared session for the endpoint serving api_url."""
+        origin = self._origin(api_url)
+        with self._lock:
+            session = self._sessions.get(origin)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+                session.mount(origin, adapter)
+                session.headers.update({"Connection": "keep-alive"})
+                self._sessions[origin] = session
+                self.logger.info("created connection pool for %s", origin)
+            return session
+
+    def reserve(self, connections: int) -> None:
+        """Keep at least this many sockets per endpoint, e.g. for a batch with that many workers."""
+        with self._lock:
+            if connections <= self.pool_maxsize:
+                return
+            self.pool_maxsize = connections
+            for origin, session in self._sessions.items():
+                session.mount(origin, HTTPAdapter(pool_connections=1, pool_maxsize=connections))
+
+    def warm(self, api_url: str) -> None:
+        """Open a socket to the endpoint in the background (DNS + TCP + TLS)."""
+        if not api_url:
+            return
+        origin = self._origin(api_url)
+        session = self.session_for(api_url)
+
+        def _warm():
+            try:
+                # any response will do, we only want the connection in the pool
+                session.head(origin, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+                self.logger.info("pre-warmed connection to %s", origin)
+            except requests.RequestException as e:
+                self.logger.warning("pre-warm of %s failed: %s", origin, e)
+
+        threading.Thread(target=_warm, daemon=True).start()
+
+    def close(self) -> None:
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+# shared by every LLMWrapper in the process
+connection_pool = ConnectionPool()
@@ -0,0 +1,207 @@
+# llm/ratelimit.py
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+from urllib.parse import urlsplit
+
+from src.utils.constants import LOGGER_DIR, LOGGER_NAME
+from src.utils.logger import setup_daily_logger
+
+ANSWER_TOKENS = 400         # output tokens reserved when a model sets no max_tokens
+
+# free-tier limits (requests/min, tokens/min) for endpoints whose models set no "rpm"/"tpm"
+FREE_TIER_LIMITS = {
+    "generativelanguage.googleapis.com": (15, 1_000_000),
+    "api.groq.com": (30, 6_000),
+}
+
+
+class TokenBucket:
+    """`capacity` units refilled evenly over a minute.
+
+    take() always succeeds and may leave the level negative. That debt is
+    a reservation, so the next caller waits behind it instead of racing it.
+    """
+
+    def __init__(self, per_minute: Optional[float]):
+        self.capacity = per_minute
+        self.level = per_minute or 0.0
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        if self.capacity:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    def wait(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken; 0 when it can be taken now."""
+        if not self.capacity:
+            return 0.0
+        self._refill(now)
+        # a single request larger than the whole bucket waits for a full bucket, not forever
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing * 60 / self.capacity)
+
+    def take(self, amount: float, now: float):
+        if self.capacity:
+            self._refill(now)
+            self.level -= min(amount, self.capacity)
+
+    def resize(self, per_minute: Optional[float]):
+        if per_minute != self.capacity:
+            # a bucket that had no limit starts full
+            self.level = min(self.level, per_minute) if per_minute and self.capacity else (per_minute or 0.0)
+            self.capacity = per_minute
+
+
+class EndpointLimiter:
+    """Requests-per-minute and tokens-per-minute buckets for one endpoint."""
+
+    def __init__(self, origin: str, rpm: Optional[int], tpm: Optional[int]):
+        self.origin = origin
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.blocked_until = 0.0     # set by a 429 or an exhausted provider header
+        self.queued = 0
+        self.limited = 0            # requests that had to wait or move elsewhere
+        self._lock = threading.Lock()
+
+    def configure(self, rpm: Optional[int], tpm: Optional[int]):
+        with self._lock:
+            self.requests.resize(rpm)
+            self.tokens.resize(tpm)
+
+    def wait(self, tokens: int) -> float:
+        now = time.monotonic()
+        with self._lock:
+            return max(self.blocked_until - now, self.requests.wait(1, now), self.tokens.wait(tokens, now))
+
+    def take(self, tokens: int):
+        now = time.monotonic()
+        with self._lock:
+            self.requests.take(1, now)
+            self.tokens.take(tokens, now)
+
+    def note_limited(self):
+        """Count a request that had to wait or move elsewhere."""
+        with self._lock:
+            self.limited += 1
+
+    @contextmanager
+    def queued_for(self, seconds: float):
+        """Count a request as queued while the caller sleeps off its wait."""
+        with self._lock:
+            self.queued += 1
+        try:
+            yield seconds
+        finally:
+            with self._lock:
+                self.queued -= 1
+
+    def settle(self, reserved: int, used: int):
+        """Correct a reservation once the real token count is known."""
+        with self._lock:
+            if self.tokens.capacity:
+                self.tokens.level = min(self.tokens.capacity, self.tokens.level + reserved - used)
+
+    def block(self, seconds: float):
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def observe(self, headers):
+        """Trust the provider's own count when it reports one (OpenAI-style x-ratelimit headers)."""
+        remaining = headers.get("x-ratelimit-remaining-tokens")
+        if remaining is None:
+            return
+        try:
+            remaining = float(remaining)
+        except ValueError:
+            return
+        with self._lock:
+            if self.tokens.capacity:
+                self.tokens.level = min(self.tokens.level, remaining)
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            self.requests._refill(now)
+            self.tokens._refill(now)
+            return {
+                "endpoint": self.origin,
+                "rpm": self.requests.capacity,
+                "rpm_left": max(0, int(self.requests.level)),
+                "tpm": self.tokens.capacity,
+                "tpm_left": max(0, int(self.tokens.level)),
+                "blocked_s": max(0.0, self.blocked_until - now),
+                "queued": self.queued,
+                "limited": self.limited,
+            }
+
+
+def origin_of(api_url: str) -> str:
+    parts = urlsplit(api_url or "")
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def strictest(a: Optional[int], b: Optional[int]) -> Optional[int]:
+    return b if a is None else a if b is None else min(a, b)
+
+
+class RateLimits:
+    """One limiter per endpoint (scheme + host), sized from the models' "rpm"/"tpm" settings.
+
+    configure() sizes every endpoint once from the whole model list; models
+    sharing an endpoint share its strictest limit. Looking a limiter up
+    never resizes it, so wrappers of different models cannot fight over it.
+    """
+
+    def __init__(self, defaults: dict = FREE_TIER_LIMITS):
+        self.logger = setup_daily_logger(name=LOGGER_NAME, log_dir=LOGGER_DIR)
+        self.defaults = defaults
+        self._configured = {}      # origin -> (rpm, tpm) from the model list, None where unset
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def _limits(self, api_url: str, rpm: Optional[int], tpm: Optional[int]):
+        # the model list decides for endpoints it names; a caller's own rpm/tpm only for the rest
+        origin = origin_of(api_url)
+        if origin in self._configured:
+            rpm, tpm = self._configured[origin]
+        if rpm is None and tpm is None:
+            return self.defaults.get(urlsplit(api_url or "").hostname, (None, None))
+        return rpm, tpm
+
+    def configure(self, configs: list) -> None:
+        """Size every endpoint from the settings "models" list."""
+        limits = {}
+        for config in configs:
+            origin = origin_of(config.get("url"))
+            rpm, tpm = limits.get(origin, (None, None))
+            limits[origin] = (strictest(rpm, config.get("rpm")), strictest(tpm, config.get("tpm")))
+        with self._lock:
+            self._configured = limits
+            for origin, limiter in self._limiters.items():
+                rpm, tpm = self._limits(origin, None, None)
+                limiter.configure(rpm, tpm)
+
+    def limiter_for(self, api_url: str, rpm: Optional[int] = None, tpm: Optional[int] = None) -> EndpointLimiter:
+        """The endpoint's limiter; rpm/tpm only size a new one for an endpoint no configured model uses."""
+        origin = origin_of(api_url)
+        with self._lock:
+            limiter = self._limiters.get(origin)
+            if limiter is None:
+                rpm, tpm = self._limits(api_url, rpm, tpm)
+                limiter = self._limiters[origin] = EndpointLimiter(origin, rpm, tpm)
+                if rpm or tpm:
+                    self.logger.info("rate limit for %s: %s rpm, %s tpm", origin, rpm, tpm)
+            return limiter
+
+    def snapshot(self) -> list:
+        with self._lock:
+            limiters = list(self._limiters.values())
+        return [limiter.snapshot() for limiter in limiters]
+
+
+# shared by every LLMWrapper in the process
+rate_limits = RateLimits()
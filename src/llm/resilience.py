@@ -0,0 +1,441 @@
+# llm/resilience.py
+import asyncio
+import contextlib
+import random
+import threading
+import time
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+
+from src.utils.constants import LOGGER_DIR, LOGGER_NAME
+from src.utils.logger import setup_daily_logger
+
+RETRY_ATTEMPTS = 2          # tries per model before moving to the next one
+BACKOFF_BASE_S = 0.25
+BACKOFF_MAX_S = 4.0
+DEADLINE_S = 20.0           # total time to get a first token, across every attempt
+FIRST_TOKEN_TIMEOUT_S = 8.0  # one attempt may wait this long for its first token
+BREAKER_FAILURES = 3        # consecutive failures that open an endpoint's breaker
+BREAKER_COOLDOWN_S = 30.0
+RATE_LIMIT_BLOCK_S = 10.0   # hold on an endpoint after a 429 that gave no Retry-After
+
+# statuses worth another try: timeouts, conflicts, rate limits and server errors
+RETRYABLE_STATUS = {408, 409, 425, 429}
+
+
+class ProviderError(Exception):
+    """A failed completion, classified so the caller knows whether to try again."""
+
+    def __init__(self, message: str, status: Optional[int] = None, retryable: bool = False,
+                 retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value) -> Optional[float]:
+    # only the delta-seconds form; providers do not send HTTP dates here
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def http_error(status: int, body: str, retry_after=None) -> ProviderError:
+    retryable = status in RETRYABLE_STATUS or status >= 500
+    return ProviderError(f"HTTP Error: {status} - {body.strip()[:500]}", status=status,
+                         retryable=retryable, retry_after=parse_retry_after(retry_after))
+
+
+def classify(exc: Exception) -> ProviderError:
+    """Map transport exceptions onto ProviderError; connection trouble and timeouts are retryable."""
+    if isinstance(exc, ProviderError):
+        return exc
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        r = exc.response
+        return http_error(r.status_code, r.text, r.headers.get("Retry-After"))
+    if isinstance(exc, (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError,
+                        requests.ConnectionError, requests.Timeout)):
+        return ProviderError(f"Request failed: {exc.__class__.__name__} {exc}".strip(), retryable=True)
+    return ProviderError(f"Request failed: {exc}")
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE_S, cap: float = BACKOFF_MAX_S,
+                  retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+class CircuitBreaker:
+    """Stops sending requests to an endpoint after repeated failures.
+
+    Closed: requests flow. Open: requests are refused until the cooldown
+    passes. Half-open: one probe request is let through; its outcome closes
+    or reopens the breaker. A probe that ends without an outcome (cancelled,
+    or never sent) gives its slot back so the next request can probe.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(self, failures: int = BREAKER_FAILURES, cooldown_s: float = BREAKER_COOLDOWN_S):
+        self.threshold = failures
+        self.cooldown_s = cooldown_s
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False        # the half-open probe is out
+        self._lock = threading.Lock()
+
+    def admit(self) -> Optional[bool]:
+        """None when refused; otherwise whether this request is the half-open probe."""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown_s:
+                self.state = self.HALF_OPEN
+                self.probing = False
+            if self.state == self.CLOSED:
+                return False
+            if self.state == self.HALF_OPEN and not self.probing:
+                self.probing = True
+                return True
+            return None
+
+    def allow(self) -> bool:
+        return self.admit() is not None
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+    def release(self):
+        """Give back the probe slot of a probe that produced no outcome."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.probing = False
+
+
+class BreakerBoard:
+    """One circuit breaker per endpoint (scheme + host), shared by every model it serves."""
+
+    def __init__(self, failures: int = BREAKER_FAILURES, cooldown_s: float = BREAKER_COOLDOWN_S):
+        self.failures = failures
+        self.cooldown_s = cooldown_s
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def breaker_for(self, api_url: str) -> CircuitBreaker:
+        parts = urlsplit(api_url or "")
+        origin = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            breaker = self._breakers.get(origin)
+            if breaker is None:
+                breaker = self._breakers[origin] = CircuitBreaker(self.failures, self.cooldown_s)
+            return breaker
+
+    def states(self) -> dict:
+        with self._lock:
+            return {origin: breaker.state for origin, breaker in self._breakers.items()}
+
+
+# shared by the engine's streaming path and the blocking path
+breakers = BreakerBoard()
+
+
+class RetryPolicy:
+    def __init__(self, attempts: int = RETRY_ATTEMPTS, deadline_s: float = DEADLINE_S,
+                 first_token_s: float = FIRST_TOKEN_TIMEOUT_S, base_s: float = BACKOFF_BASE_S,
+                 max_s: float = BACKOFF_MAX_S):
+        self.attempts = max(1, attempts)
+        self.deadline_s = deadline_s
+        self.first_token_s = first_token_s
+        self.base_s = base_s
+        self.max_s = max_s
+
+
+class Failover:
+    """Retries one request across an ordered list of models within a deadline.
+
+    Each model gets up to `policy.attempts` tries with jittered backoff.
+    A model moves on to the next one when its error is not retryable, when
+    its endpoint's breaker opens, or when the next backoff would overrun the
+    deadline. Models behind an open breaker are skipped. Nothing is retried
+    once part of an answer has been delivered, because the reader has
+    already seen it.
+
+    on_switch(llm, error) runs when a model other than the first takes over.
+    """
+
+    def __init__(self, candidates, policy: RetryPolicy = None, board: BreakerBoard = breakers,
+                 on_switch: Optional[Callable] = None):
+        self.logger = setup_daily_logger(name=LOGGER_NAME, log_dir=LOGGER_DIR)
+        self.candidates = list(candidates)
+        self.policy = policy or RetryPolicy()
+        self.board = board
+        self.on_switch = on_switch
+        self.errors = []            # (model, message) for every failed attempt
+        self.served_by = None
+        self._deadline = 0.0
+        self._probe = None          # the breaker whose half-open probe this request carries
+
+    def _resolve(self, breaker, ok: bool):
+        self._probe = None
+        if ok:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+
+    def _release_probe(self):
+        # cancelled, refused by the rate limiter, or failed without reaching the endpoint
+        if self._probe is not None:
+            self._probe.release()
+            self._probe = None
+
+    def _failed(self, llm, breaker, attempt, error: ProviderError):
+        """Record a failure; returns the backoff before the next try, or None to move on."""
+        self.errors.append((llm.model, str(error)))
+        if error.status == 429:
+            # the provider's quota is spent: hold every request to this endpoint, not just this one
+            llm.limiter().block(error.retry_after or RATE_LIMIT_BLOCK_S)
+        if error.retryable and error.status != 429:
+            # server errors, timeouts and connection trouble count against the endpoint
+            self._resolve(breaker, ok=False)
+        elif error.status is not None:
+            # any other HTTP answer (4xx, 429) means the endpoint itself is up
+            self._resolve(breaker, ok=True)
+        self.logger.warning("%s attempt %d failed: %s", llm.model, attempt + 1, error)
+        if not error.retryable or breaker.state == CircuitBreaker.OPEN or attempt + 1 >= self.policy.attempts:
+            return None
+        delay = backoff_delay(attempt, self.policy.base_s, self.policy.max_s, error.retry_after)
+        return delay if time.monotonic() + delay < self._deadline else None
+
+    def _give_up(self) -> ProviderError:
+        detail = "; ".join(f"{model}: {message}" for model, message in self.errors[-4:])
+        return ProviderError(f"no model answered: {detail}" if detail else "no model available")
+
+    def _begin(self, llm, first: bool):
+        # the first candidate was announced by the caller; tell it about any other
+        if not first and self.on_switch is not None:
+            self.on_switch(llm, self.errors[-1][1] if self.errors else None)
+        self.served_by = llm
+
+    def _tries(self):
+        self._deadline = time.monotonic() + self.policy.deadline_s
+        for index, llm in enumerate(self.candidates):
+            breaker = self.board.breaker_for(llm.api_url)
+            probe = breaker.admit()
+            if probe is None:
+                self.logger.warning("skipping %s: circuit open for its endpoint", llm.model)
+                self.errors.append((llm.model, "circuit open"))
+                continue
+            self._probe = breaker if probe else None
+            self._begin(llm, self.served_by is None and index == 0)
+            for attempt in range(self.policy.attempts):
+                remaining = self._deadline - time.monotonic()
+                if remaining <= 0:
+                    self._release_probe()
+                    return
+                delay = yield llm, breaker, attempt, remaining
+                if delay is None:
+                    break
+
+    def _admit(self, llm, prompt: str):
+        """Reserve quota for a try; returns (seconds to wait first, tokens reserved).
+
+        When the endpoint is over its rate limit and a later candidate could
+        go at once, the request moves there. Otherwise it waits its turn,
+        provided the wait fits in the deadline.
+        """
+        limiter = llm.limiter()
+        tokens = llm.estimate_tokens(prompt)
+        wait = limiter.wait(tokens)
+        if wait > 0:
+            limiter.note_limited()
+            later = self.candidates[self.candidates.index(llm) + 1:]
+            if any(self.board.breaker_for(c.api_url).state != CircuitBreaker.OPEN and
+                   c.limiter().wait(c.estimate_tokens(prompt)) == 0 for c in later):
+                raise ProviderError(f"rate limited for {wait:.1f}s, trying the next model")
+            if time.monotonic() + wait >= self._deadline:
+                raise ProviderError(f"rate limited for {wait:.1f}s, past the deadline")
+            self.logger.info("%s rate limited, queued for %.1f s", llm.model, wait)
+        limiter.take(tokens)
+        return wait, tokens
+
+    def _settle(self, llm, breaker, prompt, reserved, response):
+        self._resolve(breaker, ok=True)
+        llm.limiter().settle(reserved, llm.estimate_tokens(prompt, response))
+
+    @staticmethod
+    def _refund(llm, reserved):
+        # a try that produced nothing used no output tokens; give its reservation back
+        if reserved:
+            llm.limiter().settle(reserved, 0)
+
+    def _queued(self, since: float):
+        # waiting for a free engine slot is the caller's queue, not the provider's time
+        self._deadline += time.monotonic() - since
+
+    async def astream(self, attempt: Callable, on_delta: Optional[Callable[[str], None]] = None,
+                      prompt: str = "", slot: Optional[Callable] = None) -> str:
+        """Run attempt(llm, on_delta) coroutines until one finishes; returns its response.
+
+        slot() returns an async context manager held around each try's request
+        only, so rate-limit waits and backoff sleeps do not occupy it.
+        """
+        state = {"delivered": False}
+        first = asyncio.Event()
+
+        def deliver(text):
+            if text:
+                state["delivered"] = True
+                first.set()
+            if on_delta is not None:
+                on_delta(text)
+
+        tries = self._tries()
+        try:
+            step = next(tries)
+        except StopIteration:
+            raise self._give_up()
+        while True:
+            llm, breaker, n, remaining = step
+            task = waiter = None
+            reserved = 0
+            try:
+                wait, reserved = self._admit(llm, prompt)
+                if wait:
+                    with llm.limiter().queued_for(wait):
+                        await asyncio.sleep(wait)
+                    remaining -= wait
+                since = time.monotonic()
+                async with slot() if slot else contextlib.nullcontext():
+                    self._queued(since)
+                    first.clear()
+                    task = asyncio.ensure_future(attempt(llm, deliver))
+                    waiter = asyncio.ensure_future(first.wait())
+                    done, _ = await asyncio.wait({task, waiter}, timeout=min(remaining, self.policy.first_token_s),
+                                                 return_when=asyncio.FIRST_COMPLETED)
+                    waiter.cancel()
+                    if not done:
+                        task.cancel()
+                        raise ProviderError(f"no first token within {min(remaining, self.policy.first_token_s):.1f}s",
+                                            retryable=True)
+                    response = await task
+            except asyncio.CancelledError:
+                for pending in (task, waiter):
+                    if pending is not None:
+                        pending.cancel()
+                if not state["delivered"]:
+                    self._refund(llm, reserved)
+                self._release_probe()
+                raise
+            except Exception as e:
+                error = classify(e)
+                if state["delivered"]:
+                    if error.retryable:
+                        self._resolve(breaker, ok=False)
+                    self._release_probe()
+                    raise error from e
+                self._refund(llm, reserved)
+                delay = self._failed(llm, breaker, n, error)
+                self._release_probe()
+                if delay:
+                    await asyncio.sleep(delay)
+                try:
+                    step = tries.send(delay)
+                except StopIteration:
+                    raise self._give_up() from e
+                continue
+            self._settle(llm, breaker, prompt, reserved, response)
+            return response
+
+    async def acall(self, attempt: Callable, prompt: str = "", slot: Optional[Callable] = None) -> str:
+        """Run attempt(llm, timeout) coroutines until one returns a full response.
+
+        The non-streaming counterpart of astream: there is no first token to
+        wait for, so each try may take the whole remaining deadline.
+        """
+        tries = self._tries()
+        try:
+            step = next(tries)
+        except StopIteration:
+            raise self._give_up()
+        while True:
+            llm, breaker, n, remaining = step
+            reserved = 0
+            try:
+                wait, reserved = self._admit(llm, prompt)
+                if wait:
+                    with llm.limiter().queued_for(wait):
+                        await asyncio.sleep(wait)
+                    remaining -= wait
+                since = time.monotonic()
+                async with slot() if slot else contextlib.nullcontext():
+                    self._queued(since)
+                    response = await asyncio.wait_for(attempt(llm, remaining), timeout=remaining)
+            except asyncio.CancelledError:
+                self._refund(llm, reserved)
+                self._release_probe()
+                raise
+            except Exception as e:
+                self._refund(llm, reserved)
+                delay = self._failed(llm, breaker, n, classify(e))
+                self._release_probe()
+                if delay:
+                    await asyncio.sleep(delay)
+                try:
+                    step = tries.send(delay)
+                except StopIteration:
+                    raise self._give_up() from e
+                continue
+            self._settle(llm, breaker, prompt, reserved, response)
+            return response
+
+    def call(self, attempt: Callable, prompt: str = "", slot: Optional[Callable] = None) -> str:
+        """Blocking counterpart of astream: attempt(llm, timeout) returns the full response."""
+        tries = self._tries()
+        try:
+            step = next(tries)
+        except StopIteration:
+            raise self._give_up()
+        while True:
+            llm, breaker, n, remaining = step
+            reserved = 0
+            try:
+                wait, reserved = self._admit(llm, prompt)
+                if wait:
+                    with llm.limiter().queued_for(wait):
+                        time.sleep(wait)
+                    remaining -= wait
+                since = time.monotonic()
+                with slot() if slot else contextlib.nullcontext():
+                    self._queued(since)
+                    response = attempt(llm, remaining)
+            except Exception as e:
+                self._refund(llm, reserved)
+                delay = self._failed(llm, breaker, n, classify(e))
+                self._release_probe()
+                if delay:
+                    time.sleep(delay)
+                try:
+                    step = tries.send(delay)
+                except StopIteration:
+                    raise self._give_up() from e
+                continue
+            self._settle(llm, breaker, prompt, reserved, response)
+            return response
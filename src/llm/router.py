@@ -0,0 +1,119 @@
+# llm/router.py
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from src.llm.resilience import CircuitBreaker, breakers
+from src.llm.wrapper import LLMWrapper
+from src.utils.constants import LOGGER_DIR, LOGGER_NAME
+from src.utils.logger import setup_daily_logger
+from src.utils.perf import StreamStats, latency_registry
+
+AUTO_MODEL = "auto"
+ROUTE_WINDOW = 20           # most recent completions per model that count
+ROUTE_MIN_SAMPLES = 2
+ROUTE_ANSWER_TOKENS = 200   # typical answer length used to weigh TTFT against throughput
+ROUTE_MARGIN = 0.2          # a rival must be this much faster before the route moves
+ROUTE_HOLD_S = 30.0         # and the current route must have been held this long
+PROBE_INTERVAL_S = 0        # seconds between probes; 0 leaves probing off
+PROBE_TOKENS = 8
+PROBE_PROMPT = "Reply with the single word: ok"
+
+
+@dataclass
+class RouteDecision:
+    model: str
+    reason: str
+    scores: dict = field(default_factory=dict)   # model -> estimated answer time in ms, None if unknown
+
+    def describe(self) -> str:
+        score = self.scores.get(self.model)
+        estimate = f" · ~{score / 1000:.1f} s" if score else ""
+        return f"auto → {self.model}{estimate} ({self.reason})"
+
+
+class ModelRouter:
+    """Sends each question to the model that should answer it soonest.
+
+    A model's score is its recent TTFT p50 plus the time to stream a
+    typical answer at its recent tokens/s p50. The samples come from real
+    traffic and from optional probes, all through the shared latency
+    registry. Models whose endpoint breaker is open do not count. The route
+    only moves when a rival beats the current model by `margin` and the
+    current model has held the route for `hold_s`, so close scores do not
+    flap. An unhealthy current model is left at once.
+    """
+
+    def __init__(self, margin: float = ROUTE_MARGIN, hold_s: float = ROUTE_HOLD_S,
+                 window: int = ROUTE_WINDOW, min_samples: int = ROUTE_MIN_SAMPLES,
+                 registry=latency_registry, board=breakers):
+        self.logger = setup_daily_logger(name=LOGGER_NAME, log_dir=LOGGER_DIR)
+        self.margin = margin
+        self.hold_s = hold_s
+        self.window = window
+        self.min_samples = min_samples
+        self.registry = registry
+        self.board = board
+        self.current = None
+        self.since = 0.0
+        self._probe_next = 0
+
+    def score(self, model: str) -> Optional[float]:
+        summary = self.registry.summary(model, last=self.window)
+        if summary["samples"] < self.min_samples:
+            return None
+        rate = summary["tokens_per_sec_p50"]
+        generating = ROUTE_ANSWER_TOKENS / rate * 1000 if rate > 0 else 0.0
+        return summary["ttft_ms_p50"] + generating
+
+    def healthy(self, config: dict) -> bool:
+        return self.board.breaker_for(config.get("url")).state != CircuitBreaker.OPEN
+
+    def choose(self, configs: list, fallback: str) -> RouteDecision:
+        """Pick the model for the next question from the settings "models" entries."""
+        healthy = [c["name"] for c in configs if self.healthy(c)]
+        scores = {c["name"]: self.score(c["name"]) for c in configs}
+        known = {name: scores[name] for name in healthy if scores[name] is not None}
+        current = self.current or fallback
+        now = time.monotonic()
+
+        if current not in healthy:
+            ranked = sorted(known, key=known.get) + [name for name in healthy if name not in known]
+            target, reason = (ranked[0], f"{current} unhealthy") if ranked else (current, "no healthy model")
+        elif not known:
+            target, reason = current, "no samples yet"
+        else:
+            best = min(known, key=known.get)
+            if best == current:
+                target, reason = current, "fastest"
+            elif current not in known:
+                target, reason = best, f"no samples for {current}"
+            elif known[best] >= known[current] * (1 - self.margin):
+                target, reason = current, f"{best} not {self.margin:.0%} faster"
+            elif now - self.since < self.hold_s:
+                target, reason = current, f"holding for {self.hold_s - (now - self.since):.0f} s"
+            else:
+                target, reason = best, f"{known[best]:.0f} ms vs {known[current]:.0f} ms"
+
+        if target != self.current:
+            self.logger.info("route %s -> %s: %s", self.current or fallback, target, reason)
+            self.current, self.since = target, now
+        return RouteDecision(target, reason, scores)
+
+    def probe(self, configs: list, engine, answer_queue) -> Optional[str]:
+        """Send one tiny completion to the next model in turn; its timings land in the registry."""
+        candidates = [c for c in configs if self.healthy(c)]
+        if not candidates:
+            return None
+        config = candidates[self._probe_next % len(candidates)]
+        self._probe_next += 1
+        llm = LLMWrapper.from_config(config, answer_queue)
+        llm.max_tokens = PROBE_TOKENS
+        future = engine.stream(llm, PROBE_PROMPT, stats=StreamStats(llm.model))
+
+        def done(f):
+            if not f.cancelled() and f.exception() is not None:
+                self.logger.warning("probe of %s failed: %s", llm.model, f.exception())
+
+        future.add_done_callback(done)
+        return llm.model
@@ -0,0 +1,86 @@
+# llm/sse.py
+"""Incremental text/event-stream parsing for chat completion streams."""
+import json
+from json.decoder import scanstring
+from typing import List
+
+from src.llm.resilience import ProviderError
+
+try:
+    import orjson               # optional, several times faster on the full-parse fallback
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
+
+DONE = b"[DONE]"
+CONTENT_KEY = '"content":'
+
+
+class SSEParser:
+    """Turns raw byte chunks into event data payloads, however the chunks split the events.
+
+    Each chunk is split into lines in one pass. Only the unfinished last
+    line is kept and joined to the next chunk, so complete events are never
+    copied into a buffer. Lines may end in LF, CRLF or CR. Several `data:`
+    lines in one event are joined with LF. Comment lines (": keep-alive")
+    and other fields (event, id, retry) are skipped.
+    """
+
+    __slots__ = ("_pending", "_data")
+
+    def __init__(self):
+        self._pending = b""      # an unfinished line from the previous chunk
+        self._data = []          # data lines of the event being read
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        """Data payloads of every event completed by this chunk, in order."""
+        if self._pending:
+            chunk = self._pending + chunk
+        if b"\r" in chunk:
+            # rare in practice; normalise to LF. A trailing CR waits for the next
+            # chunk, which may start with the LF of the same CRLF
+            tail = chunk.endswith(b"\r")
+            chunk = chunk[:-1] if tail else chunk
+            chunk = chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n") + (b"\r" if tail else b"")
+        lines = chunk.split(b"\n")
+        self._pending = lines.pop()
+        events = []
+        data = self._data
+        for line in lines:
+            if not line:
+                # a blank line dispatches the event
+                if data:
+                    events.append(data[0] if len(data) == 1 else b"\n".join(data))
+                    data = self._data = []
+            elif line[:5] == b"data:":
+                data.append(line[6:] if line[5:6] == b" " else line[5:])
+        return events
+
+    def flush(self) -> List[bytes]:
+        """An event left open when the stream ended without its blank line."""
+        if not self._pending and not self._data:
+            return []
+        return self.feed(b"\n\n")
+
+
+def delta_content(data: bytes) -> str:
+    """The `choices[0].delta.content` text of one completion chunk.
+
+    A chunk with exactly one "content" key holding a string is read
+    straight from that string. Anything else is fully parsed: errors,
+    null content, logprobs and other shapes.
+    """
+    text = data.decode("utf-8")
+    key = text.find(CONTENT_KEY)
+    if key >= 0 and text.find(CONTENT_KEY, key + 10) < 0 and '"error"' not in text:
+        value = key + 10
+        while text[value:value + 1] == " ":
+            value += 1
+        if text[value:value + 1] == '"':
+            return scanstring(text, value + 1)[0]
+    chunk = loads(text)
+    if chunk.get("error"):
+        # some providers report overload inside an already-open stream
+        raise ProviderError(f"stream error: {chunk['error']}", retryable=True)
+    choices = chunk.get("choices") or [{}]
+    return (choices[0].get("delta") or {}).get("content") or ""
@@ -1,13 +1,23 @@
 # llm wrapper .py
 from __future__ import annotations
 import os
-from typing import Any, List, Optional
+from typing import Any, Callable, List, Optional
+import aiohttp
 import requests
 from langchain.llms.base import LLM
 from pydantic import BaseModel
 import json 
 import queue  
 
+from src.llm.http import connection_pool, CONNECT_TIMEOUT
+from src.llm.engine import get_engine
+from src.llm.resilience import classify, http_error
+from src.llm.sse import DONE, SSEParser, delta_content
+from src.llm.ratelimit import ANSWER_TOKENS, EndpointLimiter, rate_limits
+from src.workers.messages import ResultChannel
+from src.utils.perf import StreamStats
+from src.utils.tokens import count_tokens
+
 class LLMWrapper(LLM):
     """LangChain LLM base-class wrapper for Google Gemini (OpenAI-compatible)."""
 
@@ -18,19 +28,39 @@ class LLMWrapper(LLM):
     temperature: float = 0.2
     max_tokens: Optional[int] = None
     timeout: int = 30
+    rpm: Optional[int] = None    # provider limits; unset means the endpoint's free-tier default
+    tpm: Optional[int] = None
     
+    @classmethod
+    def from_config(cls, config: dict, answer_queue: queue.Queue) -> "LLMWrapper":
+        """Build a wrapper from a settings "models" entry; temperature, max_tokens and timeout are optional."""
+        wrapper = cls(model=config.get("name"), api_url=config.get("url"), api_key=config.get("key"),
+                      answer_queue=answer_queue)
+        wrapper.apply_config(config)
+        return wrapper
+
+    def apply_config(self, config: Optional[dict]) -> None:
+        """Take a model's optional settings; any it leaves out go back to their defaults."""
+        for field in ("temperature", "max_tokens", "timeout", "rpm", "tpm"):
+            value = (config or {}).get(field)
+            setattr(self, field, self.__fields__[field].default if value is None else value)
+
+    def limiter(self) -> EndpointLimiter:
+        return rate_limits.limiter_for(self.api_url, self.rpm, self.tpm)
+
+    def estimate_tokens(self, prompt: str, answer: Optional[str] = None) -> int:
+        """Tokens a request counts against the quota; before it runs the answer is assumed full length."""
+        if answer is None:
+            return count_tokens(prompt) + (self.max_tokens or ANSWER_TOKENS)
+        return count_tokens(prompt) + count_tokens(answer)
+
     @property
     def _llm_type(self) -> str:
         """Return type of llm."""
         return self.model
     
-    def _call_stream(
-        self,
-        prompt: str,
-        stop: Optional[List[str]] = None,
-        **kwargs: Any,
-    ) -> str:
-        """Core synchronous call required by LLM base."""
+    def _stream_request(self, prompt: str, stop: Optional[List[str]] = None):
+        """Headers and payload for a streaming chat completion."""
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
@@ -54,56 +84,114 @@ class LLMWrapper(LLM):
             payload["max_tokens"] = self.max_tokens
         if stop:
             payload["stop"] = stop
-        
-        # resp = requests.post(
-        #     self.api_url,
-        #     headers=headers,
-        #     json=payload,
-        #     timeout=self.timeout,
-        # )
-        # resp.raise_for_status()
-        stream = True
-        full_response = ""
-        if stream:
-           with requests.post(self.api_url, headers=headers, json=payload, stream=True) as r:
-                for line in r.iter_lines(decode_unicode=True):
-                    if not line:                      # skip keep-alive
-                        continue
-                    if line == "data: [DONE]":        # upstream done
-                        self.answer_queue.put("data: [DONE]")
-                        break
-                    if line.startswith("data: "):
-                        chunk = json.loads(line[6:])  # remove "data: " prefix
-                        delta = chunk.get("choices", [{}])[0].get("delta", {})
-                        content = delta.get("content", "")
-                        self.answer_queue.put(content)
-                        full_response += content
-        return full_response
+        return headers, payload
+
+    async def _astream(
+        self,
+        session,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        on_delta: Optional[Callable[[str], Any]] = None,
+        stats: Optional[StreamStats] = None,
+    ) -> str:
+        """Stream a completion over an aiohttp session, pushing each content delta to on_delta."""
+        headers, payload = self._stream_request(prompt, stop)
+        parser = SSEParser()
+        parts = []
+
+        def take(data):
+            content = delta_content(data)
+            if stats is not None and content:
+                stats.on_delta(content)
+            if on_delta is not None:
+                on_delta(content)
+            parts.append(content)
+
+        async with session.post(self.api_url, headers=headers, json=payload, trace_request_ctx=stats) as r:
+            self.limiter().observe(r.headers)
+            if r.status >= 400:
+                # the error body says why (quota, model name, ...); keep it in the message
+                raise http_error(r.status, await r.text(), r.headers.get("Retry-After"))
+            # raw chunks as they arrive; the parser finds event boundaries itself
+            async for chunk in r.content.iter_any():
+                for data in parser.feed(chunk):
+                    if data == DONE:              # upstream done
+                        return "".join(parts)
+                    take(data)
+            for data in parser.flush():
+                if data != DONE:
+                    take(data)
+        return "".join(parts)
+
+    def _call_stream(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> str:
+        """Blocking streaming call; runs on the shared engine and waits for the result."""
+        channel = ResultChannel(self.answer_queue, model=self.model)
+        try:
+            response = get_engine().stream(self, prompt, stop=stop, on_delta=channel.delta).result()
+        except Exception as e:
+            channel.error(str(e))
+            raise
+        channel.done()
+        return response
     
-    def _call(self, prompt: str, stop=None) -> str:
+    def _call_request(self, prompt: str, stop: Optional[List[str]] = None):
+        """Headers and payload for a non-streaming chat completion."""
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": self.temperature,
+            "n": 1  # Must be 1 for Groq
+        }
+        if self.max_tokens is not None:
+            payload["max_tokens"] = self.max_tokens
+        if stop:
+            payload["stop"] = stop
+        return headers, payload
+
+    async def _acall(self, session, prompt: str, stop: Optional[List[str]] = None,
+                     timeout: Optional[float] = None) -> str:
+        """Non-streaming completion over an aiohttp session; cancelling the task aborts the request."""
+        headers, payload = self._call_request(prompt, stop)
+        limit = aiohttp.ClientTimeout(total=min(self.timeout, timeout or self.timeout), sock_connect=CONNECT_TIMEOUT)
+        async with session.post(self.api_url, headers=headers, json=payload, timeout=limit) as r:
+            self.limiter().observe(r.headers)
+            if r.status >= 400:
+                raise http_error(r.status, await r.text(), r.headers.get("Retry-After"))
+            return (await r.json(content_type=None))["choices"][0]["message"]["content"]
+
+    def _call(self, prompt: str, stop=None, timeout: Optional[float] = None) -> str:
+        headers, payload = self._call_request(prompt, stop)
         try:
             # print("prompt--", prompt)
-            response = requests.post(
+            session = connection_pool.session_for(self.api_url)
+            response = session.post(
                 self.api_url,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "llama-3.3-70b-versatile",  # Valid Groq model
-                    "messages": [{"role": "user", "content": prompt}],
-                    "max_tokens": 500,
-                    "temperature": 0.7,  # Valid float32 value
-                    "n": 1  # Must be 1 for Groq
-                }
+                headers=headers,
+                json=payload,
+                timeout=(CONNECT_TIMEOUT, min(self.timeout, timeout or self.timeout)),
             )
+            self.limiter().observe(response.headers)
             response.raise_for_status()  # Raises exception for 4xx/5xx errors
             return response.json()["choices"][0]["message"]["content"]
-        except requests.exceptions.HTTPError as e:
-            error_message = f"HTTP Error: {e.response.status_code} - {e.response.text}"
-            raise Exception(error_message)
         except Exception as e:
-            raise Exception(f"Request failed: {str(e)}")
+            # HTTP errors keep their status and Retry-After so callers can decide to retry
+            raise classify(e) from e
+
+    def warm(self, streaming: bool = True) -> None:
+        """Pre-open a pooled connection to this model's endpoint."""
+        if streaming:
+            get_engine().warm(self.api_url)
+        else:
+            connection_pool.warm(self.api_url)
 
     # LangChain ≥ 0.2 uses `invoke`; delegate to `_call` for compatibility
     def invoke(
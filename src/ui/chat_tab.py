@@ -2,36 +2,69 @@
 from PyQt6.QtWidgets import (
     QWidget, QHBoxLayout, QVBoxLayout, QPushButton,
     QTextEdit, QLineEdit, QComboBox, QLabel, QListWidget,
-    QFrame
+    QFrame, QCheckBox, QListWidgetItem
 )
 from PyQt6.QtGui import QTextCursor
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QFileSystemWatcher, QTimer
 from src.ui.widgets.llm_selector import LLMSelector
+from src.ui.widgets.loom_view import LoomView
 from src.workers.llm_worker import LLMWorkerThread
+from src.workers.transcript_worker import TranscriptWorkerThread
+from src.workers.session_loader import SessionLoaderThread, PAGE_SIZE
+from src.workers.messages import Kind, new_request_id
+from src.utils.perf import format_metrics
 from src.utils.logger import setup_daily_logger
 from src.utils.constants import LOGGER_DIR, LOGGER_NAME
 from src.llm.wrapper import LLMWrapper
 from src.chat.chat import ChatModule
+from src.chat.loom import LoomModule, stream_id
 from src.chat.session import FlatChatSessionLogger
+from src.llm.engine import get_engine, EngineSaturated
+from src.llm.router import AUTO_MODEL, ModelRouter
 import queue 
 import os 
-import threading 
+import html
+import time
+from datetime import datetime
+from pathlib import Path
+
+SEARCH_DEBOUNCE_MS = 150
+SEARCH_LIMIT = 50
+RECENT_FILTERS = [("Last 7 days", 7), ("Last 30 days", 30), ("All sessions", None)]
+
+
+def session_title(meta):
+    started = datetime.fromtimestamp(meta["created"]).strftime("%b %d %H:%M")
+    question = meta["first_question"]
+    if not question:
+        return started
+    return f"{started} · {question[:40]}{'…' if len(question) > 40 else ''}"
 
 class ChatTab(QWidget):
     def __init__(self, settings):
         super().__init__()
         self.settings = settings 
         self.answer_queue = queue.Queue()
+        # request id -> cursor where that answer is written, so streams never interleave
+        self.answer_cursors = {}
+        self.loom_streams = set()
         self.logger = setup_daily_logger(name=LOGGER_NAME, log_dir=LOGGER_DIR)
+        self.engine = get_engine(max_concurrency=self.settings.get_max_concurrency(),
+                                 max_pending=self.settings.get_max_pending())
         self.llm = LLMWrapper(model=self.settings.get_current_model(),
                               api_url=self.settings.get_current_url(),
                               api_key=self.settings.get_current_key(),
                               answer_queue=self.answer_queue)
+        self.llm.apply_config(self.settings.get_model_config(self.llm.model))
         model = self.settings.get_current_model()
         url = self.settings.get_current_url()
         self.logger.info("initializing...%s with url %s", model, url)
-        self.session = FlatChatSessionLogger()
+        self.llm.warm(streaming=self.settings.is_steaming() == 1)
+        self.session = FlatChatSessionLogger(durability=self.settings.get_session_durability(),
+                                             batch_size=self.settings.get_session_batch_size(),
+                                             flush_ms=self.settings.get_session_flush_ms())
         self.chatModule = ChatModule(self.llm, self)
+        self.loomModule = LoomModule(self.chatModule, self)
         
         # add workers
         # Start worker thread
@@ -40,6 +73,33 @@ class ChatTab(QWidget):
         self.worker.update_signal.connect(self.update_display)  # Connect signal to slot
         self.worker.start()
 
+        # past sessions are paged in from the store off the GUI thread
+        self.viewed_session = None
+        self.view_focus = None
+        self.view_generation = 0
+        self.view_offset = 0
+        self.view_loading = False
+        self.view_exhausted = True
+        self.session_loader = SessionLoaderThread()
+        self.session_loader.set_app(self)
+        self.session_loader.page_loaded.connect(self.on_page_loaded)
+        self.session_loader.start()
+
+        # speech -> transcript; started by the Listen button
+        self.transcript_worker = TranscriptWorkerThread()
+        self.transcript_worker.set_app(self)
+        self.transcript_worker.partial_signal.connect(self.on_partial_transcript)
+        self.transcript_worker.utterance_signal.connect(self.on_utterance)
+        self.transcript_worker.error_signal.connect(self.on_listen_error)
+        self.transcript_worker.finished.connect(lambda: self.listen_button.setChecked(False))
+
+        # "auto" in the model picker routes each question to the fastest healthy model
+        self.router = ModelRouter(margin=self.settings.get_route_margin(), hold_s=self.settings.get_route_hold_s())
+        self.probe_timer = QTimer(self)
+        self.probe_timer.timeout.connect(self.on_probe_timer)
+        if self.settings.get_probe_interval_s() > 0:
+            self.probe_timer.start(int(self.settings.get_probe_interval_s() * 1000))
+
         self.init_ui()
 
     def init_ui(self):
@@ -61,29 +121,64 @@ class ChatTab(QWidget):
         new_chat_btn.clicked.connect(self.on_new_chat)
         sidebar_layout.addWidget(new_chat_btn)
 
+        # Full-text search over every logged interaction
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search past sessions...")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.setStyleSheet("margin-top: 20px; padding: 6px; border: 1px solid #ddd; border-radius: 5px;")
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.run_search)
+        self.search_box.textChanged.connect(lambda _: self.search_timer.start())
+        sidebar_layout.addWidget(self.search_box)
+
+        self.search_results = QListWidget()
+        self.search_results.setStyleSheet("border: 1px solid #ddd; border-radius: 5px;")
+        self.search_results.setWordWrap(True)
+        self.search_results.itemClicked.connect(self.on_search_hit_clicked)
+        self.search_results.hide()
+        sidebar_layout.addWidget(self.search_results, 1)
+
         # Recent Sessions Label
-        recent_label = QLabel("Recent (Last 7 Days)")
+        recent_label = QLabel("Recent")
         recent_label.setStyleSheet("font-weight: bold; margin-top: 20px; margin-bottom: 10px;")
         sidebar_layout.addWidget(recent_label)
 
-        # Recent Sessions List
+        self.recent_filter = QComboBox()
+        for label, days in RECENT_FILTERS:
+            self.recent_filter.addItem(label, days)
+        self.recent_filter.currentIndexChanged.connect(self.refresh_sessions)
+        sidebar_layout.addWidget(self.recent_filter)
+
+        # Recent Sessions List, kept in step with the sessions directory by a watcher
         self.recent_list = QListWidget()
-        self.recent_sessions = self.session.get_recent_sessions()
-        self.recent_list.setStyleSheet("""
-            QListWidget::item:selected {
-                background-color: #d0eaff;
-                color: black;
-            }
-            """)
-        self.sample_sessions = []
-        for session in self.recent_sessions:
-            self.sample_sessions.append(os.path.basename(session))
-        # Connect the click signal
-        self.recent_list.itemClicked.connect(self.on_item_clicked)
-       
-        self.recent_list.addItems(self.sample_sessions)
         self.recent_list.setStyleSheet("border: 1px solid #ddd; border-radius: 5px;")
+        self.recent_list.itemClicked.connect(self.on_item_clicked)
         sidebar_layout.addWidget(self.recent_list)
+        self.session_paths = {}
+        self.refresh_sessions()
+
+        self.session_watcher = QFileSystemWatcher([str(self.session.base_dir)], self)
+        self.session_watcher.directoryChanged.connect(self.on_sessions_dir_changed)
+
+        # Loom: fan a question out to several models
+        self.loom_checkbox = QCheckBox("Loom (multi-model)")
+        self.loom_checkbox.setStyleSheet("font-weight: bold; margin-top: 20px;")
+        self.loom_checkbox.stateChanged.connect(self.on_loom_toggled)
+        sidebar_layout.addWidget(self.loom_checkbox)
+
+        self.race_checkbox = QCheckBox("Race (first token wins)")
+        sidebar_layout.addWidget(self.race_checkbox)
+
+        self.loom_models = QListWidget()
+        self.loom_models.setStyleSheet("border: 1px solid #ddd; border-radius: 5px;")
+        for name in self.settings.get_model_names():
+            item = QListWidgetItem(name)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Unchecked)
+            self.loom_models.addItem(item)
+        sidebar_layout.addWidget(self.loom_models)
 
         sidebar_layout.addStretch()  # Push everything to top
 
@@ -97,8 +192,14 @@ class ChatTab(QWidget):
         self.chat_display.setReadOnly(True)
         self.chat_display.setStyleSheet("font-size: 14px; border: 1px solid #ddd; border-radius: 8px; padding: 10px;")
         self.chat_display.setPlaceholderText("Your conversation will appear here...")
+        self.chat_display.verticalScrollBar().valueChanged.connect(self.on_display_scrolled)
         chat_layout.addWidget(self.chat_display, 1)  # Take available space
 
+        # Loom panes (one per model), hidden until loom mode is on
+        self.loom_view = LoomView()
+        self.loom_view.setVisible(False)
+        chat_layout.addWidget(self.loom_view, 2)
+
         # Input Area (Model Picker + Text Box + Button)
         input_container = QWidget()
         input_layout = QHBoxLayout(input_container)
@@ -114,6 +215,14 @@ class ChatTab(QWidget):
         self.input_box.returnPressed.connect(self.on_send_chat)  # Enter key sends
         input_layout.addWidget(self.input_box, 1)  # Take remaining space
 
+        # Listen Button: transcribe speech into the input box
+        self.listen_button = QPushButton("Listen")
+        self.listen_button.setCheckable(True)
+        self.listen_button.setFixedWidth(80)
+        self.listen_button.setStyleSheet("padding: 8px; border: 1px solid #ddd; border-radius: 4px;")
+        self.listen_button.toggled.connect(self.on_listen_toggled)
+        input_layout.addWidget(self.listen_button)
+
         # Send Button
         self.send_button = QPushButton("Chat")
         self.send_button.setFixedWidth(80)
@@ -121,10 +230,18 @@ class ChatTab(QWidget):
         self.send_button.clicked.connect(self.on_send_chat)
         input_layout.addWidget(self.send_button)
 
+        # Stop Button
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.setFixedWidth(80)
+        self.stop_button.setStyleSheet("padding: 8px; background-color: #ff4d4f; color: white; border-radius: 4px; font-weight: bold;")
+        self.stop_button.clicked.connect(self.on_stop_chat)
+        input_layout.addWidget(self.stop_button)
+
         chat_layout.addWidget(input_container)
 
         # Model Picker
         self.llm_selector = LLMSelector(self.settings)
+        self.llm_selector.combo.currentTextChanged.connect(self.on_model_changed)
         input_layout.addWidget(self.llm_selector)
 
         # Add Sidebar and Chat Area to Main Layout
@@ -140,43 +257,216 @@ class ChatTab(QWidget):
         list_widget.clear()               # Remove all existing items
         list_widget.addItems(items)       # Add new items
 
-    def update_display(self, delta):
-        # self.chat_display.append(f"<b>{self.llm_selector.model_name}</b>: ")
-        if delta == "data: [DONE]":
-            self.chat_display.append(f"<b>{self.llm_selector.model_name} : Done...</b><br><br> ")
-        else:
-            self.chat_display.moveCursor(QTextCursor.MoveOperation.End)
-            self.chat_display.insertPlainText(delta)
+    def refresh_sessions(self):
+        """Rebuild the sidebar from the session metadata index."""
+        sessions = self.session.recent_sessions(self.recent_filter.currentData())
+        self.session_paths = {meta["session"]: meta["path"] for meta in sessions}
+        viewed = Path(self.viewed_session).stem if self.viewed_session else None
+        self.recent_list.clear()
+        for meta in sessions:
+            item = QListWidgetItem(session_title(meta))
+            item.setData(Qt.ItemDataRole.UserRole, meta["session"])
+            item.setToolTip(f"{meta['session']}\n{meta['interactions']} interactions"
+                            f"{' via ' + meta['models'].replace(',', ', ') if meta['models'] else ''}")
+            self.recent_list.addItem(item)
+            if meta["session"] == viewed:
+                self.recent_list.setCurrentItem(item)
 
-        # self.chat_display.append(text)
+    def run_search(self):
+        query = self.search_box.text().strip()
+        self.search_results.setVisible(bool(query))
+        if not query:
+            return
+        start = time.perf_counter()
+        hits = self.session.store.search(query, limit=SEARCH_LIMIT)
+        self.logger.debug("search %r: %d hits in %.1f ms", query, len(hits),
+                          (time.perf_counter() - start) * 1000)
+        self.search_results.clear()
+        for hit in hits:
+            started = datetime.fromtimestamp(hit["ts"]).strftime("%b %d")
+            item = QListWidgetItem(f"{started} · {hit['question'][:60]}\n{hit['snippet'] or ''}")
+            item.setData(Qt.ItemDataRole.UserRole, (hit["id"], hit["path"]))
+            item.setToolTip(f"{hit['session']} via {hit['model']}")
+            self.search_results.addItem(item)
+        if not hits:
+            self.search_results.addItem(QListWidgetItem("No matches"))
+
+    def on_search_hit_clicked(self, item):
+        hit = item.data(Qt.ItemDataRole.UserRole)
+        if hit is None or hit[1] is None:
+            return
+        interaction_id, path = hit
+        self.open_session(path, focus_id=interaction_id)
+
+    def on_sessions_dir_changed(self, path):
+        if self.session.store.sync_dir(path):
+            self.refresh_sessions()
+
+    def open_answer(self, header_html):
+        """Append a header and reserve a cursor for the answer that follows it."""
+        request_id = new_request_id()
+        self.chat_display.append(header_html)
+        cursor = QTextCursor(self.chat_display.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        # keep an empty block below the answer so later appends land after it
+        cursor.setKeepPositionOnInsert(True)
+        self.chat_display.append("")
+        cursor.setKeepPositionOnInsert(False)
+        cursor.clearSelection()
+        self.answer_cursors[request_id] = cursor
+        return request_id
+
+    def update_display(self, messages):
+        for message in messages:
+            self.show_message(message)
+
+    def show_message(self, message):
+        if message.request_id in self.loom_streams:
+            self.loom_view.show_message(message)
+            if message.kind in (Kind.DONE, Kind.ERROR, Kind.CANCELLED):
+                self.loom_streams.discard(message.request_id)
+            return
+
+        cursor = self.answer_cursors.get(message.request_id)
+        if cursor is None:
+            return
+        if message.kind is Kind.DELTA:
+            cursor.insertText(message.payload)
+        elif message.kind is Kind.HINT:
+            match = message.payload
+            answer = html.escape(match["answer"]).replace("\n", "<br>")
+            text_format = cursor.charFormat()
+            cursor.insertHtml(f"<span style='color:#888;'><i>Similar earlier question ({match['score']:.2f}): "
+                              f"{html.escape(match['question'])}</i><br>{answer}</span><br><br>")
+            cursor.setCharFormat(text_format)
+        elif message.kind is Kind.METRIC:
+            cursor.insertHtml(f"<br><i>{format_metrics(message.payload)}</i>")
+        elif message.kind is Kind.DONE:
+            cursor.insertHtml(f"<br><b>{message.model} : Done...</b><br>")
+            del self.answer_cursors[message.request_id]
+        elif message.kind is Kind.ERROR:
+            cursor.insertHtml(f"<br><i>llm error : {html.escape(message.payload)}</i><br>")
+            del self.answer_cursors[message.request_id]
+        elif message.kind is Kind.CANCELLED:
+            cursor.insertHtml(f"<br><i>{message.model} : stopped</i><br>")
+            del self.answer_cursors[message.request_id]
+
+    def on_loom_toggled(self, state):
+        self.loom_view.setVisible(self.loom_checkbox.isChecked())
+
+    def selected_loom_models(self):
+        models = []
+        for i in range(self.loom_models.count()):
+            item = self.loom_models.item(i)
+            if item.checkState() == Qt.CheckState.Checked:
+                models.append(item.text())
+        return models
+
+    def on_model_changed(self, model_name):
+        # selector has already updated settings and warmed the endpoint
+        if model_name != AUTO_MODEL:
+            self.use_model(model_name)
+
+    def use_model(self, model_name):
+        # a new wrapper, so requests still running keep the model, limits and endpoint they started with
+        self.llm = LLMWrapper.from_config(self.settings.get_model_config(model_name), self.answer_queue)
+        self.chatModule.llm = self.llm
+
+    def route(self):
+        """The model for the next question: the selected one, or in auto mode the router's pick."""
+        if not self.llm_selector.is_auto():
+            return self.llm_selector.model_name
+        decision = self.router.choose(self.settings.get_model_configs(), self.llm.model)
+        if decision.model != self.llm.model:
+            self.use_model(decision.model)
+        self.llm_selector.show_decision(decision)
+        return decision.model
+
+    def on_probe_timer(self):
+        if self.llm_selector.is_auto():
+            try:
+                self.router.probe(self.settings.get_model_configs(), self.engine, self.answer_queue)
+            except EngineSaturated:
+                pass   # busy with real questions, which measure the models anyway
 
     def on_item_clicked(self, item):
-        for session in self.recent_sessions:
-            if item.text() in session:
-                try:
-                    with open(session, "r", encoding="utf-8") as f:
-                        content = f.read()
-                        self.chat_display.setPlainText(content)
-                except Exception as e:
-                    self.chat_display.setPlainText(f"Error loading file:\n{e}")
-        
+        path = self.session_paths.get(item.data(Qt.ItemDataRole.UserRole))
+        if path is not None:
+            self.open_session(path)
+
+    def open_session(self, session_path, focus_id=None):
+        """Show a past session, paging its interactions in as the user scrolls.
+
+        With focus_id the first page reaches that interaction and the view jumps to it.
+        """
+        self.view_generation += 1
+        self.viewed_session = session_path
+        self.view_focus = focus_id
+        self.view_offset = 0
+        self.view_exhausted = False
+        self.view_loading = True
+        # answers still streaming keep being logged, they just stop rendering here
+        self.answer_cursors.clear()
+        self.chat_display.clear()
+        limit = PAGE_SIZE
+        if focus_id is not None:
+            limit += self.session.store.position(focus_id)
+        self.session_loader.request_page(self.view_generation, session_path, 0, limit)
+
+    def on_page_loaded(self, generation, offset, records):
+        if generation != self.view_generation:
+            return   # a page for a session that is no longer shown
+        self.view_loading = False
+        self.view_offset = offset + len(records)
+        self.view_exhausted = len(records) < PAGE_SIZE
+        if offset == 0:
+            if not records:
+                self.chat_display.setPlaceholderText("This session has no interactions yet.")
+            # the first open of a legacy session imports it, which fills in its metadata
+            self.refresh_sessions()
+        cursor = QTextCursor(self.chat_display.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        focus = None
+        for record in records:
+            marker = " (truncated)" if record["truncated"] else ""
+            start = cursor.position()
+            cursor.insertHtml(f"<b>You</b> <i>(via {html.escape(record['model'] or '')})</i>: "
+                              f"{html.escape(record['question'])}")
+            if record["id"] == self.view_focus:
+                focus = (start, cursor.position())
+            cursor.insertHtml(f"<br><br><b>{html.escape(record['model'] or '')}</b>{marker}: ")
+            cursor.insertText(record["answer"])
+            if record["exec_time_ms"] is not None:
+                cursor.insertHtml(f"<br><i>total {record['exec_time_ms']:.0f} ms</i>")
+            cursor.insertHtml("<br><br>")
+        if focus is not None:
+            # select the matching question and bring it into view
+            selection = QTextCursor(self.chat_display.document())
+            selection.setPosition(focus[0])
+            selection.setPosition(focus[1], QTextCursor.MoveMode.KeepAnchor)
+            self.chat_display.setTextCursor(selection)
+            self.chat_display.ensureCursorVisible()
+            self.view_focus = None
+        # a short first page may not fill the view, so keep going until it scrolls
+        self.on_display_scrolled(self.chat_display.verticalScrollBar().value())
+
+    def on_display_scrolled(self, value):
+        if self.viewed_session is None or self.view_loading or self.view_exhausted:
+            return
+        bar = self.chat_display.verticalScrollBar()
+        if value >= bar.maximum() - bar.pageStep():
+            self.view_loading = True
+            self.session_loader.request_page(self.view_generation, self.viewed_session, self.view_offset)
 
     def on_new_chat(self):
         self.logger.info("[UI Action] New Chat clicked")
-        new_session = self.session._create_session_file()
-        self.recent_sessions = self.session.get_recent_sessions()
-        self.sample_sessions = []
-        
-        for session in self.recent_sessions:
-            self.sample_sessions.append(os.path.basename(session))
-        self.refresh_list_widget(self.recent_list, self.sample_sessions)
-        # Refresh Diplay with new file
-        try:
-            with open(new_session, "r", encoding="utf-8") as f:
-                content = f.read()
-                self.chat_display.setPlainText(content)
-        except Exception as e:
-            self.chat_display.setPlainText(f"Error loading file:\n{e}")
+        self.session._create_session_file()
+        self.chatModule.window.clear()   # a new chat starts a new conversation
+        self.refresh_sessions()
+        # a new session starts empty, no need to read it back
+        self.viewed_session = None
+        self.view_generation += 1
+        self.chat_display.clear()
 
     
 
@@ -187,18 +477,87 @@ class ChatTab(QWidget):
         
         if self.session.session_file is None:
             self.on_new_chat()
+        elif self.viewed_session is not None:
+            # leave the history view; the answer belongs to the current session
+            self.viewed_session = None
+            self.view_generation += 1
+            self.chat_display.clear()
 
-        # Get selected model
-        model_name = self.llm_selector.model_name
+        # a new question makes the previous answers obsolete
+        if self.settings.is_supersede_enabled():
+            self.on_stop_chat()
+
+        loom_models = self.selected_loom_models()
+        if self.loom_checkbox.isChecked() and loom_models:
+            race = self.race_checkbox.isChecked()
+            self.chat_display.append(f"<b>You</b> <i>(loom: {', '.join(loom_models)})</i>: {user_text}<br>")
+            self.loom_view.set_models(loom_models)
+            request_id = new_request_id()
+            self.loom_streams = {stream_id(request_id, name) for name in loom_models}
+            try:
+                self.loomModule.weave(user_text, loom_models, race=race, request_id=request_id)
+            except EngineSaturated as e:
+                self.logger.warning("loom rejected: %s", e)
+                self.chat_display.append(f"<i>Too many questions in flight, try again shortly ({e})</i><br>")
+            self.input_box.clear()
+            return
+
+        # Get selected model, or let the router pick one
+        model_name = self.route()
 
         # Append to chat display
-        self.chat_display.append(f"<b>You</b> <i>(via {model_name})</i>: {user_text}<br><br><b>{self.llm_selector.model_name}</b>:")
-        # Using positional arguments
-        thread1 = threading.Thread(target=chat_async, args=(self.chatModule.chat_with_llm, user_text))
-        thread1.start()
+        request_id = self.open_answer(f"<b>You</b> <i>(via {model_name})</i>: {user_text}<br><br><b>{model_name}</b>:")
+        try:
+            self.chatModule.chat_with_llm(user_text, request_id=request_id)
+        except EngineSaturated as e:
+            self.logger.warning("request rejected: %s", e)
+            del self.answer_cursors[request_id]
+            self.chat_display.append(f"<i>Too many questions in flight, try again shortly ({e})</i><br>")
+            return
 
         # Clear input
         self.input_box.clear()
 
-def chat_async(chat, input_text):
-    chat(input_text)
\ No newline at end of file
+    def on_listen_toggled(self, checked):
+        if checked and not self.transcript_worker.isRunning():
+            self.logger.info("[UI Action] listening")
+            self.transcript_worker.start()
+        elif not checked and self.transcript_worker.isRunning():
+            self.logger.info("[UI Action] stopped listening")
+            self.transcript_worker.stop()
+
+    def on_partial_transcript(self, text):
+        self.input_box.setText(text)
+
+    def on_utterance(self, text, latency_ms):
+        self.logger.info("utterance ready %.0f ms after speech ended", latency_ms)
+        self.chatModule.hear(text)
+        # only technical questions go to the model; small talk stays local
+        decision = self.chatModule.screen(text)
+        if decision is not None and not decision.is_question:
+            self.input_box.clear()
+            self.chat_display.append(f"<span style='color:#999'>(not a question, skipped: "
+                                     f"{html.escape(text)})</span>")
+            return
+        self.input_box.setText(decision.span if decision is not None else text)
+        if self.settings.is_auto_ask_enabled():
+            self.on_send_chat()
+
+    def on_listen_error(self, error):
+        self.chat_display.append(f"<i>Listening stopped: {html.escape(error)}</i><br>")
+
+    def on_stop_chat(self):
+        if self.chatModule.inflight or self.loomModule.inflight:
+            self.logger.info("[UI Action] stopping in-flight answers")
+        self.chatModule.cancel_all()
+        self.loomModule.cancel_all()
+
+    def shutdown(self):
+        # cancelling runs each request's done callback right away, so the truncated
+        # answers are queued for the session writer before close() drains it
+        self.on_stop_chat()
+        self.transcript_worker.shutdown()
+        self.engine.shutdown()
+        self.worker.stop()
+        self.session_loader.stop()
+        self.session.close()
\ No newline at end of file
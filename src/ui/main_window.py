@@ -51,6 +51,10 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(settings, "Settings")
 
 
+    def closeEvent(self, event):
+        self.chat_tab.shutdown()
+        super().closeEvent(event)
+
     def keyPressEvent(self, event):
         """Handle global key presses for window movement and AltGr"""
         key = event.key()
@@ -9,6 +9,36 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt
 from src.utils.constants import LOGGER_DIR, LOGGER_NAME, SETTINGS_FILE
 from src.utils.logger import setup_daily_logger
+from src.llm.engine import MAX_CONCURRENCY, MAX_PENDING
+from src.llm.resilience import RETRY_ATTEMPTS, DEADLINE_S, FIRST_TOKEN_TIMEOUT_S
+from src.llm.router import AUTO_MODEL, ROUTE_MARGIN, ROUTE_HOLD_S, PROBE_INTERVAL_S
+from src.workers.coalescer import FLUSH_INTERVAL_MS, FLUSH_MAX_CHARS
+from src.utils.perf import latency_registry
+from src.llm.ratelimit import rate_limits
+from src.llm.resilience import breakers
+from src.chat.cache import MEMORY_ITEMS, DISK_MAX_MB, TTL_HOURS
+from src.chat.similarity import SIMILARITY_THRESHOLD
+from src.audio.transcriber import WHISPER_MODEL, TRANSCRIBE_WORKERS, PARTIAL_MS
+from src.audio.vad import SILENCE_MS
+from src.chat.gate import GATE_THRESHOLD
+from src.chat.prompts import PROMPT_NAME, LANGUAGE
+from src.chat.window import CONTEXT_BUDGET_TOKENS
+from src.chat.writer import DURABILITY, DURABILITY_POLICIES, BATCH_SIZE as WRITER_BATCH_SIZE, FLUSH_MS as WRITER_FLUSH_MS
+
+QUOTA_COLUMNS = ["Endpoint", "Requests left / min", "Tokens left / min", "Queued", "Rate limited", "Circuit"]
+
+# (column title, latency_registry.summary key)
+STATS_COLUMNS = [
+    ("Model", None),
+    ("Samples", "samples"),
+    ("Connect p50 (ms)", "connect_ms_p50"),
+    ("TTFT p50 (ms)", "ttft_ms_p50"),
+    ("TTFT p95 (ms)", "ttft_ms_p95"),
+    ("ITL p50 (ms)", "itl_ms_p50"),
+    ("ITL p95 (ms)", "itl_ms_p95"),
+    ("Tok/s p50", "tokens_per_sec_p50"),
+    ("Tokens p50", "tokens_p50"),
+]
 
 class SettingsTab(QWidget):
     def __init__(self):
@@ -17,6 +47,8 @@ class SettingsTab(QWidget):
         self.init_ui()
         self.load_models()
         self.init_steaming()
+        self.init_stats()
+        self.init_quota()
         
 
     def init_steaming(self):
@@ -35,6 +67,87 @@ class SettingsTab(QWidget):
         self.layout.addWidget(stream_section, 1)
         
 
+    def init_stats(self):
+        stats_section = QWidget()
+        stats_layout = QVBoxLayout(stats_section)
+        stats_layout.setContentsMargins(0, 0, 0, 0)
+
+        header_row = QHBoxLayout()
+        stats_label = QLabel("Model Latency (rolling)")
+        stats_label.setStyleSheet("font-size: 16px; font-weight: bold;")
+        header_row.addWidget(stats_label)
+        header_row.addStretch()
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.refresh_stats)
+        refresh_btn.clicked.connect(self.refresh_quota)
+        header_row.addWidget(refresh_btn)
+        stats_layout.addLayout(header_row)
+
+        self.stats_table = QTableWidget()
+        self.stats_table.setColumnCount(len(STATS_COLUMNS))
+        self.stats_table.setHorizontalHeaderLabels([title for title, _ in STATS_COLUMNS])
+        self.stats_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        header = self.stats_table.horizontalHeader()
+        for i in range(len(STATS_COLUMNS)):
+            header.setSectionResizeMode(i, QHeaderView.ResizeMode.Stretch)
+        stats_layout.addWidget(self.stats_table, 1)
+
+        self.layout.addWidget(stats_section, 2)
+
+    def refresh_stats(self):
+        """Fill the stats table from the in-process latency registry."""
+        models = latency_registry.models()
+        self.stats_table.setRowCount(len(models))
+        for row, model in enumerate(models):
+            summary = latency_registry.summary(model)
+            self.stats_table.setItem(row, 0, QTableWidgetItem(model))
+            for col, (_, key) in enumerate(STATS_COLUMNS[1:], start=1):
+                value = summary.get(key, 0)
+                text = str(value) if key == "samples" else f"{value:.1f}"
+                self.stats_table.setItem(row, col, QTableWidgetItem(text))
+
+    def init_quota(self):
+        quota_section = QWidget()
+        quota_layout = QVBoxLayout(quota_section)
+        quota_layout.setContentsMargins(0, 0, 0, 0)
+
+        quota_label = QLabel("Provider Quota (client-side estimate)")
+        quota_label.setStyleSheet("font-size: 16px; font-weight: bold;")
+        quota_layout.addWidget(quota_label)
+
+        self.quota_table = QTableWidget()
+        self.quota_table.setColumnCount(len(QUOTA_COLUMNS))
+        self.quota_table.setHorizontalHeaderLabels(QUOTA_COLUMNS)
+        self.quota_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        header = self.quota_table.horizontalHeader()
+        for i in range(len(QUOTA_COLUMNS)):
+            header.setSectionResizeMode(i, QHeaderView.ResizeMode.Stretch)
+        quota_layout.addWidget(self.quota_table, 1)
+
+        self.layout.addWidget(quota_section, 1)
+
+    def refresh_quota(self):
+        """Fill the quota table from the shared rate limiters, one row per endpoint."""
+        for model in self.settings.get("models") or []:
+            rate_limits.limiter_for(model.get("url"))
+        circuits = breakers.states()
+        rows = rate_limits.snapshot()
+        self.quota_table.setRowCount(len(rows))
+        for row, quota in enumerate(rows):
+            requests_left = f"{quota['rpm_left']} / {quota['rpm']}" if quota["rpm"] else "unlimited"
+            tokens_left = f"{quota['tpm_left']} / {quota['tpm']}" if quota["tpm"] else "unlimited"
+            if quota["blocked_s"]:
+                requests_left += f" (blocked {quota['blocked_s']:.0f} s)"
+            values = [quota["endpoint"], requests_left, tokens_left, str(quota["queued"]),
+                      str(quota["limited"]), circuits.get(quota["endpoint"], "closed")]
+            for col, text in enumerate(values):
+                self.quota_table.setItem(row, col, QTableWidgetItem(text))
+
+    def showEvent(self, event):
+        self.refresh_stats()
+        self.refresh_quota()
+        super().showEvent(event)
+
     def init_ui(self):
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(20, 20, 20, 20)
@@ -147,6 +260,12 @@ class SettingsTab(QWidget):
                 self.settings["model_key"] = model.get("key")
         self.save_models_to_file()
     
+    def get_model_config(self, name):
+        for model in self.settings.get("models"):
+            if model.get("name") == name:
+                return model
+        return None
+
     def get_current_model(self):
         return self.settings.get("model_name")
     
@@ -155,8 +274,129 @@ class SettingsTab(QWidget):
     
     def get_current_url(self):
         return self.settings.get("model_url")
+
+    def get_max_concurrency(self):
+        return self.settings.get("max_concurrent_streams", MAX_CONCURRENCY)
+
+    def get_max_pending(self):
+        return self.settings.get("max_pending_requests", MAX_PENDING)
+
+    def is_supersede_enabled(self):
+        return self.settings.get("supersede_inflight", 1) == 1
+
+    def is_cache_enabled(self):
+        return self.settings.get("cache_enabled", 1) == 1
+
+    def get_cache_memory_items(self):
+        return self.settings.get("cache_memory_items", MEMORY_ITEMS)
+
+    def get_cache_disk_mb(self):
+        return self.settings.get("cache_disk_mb", DISK_MAX_MB)
+
+    def get_cache_ttl_hours(self):
+        return self.settings.get("cache_ttl_hours", TTL_HOURS)
+
+    def is_similarity_enabled(self):
+        return self.settings.get("similarity_enabled", 1) == 1
+
+    def get_similarity_threshold(self):
+        return self.settings.get("similarity_threshold", SIMILARITY_THRESHOLD)
+
+    def get_flush_interval_ms(self):
+        return self.settings.get("ui_flush_interval_ms", FLUSH_INTERVAL_MS)
+
+    def get_flush_max_chars(self):
+        return self.settings.get("ui_flush_max_chars", FLUSH_MAX_CHARS)
+
+    def get_session_durability(self):
+        durability = self.settings.get("session_durability", DURABILITY)
+        return durability if durability in DURABILITY_POLICIES else DURABILITY
+
+    def get_session_batch_size(self):
+        return self.settings.get("session_batch_size", WRITER_BATCH_SIZE)
+
+    def get_session_flush_ms(self):
+        return self.settings.get("session_flush_ms", WRITER_FLUSH_MS)
+
+    def get_whisper_model(self):
+        return self.settings.get("whisper_model_name", WHISPER_MODEL)
+
+    def get_transcribe_workers(self):
+        return self.settings.get("transcribe_workers", TRANSCRIBE_WORKERS)
+
+    def get_audio_input_file(self):
+        """A WAV file to transcribe instead of the microphone (for testing), or None."""
+        return self.settings.get("audio_input_file") or None
+
+    def get_vad_silence_ms(self):
+        return self.settings.get("vad_silence_ms", SILENCE_MS)
+
+    def get_partial_transcript_ms(self):
+        return self.settings.get("partial_transcript_ms", PARTIAL_MS)
+
+    def get_context_budget(self, model_name):
+        """Transcript tokens per prompt: the model's own "context_tokens", else the global default."""
+        config = self.get_model_config(model_name) or {}
+        return config.get("context_tokens") or self.settings.get("context_budget_tokens", CONTEXT_BUDGET_TOKENS)
+
+    def get_max_context_budget(self):
+        """The largest transcript budget of any configured model; the window keeps that much verbatim."""
+        names = [model.get("name") for model in self.get_model_configs()]
+        return max([self.get_context_budget(name) for name in names] +
+                   [self.settings.get("context_budget_tokens", CONTEXT_BUDGET_TOKENS)])
+
+    def get_prompt_name(self):
+        return self.settings.get("prompt_name", PROMPT_NAME)
+
+    def get_prompt_templates(self):
+        """Custom {name: template} prompts; they override built-in prompts of the same name."""
+        return self.settings.get("prompts", {})
+
+    def get_answer_language(self):
+        return self.settings.get("answer_language", LANGUAGE)
+
+    def is_question_gate_enabled(self):
+        return self.settings.get("question_gate_enabled", 1) == 1
+
+    def get_question_gate_threshold(self):
+        return self.settings.get("question_gate_threshold", GATE_THRESHOLD)
+
+    def is_auto_ask_enabled(self):
+        """Send every finished utterance to the model as soon as it is transcribed."""
+        return self.settings.get("auto_ask", 1) == 1
     
 
+    def is_failover_enabled(self):
+        return self.settings.get("failover_enabled", 1) == 1
+
+    def get_retry_attempts(self):
+        return self.settings.get("retry_attempts", RETRY_ATTEMPTS)
+
+    def get_request_deadline_s(self):
+        return self.settings.get("request_deadline_s", DEADLINE_S)
+
+    def get_first_token_timeout_s(self):
+        return self.settings.get("first_token_timeout_s", FIRST_TOKEN_TIMEOUT_S)
+
+    def is_auto_routing(self):
+        return self.settings.get("routing") == AUTO_MODEL
+
+    def set_auto_routing(self, enabled):
+        self.settings["routing"] = AUTO_MODEL if enabled else "manual"
+        self.save_models_to_file()
+
+    def get_route_margin(self):
+        return self.settings.get("route_margin", ROUTE_MARGIN)
+
+    def get_route_hold_s(self):
+        return self.settings.get("route_hold_s", ROUTE_HOLD_S)
+
+    def get_probe_interval_s(self):
+        return self.settings.get("route_probe_interval_s", PROBE_INTERVAL_S)
+
+    def get_model_configs(self):
+        return list(self.settings.get("models") or [])
+
     def load_models(self):
         """Load models from settings.json and populate table"""
         self.models = []
@@ -192,6 +432,8 @@ class SettingsTab(QWidget):
             self.model_table.setItem(row, 0, name_item)
             self.model_table.setItem(row, 1, url_item)
             self.model_table.setItem(row, 2, key_item)
+        # endpoints shared by several models get the strictest of their limits
+        rate_limits.configure(self.settings.get("models") or [])
 
     def create_default_settings(self):
         """Create default settings.json if not exists"""
@@ -1,7 +1,11 @@
 from PyQt6.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QLabel, QComboBox
+from PyQt6.QtCore import Qt
 import sys
 from src.utils.constants import LOGGER_DIR, LOGGER_NAME
 from src.utils.logger import setup_daily_logger
+from src.llm.http import connection_pool
+from src.llm.engine import get_engine
+from src.llm.router import AUTO_MODEL, ROUTE_ANSWER_TOKENS
 
 class LLMSelector(QWidget):
     def __init__(self, settings):
@@ -14,27 +18,57 @@ class LLMSelector(QWidget):
         self.models = self.settings.get_model_names()
         
 
-        # Add model options
+        # Add model options; "auto" lets the router pick per question
+        self.combo.addItem(AUTO_MODEL)
+        self.combo.setItemData(0, "Send each question to the model answering fastest right now",
+                               Qt.ItemDataRole.ToolTipRole)
         self.combo.addItems(self.models)
 
         # Load saved model and set as default
         saved_model = self.settings.get_current_model()
-        if saved_model in self.models:
+        if self.settings.is_auto_routing():
+            self.combo.setCurrentIndex(0)
+        elif saved_model in self.models:
             index = self.models.index(saved_model)
-            self.combo.setCurrentIndex(index)
-
-        self.combo.currentTextChanged.connect(self.model_selected)
+            self.combo.setCurrentIndex(index + 1)
 
+        # where auto mode shows its last decision
+        self.route_label = QLabel()
+        self.route_label.setStyleSheet("color: #888; font-size: 11px;")
+        self.route_label.setVisible(self.is_auto())
 
         # Connect selection change to handler
         self.combo.currentTextChanged.connect(self.model_selected)
 
         layout = QVBoxLayout()
         layout.addWidget(self.combo)
+        layout.addWidget(self.route_label)
         self.setLayout(layout)
 
+    def is_auto(self):
+        return self.combo.currentText() == AUTO_MODEL
+
+    def show_decision(self, decision):
+        """Show which model auto mode picked and why; the tooltip lists every model's estimate."""
+        self.model_name = decision.model
+        self.route_label.setText(decision.describe())
+        lines = [f"{name}: {score / 1000:.2f} s" if score is not None else f"{name}: no samples"
+                 for name, score in decision.scores.items()]
+        self.route_label.setToolTip(f"Estimated answer time (TTFT + {ROUTE_ANSWER_TOKENS} tokens)\n" + "\n".join(lines))
+
     def model_selected(self, model_name):
         self.logger.info(f"Selected model: {model_name}")
+        self.route_label.setVisible(model_name == AUTO_MODEL)
+        if model_name == AUTO_MODEL:
+            # the model is chosen per question; keep the last one until then
+            self.settings.set_auto_routing(True)
+            return
         self.model_name = model_name
+        self.settings.set_auto_routing(False)
         self.settings.change_current_model(model_name)
-        # You can trigger model hydration, failover logic, etc. here
+        # open the socket now so the first question skips DNS/TCP/TLS
+        url = self.settings.get_current_url()
+        if self.settings.is_steaming() == 1:
+            get_engine().warm(url)
+        else:
+            connection_pool.warm(url)
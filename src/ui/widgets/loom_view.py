@@ -0,0 +1,58 @@
+import html
+
+from PyQt6.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout, QLabel, QTextEdit
+from PyQt6.QtGui import QTextCursor
+from src.workers.messages import Kind
+from src.utils.perf import format_metrics
+
+
+class LoomView(QWidget):
+    """Side-by-side panes, one per model taking part in a loom."""
+
+    def __init__(self):
+        super().__init__()
+        self.panes = {}
+        self.layout = QHBoxLayout(self)
+        self.layout.setContentsMargins(0, 10, 0, 0)
+        self.layout.setSpacing(10)
+
+    def set_models(self, model_names):
+        # Drop old panes and build one per selected model
+        while self.layout.count():
+            item = self.layout.takeAt(0)
+            if item.widget():
+                item.widget().deleteLater()
+        self.panes = {}
+        for name in model_names:
+            column = QWidget()
+            column_layout = QVBoxLayout(column)
+            column_layout.setContentsMargins(0, 0, 0, 0)
+
+            header = QLabel(name)
+            header.setStyleSheet("font-weight: bold;")
+            column_layout.addWidget(header)
+
+            pane = QTextEdit()
+            pane.setReadOnly(True)
+            pane.setStyleSheet("font-size: 13px; border: 1px solid #ddd; border-radius: 8px; padding: 6px;")
+            column_layout.addWidget(pane, 1)
+
+            self.panes[name] = (header, pane)
+            self.layout.addWidget(column, 1)
+
+    def show_message(self, message):
+        if message.model not in self.panes:
+            return
+        header, pane = self.panes[message.model]
+        if message.kind is Kind.DONE:
+            header.setText(f"{message.model} ✓")
+        elif message.kind is Kind.CANCELLED:
+            header.setText(f"{message.model} (cancelled)")
+            header.setStyleSheet("font-weight: bold; color: #999;")
+        elif message.kind is Kind.ERROR:
+            pane.append(f"<i>llm error : {html.escape(message.payload)}</i>")
+        elif message.kind is Kind.METRIC:
+            pane.append(f"<i>{format_metrics(message.payload)}</i>")
+        else:
+            pane.moveCursor(QTextCursor.MoveOperation.End)
+            pane.insertPlainText(message.payload)
@@ -14,16 +14,21 @@ if system == "Windows":
     base_app = pathlib.Path(os.environ["APPDATA"])
 elif system == "Darwin":
     base = pathlib.Path("/Library/Application Support")
+    base_app = pathlib.Path.home().joinpath("Library", "Application Support")
 else:  # Linux
     base = pathlib.Path("/opt")
+    base_app = pathlib.Path(os.environ.get("XDG_DATA_HOME") or pathlib.Path.home().joinpath(".local", "share"))
 
 ROOT_APP_DIR = base_app.joinpath(PUBLISHER, PRODUCT_NAME,VERSION)
 
 LOGGER_NAME = PRODUCT_NAME.lower().replace(" ", "_").lower()
 LOGGER_DIR = ROOT_APP_DIR.joinpath("logs")
 SESSION_DIR = ROOT_APP_DIR.joinpath("sessions")
+CACHE_DIR = ROOT_APP_DIR.joinpath("cache")
+STORE_FILE = ROOT_APP_DIR.joinpath("sessions.db")
 
 SETTINGS_FILE = ROOT_APP_DIR.joinpath("settings.json")
 # make directories
 os.makedirs(LOGGER_DIR, exist_ok=True)
 os.makedirs(SESSION_DIR, exist_ok=True)
+os.makedirs(CACHE_DIR, exist_ok=True)
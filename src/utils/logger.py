@@ -1,15 +1,106 @@
 
 import logging
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import TimedRotatingFileHandler, QueueHandler, QueueListener
+import atexit
+import contextlib
+import contextvars
+import json
 import os
 import datetime
+import queue
 import sys 
 
+# correlation id of the request being handled, stamped on every record as request_id
+request_id_var = contextvars.ContextVar("request_id", default=None)
+
+_listeners = []
+
+
+@contextlib.contextmanager
+def correlation_id(request_id):
+    """Tag every record logged inside the block (in this thread or task) with request_id."""
+    token = request_id_var.set(request_id)
+    try:
+        yield
+    finally:
+        request_id_var.reset(token)
+
+
+class CorrelationFilter(logging.Filter):
+    def filter(self, record):
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        return True
+
+
+class DebugSampler(logging.Filter):
+    """Keep one in every `every` DEBUG records per call site; other levels always pass."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._seen = {}
+
+    def filter(self, record):
+        if record.levelno != logging.DEBUG:
+            return True
+        if not self.every:
+            return False
+        site = (record.pathname, record.lineno)
+        count = self._seen.get(site, 0)
+        self._seen[site] = count + 1
+        return count % self.every == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers and jq."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "file": f"{record.filename}:{record.lineno}",
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class LocalQueueHandler(QueueHandler):
+    """QueueHandler for a listener in the same process: skip formatting on the caller.
+
+    Only the message is merged now (its arguments may change later); the
+    record keeps exc_info and everything else is formatted by the listener.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def stop_logging():
+    """Flush and stop the listener threads of asynchronous loggers."""
+    while _listeners:
+        _listeners.pop().stop()
+
+
+atexit.register(stop_logging)
+
+
 def setup_daily_logger(
     name: str = "app",
     log_dir: str = "logs",
     log_level: int = logging.INFO,
-    log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s"
+    log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s",
+    use_queue: bool = False,
+    json_output: bool = False,
+    debug_sample_rate: float = 1.0
 ) -> logging.Logger:
     """
     Set up a daily rotating logger with a single console and file handler.
@@ -20,6 +111,10 @@ def setup_daily_logger(
         log_dir: Directory to store log files (default: 'logs')
         log_level: Logging level (default: logging.INFO)
         log_format: Log message format (includes filename and line number)
+        use_queue: Hand records to a queue and write them from a listener thread,
+            so callers never wait on disk or console I/O (default: False)
+        json_output: Write one JSON object per record instead of log_format (default: False)
+        debug_sample_rate: Fraction of DEBUG records kept per call site (default: 1.0)
     
     Returns:
         Configured logger instance
@@ -53,7 +148,9 @@ def setup_daily_logger(
         encoding="utf-8"
     )
     file_handler.setLevel(log_level)
-    file_handler.setFormatter(logging.Formatter(log_format))
+    formatter = JsonFormatter() if json_output else logging.Formatter(log_format)
+    file_handler.setFormatter(formatter)
+    handlers = [file_handler]
 
     # Determine if console logging should be enabled
     is_dev = not getattr(sys, "frozen", False)
@@ -62,12 +159,24 @@ def setup_daily_logger(
     if is_dev:
         console_handler = logging.StreamHandler()
         console_handler.setLevel(log_level)
-        console_handler.setFormatter(logging.Formatter(log_format))
-        logger.addHandler(console_handler)
-    
+        console_handler.setFormatter(formatter)
+        handlers.insert(0, console_handler)
+
+    # Filters run on the calling thread, so correlation ids are read where the record is made
+    logger.addFilter(CorrelationFilter())
+    if debug_sample_rate < 1.0:
+        logger.addFilter(DebugSampler(debug_sample_rate))
 
     # Add handlers to logger
-    logger.addHandler(file_handler)
+    if use_queue:
+        records = queue.SimpleQueue()
+        listener = QueueListener(records, *handlers, respect_handler_level=True)
+        listener.start()
+        _listeners.append(listener)
+        logger.addHandler(LocalQueueHandler(records))
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
 
     logging.debug(f"Logger {name} configured with file handler ({log_file}) and console handler")
     return logger
\ No newline at end of file
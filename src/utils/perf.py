@@ -1,11 +1,177 @@
 
 from contextlib import contextmanager
+from collections import deque
+import threading
 import time
 from typing import Iterator, List
 
+from src.utils.tokens import count_tokens
+
 @contextmanager
 def timer() -> Iterator[List[float]]:
     """Context manager that yields (start, end) timestamps."""
     t = [time.perf_counter()]   # mutable list
     yield t
-    t.append(time.perf_counter())
\ No newline at end of file
+    t.append(time.perf_counter())
+
+def percentile(values, q: float) -> float:
+    """Nearest-rank percentile (q in 0..100) of an unsorted sequence."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class StreamStats:
+    """Hot-path timings for one streamed completion, all in milliseconds."""
+
+    __slots__ = ("model", "start", "dns_ms", "connect_ms", "ttft_ms", "gaps_ms",
+                 "tokens", "total_ms", "_dns_start", "_connect_start", "_last", "_first_tokens")
+
+    def __init__(self, model: str):
+        self.model = model
+        self.start = time.perf_counter()
+        self.dns_ms = 0.0
+        self.connect_ms = 0.0
+        self.ttft_ms = None
+        self.gaps_ms = []
+        self.tokens = 0             # estimated from the delta text; one event may carry several
+        self.total_ms = 0.0
+        self._dns_start = None
+        self._connect_start = None
+        self._last = None
+        self._first_tokens = 0
+
+    def restart(self, model: str):
+        """Time a new attempt from now; waits and failed tries before it are not this model's latency."""
+        self.model = model
+        self.start = time.perf_counter()
+        self.dns_ms = 0.0
+        self.connect_ms = 0.0
+        self._dns_start = None
+        self._connect_start = None
+
+    # aiohttp trace hooks call these; a reused pooled socket never triggers them
+    def dns_started(self):
+        self._dns_start = time.perf_counter()
+
+    def dns_finished(self):
+        if self._dns_start is not None:
+            self.dns_ms = (time.perf_counter() - self._dns_start) * 1000
+
+    def connect_started(self):
+        self._connect_start = time.perf_counter()
+
+    def connect_finished(self):
+        if self._connect_start is not None:
+            self.connect_ms = (time.perf_counter() - self._connect_start) * 1000
+
+    def on_delta(self, text: str):
+        now = time.perf_counter()
+        tokens = count_tokens(text)
+        if self._last is None:
+            self.ttft_ms = (now - self.start) * 1000
+            self._first_tokens = tokens
+        else:
+            self.gaps_ms.append((now - self._last) * 1000)
+        self._last = now
+        self.tokens += tokens
+
+    def finish(self):
+        self.total_ms = (time.perf_counter() - self.start) * 1000
+
+    def tokens_per_sec(self) -> float:
+        # generation rate after the first delta, so TTFT does not skew it
+        if self.ttft_ms is None or self.tokens <= self._first_tokens:
+            return 0.0
+        generating = (self.total_ms - self.ttft_ms) / 1000
+        return (self.tokens - self._first_tokens) / generating if generating > 0 else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "dns_ms": self.dns_ms,
+            "connect_ms": self.connect_ms,
+            "ttft_ms": self.ttft_ms or 0.0,
+            "itl_p50_ms": percentile(self.gaps_ms, 50),
+            "itl_p95_ms": percentile(self.gaps_ms, 95),
+            "tokens": self.tokens,
+            "tokens_per_sec": self.tokens_per_sec(),
+            "total_ms": self.total_ms,
+        }
+
+
+def format_metrics(metrics: dict) -> str:
+    """One-line rendering of a METRIC payload for the chat display."""
+    parts = []
+    if metrics.get("cached"):
+        parts.append("cached")
+    if metrics.get("failed_over_from"):
+        parts.append(f"fallback after {metrics['failed_over_from']} failed")
+    if metrics.get("connect_ms"):
+        parts.append(f"connect {metrics['dns_ms'] + metrics['connect_ms']:.0f} ms")
+    if metrics.get("ttft_ms"):
+        parts.append(f"ttft {metrics['ttft_ms']:.0f} ms")
+    if metrics.get("tokens"):
+        parts.append(f"{metrics['tokens']} tokens @ {metrics['tokens_per_sec']:.1f} tok/s")
+        parts.append(f"itl p50/p95 {metrics['itl_p50_ms']:.0f}/{metrics['itl_p95_ms']:.0f} ms")
+    parts.append(f"total {metrics['exec_time_ms']:.0f} ms")
+    return " · ".join(parts)
+
+
+class LatencyRegistry:
+    """Rolling per-model latency samples that can be queried in-process."""
+
+    def __init__(self, window: int = 200, gap_window: int = 5000):
+        self.window = window
+        self.gap_window = gap_window
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def _series(self, model):
+        series = self._models.get(model)
+        if series is None:
+            series = self._models[model] = {
+                "connect_ms": deque(maxlen=self.window),
+                "ttft_ms": deque(maxlen=self.window),
+                "tokens_per_sec": deque(maxlen=self.window),
+                "tokens": deque(maxlen=self.window),
+                "itl_ms": deque(maxlen=self.gap_window),
+            }
+        return series
+
+    def record(self, stats: StreamStats):
+        if stats.ttft_ms is None:
+            return
+        with self._lock:
+            series = self._series(stats.model)
+            series["connect_ms"].append(stats.dns_ms + stats.connect_ms)
+            series["ttft_ms"].append(stats.ttft_ms)
+            if stats.tokens >= 2:
+                # a one-token answer has no generation rate; a zero would drag the p50 down
+                series["tokens_per_sec"].append(stats.tokens_per_sec())
+            series["tokens"].append(stats.tokens)
+            series["itl_ms"].extend(stats.gaps_ms)
+
+    def models(self) -> list:
+        with self._lock:
+            return list(self._models)
+
+    def summary(self, model: str, last: int = None) -> dict:
+        """p50/p95 of each rolling series for one model, or of its `last` samples only."""
+        with self._lock:
+            series = self._models.get(model)
+            if series is None:
+                return {"samples": 0}
+            snapshot = {name: list(values) for name, values in series.items()}
+        if last:
+            snapshot = {name: values[-last:] for name, values in snapshot.items()}
+        result = {"samples": len(snapshot["ttft_ms"])}
+        for name, values in snapshot.items():
+            result[f"{name}_p50"] = percentile(values, 50)
+            result[f"{name}_p95"] = percentile(values, 95)
+        return result
+
+
+# shared by the engine (writer) and the settings stats view (reader)
+latency_registry = LatencyRegistry()
@@ -0,0 +1,17 @@
+import re
+
+# roughly how BPE tokenizers split English: short word pieces and single punctuation marks
+TOKEN_PIECE = re.compile(r"\w{1,4}|[^\w\s]")
+
+
+def count_tokens(text: str) -> int:
+    """Local token estimate: no vocabulary to load and no network, just word pieces."""
+    return len(TOKEN_PIECE.findall(text))
+
+
+def tail_tokens(text: str, limit: int) -> str:
+    """The last `limit` tokens of text, cut at a piece boundary."""
+    pieces = list(TOKEN_PIECE.finditer(text))
+    if len(pieces) <= limit:
+        return text
+    return text[pieces[-limit].start():] if limit > 0 else ""
@@ -0,0 +1,104 @@
+import queue
+import time
+from collections import deque
+
+from src.workers.messages import Kind, StreamMessage
+
+FLUSH_INTERVAL_MS = 16     # ~one frame at 60 Hz
+FLUSH_MAX_CHARS = 4096     # flush early once this much text is buffered
+
+
+class DeltaCoalescer:
+    """Merges stream deltas from a queue so consumers see at most one batch per frame.
+
+    Only consecutive DELTA messages of the same request are merged; every
+    other kind is delivered unmerged and in order.
+    """
+
+    def __init__(self, source: queue.Queue, interval_ms: float = FLUSH_INTERVAL_MS,
+                 max_chars: int = FLUSH_MAX_CHARS, window: int = 1024):
+        self.source = source
+        self.interval = interval_ms / 1000
+        self.max_chars = max_chars
+        self._last_flush = 0.0
+        self.window = window
+        # request id -> deltas of that request merged per flush, for its last `window` flushes
+        self.merged = {}
+
+    def next_batch(self) -> list[StreamMessage]:
+        """Block for the next message and return everything due in this frame.
+
+        Deltas of the same request are merged into one message; other kinds
+        keep their order relative to that request's text.
+        """
+        message = self.source.get()
+        if message.kind is not Kind.DELTA:
+            return [message]
+
+        batch = [message]
+        size = len(message.payload)
+        # first delta after an idle gap goes out immediately, later ones wait for the frame
+        deadline = max(time.perf_counter(), self._last_flush + self.interval)
+        while size < self.max_chars:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                nxt = self.source.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(nxt)
+            if nxt.kind is Kind.SHUTDOWN:
+                break
+            if nxt.kind is Kind.DELTA:
+                size += len(nxt.payload)
+
+        self._last_flush = time.perf_counter()
+        return self._merge(batch)
+
+    def _merge(self, batch):
+        out = []           # messages, or lists of delta text still being merged
+        open_runs = {}     # request id -> text parts of its current run
+        deltas = {}        # request id -> deltas of it in this flush
+        for message in batch:
+            if message.kind is not Kind.DELTA:
+                # a control message closes the request's run so order is preserved
+                open_runs.pop(message.request_id, None)
+                out.append(message)
+                continue
+            deltas[message.request_id] = deltas.get(message.request_id, 0) + 1
+            parts = open_runs.get(message.request_id)
+            if parts is None:
+                parts = open_runs[message.request_id] = [message]
+                out.append(parts)
+            else:
+                parts.append(message)
+        for request_id, count in deltas.items():
+            counts = self.merged.get(request_id)
+            if counts is None:
+                counts = self.merged[request_id] = deque(maxlen=self.window)
+            counts.append(count)
+        return [item if isinstance(item, StreamMessage) else self._join(item) for item in out]
+
+    @staticmethod
+    def _join(run):
+        first = run[0]
+        if len(run) == 1:
+            return first
+        return StreamMessage(first.request_id, Kind.DELTA, "".join(m.payload for m in run), first.model)
+
+    def stats(self, request_id: str) -> dict:
+        """Flush count and deltas-per-flush of one request over its recent window."""
+        counts = self.merged.get(request_id)
+        if not counts:
+            return {"flushes": 0, "deltas": 0, "avg_merged": 0.0, "max_merged": 0}
+        return {
+            "flushes": len(counts),
+            "deltas": sum(counts),
+            "avg_merged": sum(counts) / len(counts),
+            "max_merged": max(counts),
+        }
+
+    def forget(self, request_id: str):
+        """Drop a finished request's counts; other requests' are untouched."""
+        self.merged.pop(request_id, None)
@@ -2,21 +2,52 @@ import sys
 import time
 from PyQt6.QtWidgets import QApplication, QMainWindow, QLabel, QVBoxLayout, QWidget
 from PyQt6.QtCore import QThread, pyqtSignal
-import queue 
+from src.workers.coalescer import DeltaCoalescer
+from src.workers.messages import Kind, SHUTDOWN
+from src.utils.constants import LOGGER_DIR, LOGGER_NAME
+from src.utils.logger import setup_daily_logger
+
+
+def make_coalescer(app, source):
+    return DeltaCoalescer(source,
+                          interval_ms=app.settings.get_flush_interval_ms(),
+                          max_chars=app.settings.get_flush_max_chars())
+
+
+def log_flush_stats(logger, coalescer, message):
+    """Log how many deltas each flush merged for the answer that just finished."""
+    stats = coalescer.stats(message.request_id)
+    logger.info("stream %s (%s): %d deltas in %d flushes (avg %.1f, max %d per flush)",
+                message.request_id, message.model,
+                stats["deltas"], stats["flushes"], stats["avg_merged"], stats["max_merged"])
+
 
 class LLMWorkerThread(QThread):
+    """Dispatches typed stream messages to the GUI thread, one signal per coalesced batch."""
 
-    update_signal = pyqtSignal(str)
+    update_signal = pyqtSignal(list)
 
     def set_app(self, app):
         self.app = app 
+        self.logger = setup_daily_logger(name=LOGGER_NAME, log_dir=LOGGER_DIR)
 
     def run(self):
-        while True:
-            try:
-                response = self.app.answer_queue.get(timeout=0.5) 
-                self.update_signal.emit(response)
-            except queue.Empty:
-                response = None  # Or handle retry logic
-       
-        
+        coalescer = make_coalescer(self.app, self.app.answer_queue)
+        running = True
+        while running:
+            batch = coalescer.next_batch()   # blocks until there is work
+            if batch[-1].kind is Kind.SHUTDOWN:
+                batch.pop()
+                running = False
+            if batch:
+                self.update_signal.emit(batch)
+            for message in batch:
+                if message.kind is Kind.DONE:
+                    log_flush_stats(self.logger, coalescer, message)
+                if message.kind in (Kind.DONE, Kind.ERROR, Kind.CANCELLED):
+                    coalescer.forget(message.request_id)
+        self.logger.info("llm worker stopped")
+
+    def stop(self, timeout_ms: int = 2000):
+        self.app.answer_queue.put(SHUTDOWN)
+        self.wait(timeout_ms)
@@ -0,0 +1,62 @@
+import queue
+import uuid
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Optional
+
+
+class Kind(Enum):
+    DELTA = "delta"          # a piece of answer text
+    DONE = "done"            # the stream finished normally
+    ERROR = "error"          # the stream failed; payload is the message
+    CANCELLED = "cancelled"  # the stream was stopped before it finished
+    METRIC = "metric"        # payload is a dict of measurements
+    HINT = "hint"            # payload is a prior answer to a similar question
+    SHUTDOWN = "shutdown"    # stops the dispatcher
+
+
+@dataclass(frozen=True)
+class StreamMessage:
+    """One typed item on the result queue, scoped to the request that produced it."""
+    request_id: str
+    kind: Kind
+    payload: Any = ""
+    model: Optional[str] = None
+
+
+SHUTDOWN = StreamMessage("", Kind.SHUTDOWN)
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+class ResultChannel:
+    """Request-scoped writer onto the shared result queue."""
+
+    def __init__(self, sink: queue.Queue, request_id: Optional[str] = None, model: Optional[str] = None):
+        self.sink = sink
+        self.request_id = request_id or new_request_id()
+        self.model = model
+
+    def _put(self, kind: Kind, payload: Any = ""):
+        self.sink.put(StreamMessage(self.request_id, kind, payload, self.model))
+
+    def delta(self, text: str):
+        if text:
+            self._put(Kind.DELTA, text)
+
+    def done(self):
+        self._put(Kind.DONE)
+
+    def error(self, message: str):
+        self._put(Kind.ERROR, message)
+
+    def cancelled(self):
+        self._put(Kind.CANCELLED)
+
+    def metric(self, values: dict):
+        self._put(Kind.METRIC, values)
+
+    def hint(self, match: dict):
+        self._put(Kind.HINT, match)
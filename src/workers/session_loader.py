@@ -0,0 +1,50 @@
+import queue
+from pathlib import Path
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from src.utils.constants import LOGGER_DIR, LOGGER_NAME
+from src.utils.logger import setup_daily_logger
+
+PAGE_SIZE = 20
+
+
+class SessionLoaderThread(QThread):
+    """Reads session pages from the store off the GUI thread.
+
+    Requests carry a generation number; the view drops pages from an older
+    generation, so clicking through sessions quickly never mixes them up.
+    """
+
+    page_loaded = pyqtSignal(int, int, list)   # generation, offset, records
+
+    def set_app(self, app):
+        self.app = app
+        self.logger = setup_daily_logger(name=LOGGER_NAME, log_dir=LOGGER_DIR)
+        self.requests = queue.Queue()
+
+    def request_page(self, generation, session_path, offset, limit=PAGE_SIZE):
+        self.requests.put((generation, session_path, offset, limit))
+
+    def run(self):
+        store = self.app.session.store
+        while True:
+            request = self.requests.get()
+            if request is None:
+                break
+            generation, session_path, offset, limit = request
+            session = Path(session_path).stem
+            try:
+                if offset == 0:
+                    # legacy sessions may not have been imported yet
+                    store.import_txt(session_path)
+                records = store.interactions(session, offset=offset, limit=limit)
+            except Exception as e:
+                self.logger.error("loading %s at %d failed: %s", session, offset, e)
+                records = []
+            self.page_loaded.emit(generation, offset, records)
+        self.logger.info("session loader stopped")
+
+    def stop(self, timeout_ms: int = 2000):
+        self.requests.put(None)
+        self.wait(timeout_ms)
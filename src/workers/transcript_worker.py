@@ -0,0 +1,49 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from src.audio.capture import WavSource, MicrophoneSource
+from src.audio.transcriber import TranscriptPipeline, WhisperTranscriber
+from src.audio.vad import EnergyVAD
+from src.utils.constants import LOGGER_DIR, LOGGER_NAME
+from src.utils.logger import setup_daily_logger
+
+
+class TranscriptWorkerThread(QThread):
+    """Runs the audio -> transcript pipeline and hands its text to the GUI thread."""
+
+    partial_signal = pyqtSignal(str)
+    utterance_signal = pyqtSignal(str, float)   # text, ms from end of speech to transcript
+    error_signal = pyqtSignal(str)
+
+    def set_app(self, app):
+        self.app = app
+        self.logger = setup_daily_logger(name=LOGGER_NAME, log_dir=LOGGER_DIR)
+        self.transcriber = WhisperTranscriber(model_name=app.settings.get_whisper_model(),
+                                              workers=app.settings.get_transcribe_workers())
+        self.pipeline = None
+
+    def run(self):
+        settings = self.app.settings
+        wav = settings.get_audio_input_file()
+        source = WavSource(wav) if wav else MicrophoneSource()
+        self.pipeline = TranscriptPipeline(source, self.transcriber,
+                                           on_partial=self.partial_signal.emit,
+                                           on_utterance=self.utterance_signal.emit,
+                                           vad=EnergyVAD(silence_ms=settings.get_vad_silence_ms()),
+                                           partial_ms=settings.get_partial_transcript_ms())
+        try:
+            self.transcriber.load()
+            self.logger.info("listening on %s", wav or "the default microphone")
+            self.pipeline.run()
+        except Exception as e:
+            self.logger.error("audio pipeline stopped: %s", e)
+            self.error_signal.emit(str(e))
+        self.logger.info("transcript worker stopped")
+
+    def stop(self, timeout_ms: int = 2000):
+        if self.pipeline is not None:
+            self.pipeline.stop()
+        self.wait(timeout_ms)
+
+    def shutdown(self):
+        self.stop()
+        self.transcriber.shutdown()
@@ -0,0 +1,26 @@
+import queue
+
+from src.workers.coalescer import DeltaCoalescer
+from src.workers.messages import Kind, StreamMessage
+
+
+def delta(request_id, text):
+    return StreamMessage(request_id, Kind.DELTA, text)
+
+
+def test_interleaved_streams_keep_their_own_flush_counts():
+    source = queue.Queue()
+    coalescer = DeltaCoalescer(source, interval_ms=50)
+    for message in (delta("a", "x"), delta("b", "y"), delta("a", "z"), delta("b", "w"), delta("b", "v")):
+        source.put(message)
+
+    # the first delta after idle goes out alone, the rest share the next frame
+    assert [m.payload for m in coalescer.next_batch()] == ["x"]
+    assert [(m.request_id, m.payload) for m in coalescer.next_batch()] == [("b", "ywv"), ("a", "z")]
+
+    assert coalescer.stats("a") == {"flushes": 2, "deltas": 2, "avg_merged": 1.0, "max_merged": 1}
+    assert coalescer.stats("b") == {"flushes": 1, "deltas": 3, "avg_merged": 3.0, "max_merged": 3}
+
+    coalescer.forget("a")
+    assert coalescer.stats("a")["flushes"] == 0
+    assert coalescer.stats("b")["deltas"] == 3
@@ -0,0 +1,14 @@
+from src.utils.perf import StreamStats, format_metrics
+from src.utils.tokens import count_tokens
+
+
+def test_tokens_are_counted_from_delta_text_not_events():
+    stats = StreamStats("m")
+    chunks = ["the quick brown fox ", "jumps over the lazy dog. ", "and then it ran away."]
+    for chunk in chunks:
+        stats.on_delta(chunk)
+    stats.finish()
+    assert stats.tokens == sum(count_tokens(chunk) for chunk in chunks) > len(chunks)
+    assert len(stats.gaps_ms) == len(chunks) - 1
+    line = format_metrics({**stats.summary(), "exec_time_ms": stats.total_ms})
+    assert f"{stats.tokens} tokens @" in line
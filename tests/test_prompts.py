@@ -0,0 +1,24 @@
+import pytest
+
+from src.chat.prompts import DEFAULT_TEMPLATES, CompiledPrompt, PromptError, PromptRegistry
+
+
+@pytest.mark.parametrize("template", [
+    "bad { brace {question}",
+    "ans {question} then }",
+    "{question} and {",
+])
+def test_stray_brace_is_a_prompt_error(template):
+    with pytest.raises(PromptError):
+        CompiledPrompt("custom", template, "Go")
+
+
+def test_broken_custom_prompt_falls_back_to_the_default():
+    registry = PromptRegistry({"chat": "ans {question} then }", "extra": "bad { brace {question}"}, language="Go")
+    assert registry.get("chat").render("hi") == DEFAULT_TEMPLATES["chat"].format(question="hi")
+    assert "extra" not in registry.names()
+
+
+def test_doubled_braces_render_literally():
+    prompt = CompiledPrompt("custom", 'json {{"a": 1}} in {language}: {question} {{}}', "Go")
+    assert prompt.render("q") == 'json {"a": 1} in Go: q {}'
@@ -0,0 +1,29 @@
+from src.llm.ratelimit import RateLimits
+
+GROQ = "https://api.groq.com/openai/v1/chat/completions"
+GEMINI = "https://generativelanguage.googleapis.com/v1beta/openai/chat/completions"
+
+
+def test_models_sharing_an_endpoint_get_its_strictest_limit():
+    limits = RateLimits()
+    limits.configure([{"url": GROQ, "rpm": 1000, "tpm": 10_000_000}, {"url": GROQ, "rpm": 30}])
+    limiter = limits.limiter_for(GROQ, 1000, 10_000_000)
+    assert (limiter.requests.capacity, limiter.tokens.capacity) == (30, 10_000_000)
+    limiter.take(100)
+    limits.limiter_for(GROQ, 5, 5)          # a lookup never resizes
+    assert limiter.requests.capacity == 30 and limiter.tokens.level == 10_000_000 - 100
+
+
+def test_unconfigured_endpoint_keeps_its_free_tier_limit():
+    limits = RateLimits()
+    limits.configure([{"url": GROQ, "rpm": 1000}, {"url": GEMINI}])
+    limiter = limits.limiter_for(GEMINI, 1000, 10_000_000)
+    assert (limiter.requests.capacity, limiter.tokens.capacity) == (15, 1_000_000)
+
+
+def test_configure_resizes_existing_limiters():
+    limits = RateLimits()
+    limiter = limits.limiter_for(GROQ)
+    assert limiter.requests.capacity == 30
+    limits.configure([{"url": GROQ, "rpm": 60, "tpm": 12_000}])
+    assert (limiter.requests.capacity, limiter.tokens.capacity) == (60, 12_000)
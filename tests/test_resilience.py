@@ -0,0 +1,170 @@
+import asyncio
+
+import pytest
+
+from src.llm.ratelimit import EndpointLimiter
+from src.llm.resilience import BreakerBoard, CircuitBreaker, Failover, ProviderError, RetryPolicy, http_error
+
+
+class FakeLLM:
+    def __init__(self, model="m", api_url="https://api.example.com/v1/chat/completions"):
+        self.model = model
+        self.api_url = api_url
+        self._limiter = EndpointLimiter(api_url, None, None)
+
+    def limiter(self):
+        return self._limiter
+
+    def estimate_tokens(self, prompt, answer=None):
+        return 10
+
+
+def failover(llm, board, attempts=1):
+    return Failover([llm], RetryPolicy(attempts=attempts, base_s=0, max_s=0), board=board)
+
+
+def opened(board, llm):
+    breaker = board.breaker_for(llm.api_url)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    return breaker
+
+
+def fail_with(error):
+    def attempt(llm, timeout):
+        raise error
+    return attempt
+
+
+def test_breaker_opens_after_threshold_and_probes_once():
+    breaker = CircuitBreaker(failures=2, cooldown_s=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.admit() is True
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.admit() is None           # one probe at a time
+    breaker.release()
+    assert breaker.admit() is True           # a released slot can be probed again
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.admit() is False
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker(failures=1, cooldown_s=60)
+    breaker.record_failure()
+    breaker.opened_at -= 60
+    assert breaker.admit() is True
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.admit() is None
+
+
+def test_client_error_probe_closes_breaker():
+    board, llm = BreakerBoard(failures=1, cooldown_s=0), FakeLLM()
+    breaker = opened(board, llm)
+    with pytest.raises(ProviderError):
+        failover(llm, board).call(fail_with(http_error(400, "bad request")))
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert failover(llm, board).call(lambda llm, timeout: "ok") == "ok"
+
+
+def test_rate_limited_probe_closes_breaker():
+    board, llm = BreakerBoard(failures=1, cooldown_s=0), FakeLLM()
+    breaker = opened(board, llm)
+    with pytest.raises(ProviderError):
+        failover(llm, board).call(fail_with(http_error(429, "slow down", retry_after="0")))
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_server_error_probe_reopens_breaker():
+    board, llm = BreakerBoard(failures=1, cooldown_s=60), FakeLLM()
+    breaker = opened(board, llm)
+    breaker.opened_at -= 60
+    with pytest.raises(ProviderError):
+        failover(llm, board).call(fail_with(http_error(503, "overloaded")))
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_probe_without_outcome_releases_slot():
+    board, llm = BreakerBoard(failures=1, cooldown_s=0), FakeLLM()
+    breaker = opened(board, llm)
+    with pytest.raises(ProviderError):
+        failover(llm, board).call(fail_with(ValueError("unreadable body")))
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.admit() is True
+
+
+def test_probe_refused_by_rate_limiter_releases_slot():
+    board = BreakerBoard(failures=1, cooldown_s=0)
+    llm = FakeLLM()
+    llm.limiter().block(60)
+    breaker = opened(board, llm)
+    policy = RetryPolicy(attempts=1, deadline_s=0.5)
+    with pytest.raises(ProviderError):
+        Failover([llm], policy, board=board).call(lambda llm, timeout: "never sent")
+    assert breaker.admit() is True
+
+
+def test_cancelled_probe_releases_slot():
+    board, llm = BreakerBoard(failures=1, cooldown_s=0), FakeLLM()
+    breaker = opened(board, llm)
+
+    async def hang(llm, deliver):
+        await asyncio.sleep(10)
+
+    async def run():
+        task = asyncio.ensure_future(failover(llm, board).astream(hang))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.admit() is True
+
+
+def test_streamed_probe_success_closes_breaker():
+    board, llm = BreakerBoard(failures=1, cooldown_s=0), FakeLLM()
+    breaker = opened(board, llm)
+
+    async def answer(llm, deliver):
+        deliver("hi")
+        return "hi"
+
+    assert asyncio.run(failover(llm, board).astream(answer)) == "hi"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_try_refunds_its_token_reservation():
+    board = BreakerBoard(failures=5, cooldown_s=0)
+    llm = FakeLLM()
+    llm._limiter = EndpointLimiter(llm.api_url, None, 1000)
+    with pytest.raises(ProviderError):
+        failover(llm, board, attempts=2).call(fail_with(http_error(503, "overloaded")))
+    assert llm.limiter().snapshot()["tpm_left"] == 1000
+
+
+def test_cancelled_blocking_call_frees_probe_and_tokens():
+    board = BreakerBoard(failures=1, cooldown_s=0)
+    llm = FakeLLM()
+    llm._limiter = EndpointLimiter(llm.api_url, None, 1000)
+    breaker = opened(board, llm)
+
+    async def hang(llm, timeout):
+        await asyncio.sleep(10)
+
+    async def run():
+        task = asyncio.ensure_future(failover(llm, board).acall(hang))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert breaker.admit() is True
+    assert llm.limiter().snapshot()["tpm_left"] == 1000
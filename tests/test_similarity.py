@@ -0,0 +1,21 @@
+from src.chat.similarity import SimilarityIndex
+
+
+def indexed(*questions):
+    index = SimilarityIndex()
+    for question in questions:
+        index.add(question, f"answer to {question}", "m")
+    return index
+
+
+def test_rephrased_question_matches():
+    index = indexed("what is a hash map", "how do you reverse a linked list")
+    hit = index.lookup("so what is a hash map")
+    assert hit is not None and hit["question"] == "what is a hash map"
+
+
+def test_superset_question_with_new_terms_stays_below_threshold():
+    index = indexed("what is a hash map", "how do you reverse a linked list")
+    for question in ("how does a hash map handle collisions in java with open addressing and resizing",
+                     "design a distributed hash map across datacenters with consistent replication"):
+        assert index.lookup(question) is None
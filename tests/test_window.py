@@ -0,0 +1,45 @@
+from src.chat.window import TranscriptWindow
+from src.utils.tokens import count_tokens
+
+TALK = [
+    "We moved the ingestion service to Kafka last quarter.",
+    "The consumers are written in Go and run on Kubernetes.",
+    "Latency spiked whenever a partition rebalanced.",
+    "We tried static membership but it did not help much.",
+    "The team also debated switching the serializer to protobuf.",
+] * 8
+
+
+def window(max_budget=2000):
+    w = TranscriptWindow(max_budget=max_budget)
+    for utterance in TALK:
+        w.add(utterance)
+    w.ask("How would you keep consumer lag low during a rebalance?")
+    return w
+
+
+def test_render_does_not_change_the_window():
+    w = window()
+    large = w.render(2000)
+    small = w.render(100)
+    assert count_tokens(small) <= 100 < count_tokens(large)
+    assert w.render(2000) == large
+
+
+def test_small_budget_summarises_older_talk():
+    rendered = window().render(100)
+    assert rendered.startswith("Earlier (summary): ")
+    assert rendered.endswith("How would you keep consumer lag low during a rebalance?")
+
+
+def test_window_slides_against_the_largest_budget():
+    w = window(max_budget=100)
+    assert count_tokens(w.render(100)) <= 100
+    assert "Earlier (summary): " in w.render(2000)
+
+
+def test_ask_does_not_repeat_a_question_cut_from_the_last_utterance():
+    w = TranscriptWindow()
+    w.add("ok so next one. how does the go scheduler work?")
+    w.ask("how does the go scheduler work?")
+    assert w.render(1000).count("scheduler") == 1